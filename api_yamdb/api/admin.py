@@ -2,7 +2,8 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import Group
 
-from .models import Category, Comment, Genre, Title, Review, User
+from .models import (Category, Comment, Genre, OutgoingEmail, Review, Title,
+                     User)
 
 
 class UserAdmin(BaseUserAdmin):
@@ -35,8 +36,10 @@ class GenreAdmin(admin.ModelAdmin):
 
 
 class TitleAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'name', 'category', 'description', 'year')
+    list_display = ('pk', 'name', 'category', 'description', 'year',
+                    'rating')
     search_fields = ('name',)
+    readonly_fields = ('rating_sum', 'rating_count', 'rating')
 
 
 class ReviewAdmin(admin.ModelAdmin):
@@ -49,6 +52,13 @@ class CommentAdmin(admin.ModelAdmin):
     search_fields = ('text',)
 
 
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'to', 'subject', 'created', 'attempts',
+                    'next_attempt_at', 'sent_at')
+    list_filter = ('sent_at',)
+    search_fields = ('to',)
+
+
 admin.site.register(User, UserAdmin)
 admin.site.unregister(Group)
 admin.site.register(Category, CategoryAdmin)
@@ -56,3 +66,4 @@ admin.site.register(Genre, GenreAdmin)
 admin.site.register(Title, TitleAdmin)
 admin.site.register(Review, ReviewAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
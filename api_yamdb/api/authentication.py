@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+# Fields needed by permissions, the rest is loaded lazily on access.
+# Model.from_db expects values in concrete fields order.
+USER_RECORD_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in ('id', 'username', 'role', 'is_superuser',
+                         'is_active'))
+
+
+class UserRecordCache:
+    """
+    Bounded LRU cache of user records with TTL.
+    Records are invalidated by User signals in this process,
+    TTL limits staleness of changes made by other processes.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.records = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        with self.lock:
+            item = self.records.get(user_id)
+            if item is None:
+                return None
+            expires, record = item
+            if expires < time.monotonic():
+                del self.records[user_id]
+                return None
+            self.records.move_to_end(user_id)
+            return record
+
+    def set(self, user_id, record):
+        with self.lock:
+            self.records[user_id] = (time.monotonic() + self.ttl, record)
+            self.records.move_to_end(user_id)
+            while len(self.records) > self.maxsize:
+                self.records.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.records.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.records.clear()
+
+
+user_cache = UserRecordCache(
+    settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that builds request.user from cached record
+    instead of selecting user row on every request.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification'))
+
+        record = user_cache.get(user_id)
+        if record is None:
+            record = User.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}).values_list(
+                    *USER_RECORD_FIELDS).first()
+            if record is None:
+                raise AuthenticationFailed(
+                    _('User not found'), code='user_not_found')
+            user_cache.set(user_id, record)
+
+        user = User.from_db(None, USER_RECORD_FIELDS, record)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive')
+        return user
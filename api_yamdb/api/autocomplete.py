@@ -0,0 +1,222 @@
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Category, Genre, Title
+
+WORD_RE = re.compile(r'\w+')
+# Greater than any character, bounds range of words with given prefix.
+PREFIX_END = '\U0010ffff'
+
+
+def split_words(text):
+    return WORD_RE.findall(text.casefold().replace('ё', 'е'))
+
+
+class PrefixIndex:
+    """
+    Sorted array of distinct words searched by binary search, every
+    word has postings sorted by rank. Entry rank is a tuple ending
+    with entry key, smaller tuples rank higher.
+    """
+
+    def __init__(self):
+        self.words = []
+        self.postings = {}
+        self.entries = {}
+
+    def add(self, key, rank, text, payload):
+        self.remove(key)
+        words = frozenset(split_words(text))
+        self.entries[key] = (rank, words, payload)
+        for word in words:
+            posting = self.postings.get(word)
+            if posting is None:
+                insort(self.words, word)
+                posting = self.postings[word] = []
+            insort(posting, rank)
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        rank, words, _ = entry
+        for word in words:
+            posting = self.postings[word]
+            del posting[bisect_left(posting, rank)]
+            if not posting:
+                del self.postings[word]
+                del self.words[bisect_left(self.words, word)]
+
+    def word_range(self, prefix):
+        return (bisect_left(self.words, prefix),
+                bisect_left(self.words, prefix + PREFIX_END))
+
+    def search(self, query, limit):
+        """
+        Return payloads of best entries having a word starting with
+        every word of query.
+        """
+        terms = split_words(query)
+        if not terms:
+            return []
+        ranges = {term: self.word_range(term) for term in terms}
+        # Merge postings of the most selective term in rank order.
+        driver = min(terms, key=lambda term: ranges[term][1] - ranges[term][0])
+        others = [term for term in terms if term != driver]
+        start, stop = ranges[driver]
+        postings = [self.postings[word] for word in self.words[start:stop]]
+        results = []
+        seen = set()
+        for rank in heapq.merge(*postings):
+            key = rank[-1]
+            if key in seen:
+                continue
+            seen.add(key)
+            _, words, payload = self.entries[key]
+            if all(any(word.startswith(term) for word in words)
+                   for term in others):
+                results.append(payload)
+                if len(results) == limit:
+                    break
+        return results
+
+
+def title_entry(pk, name, year, rating, rating_count):
+    rating = float(rating) if rating is not None else None
+    rank = (-rating_count, -(rating or 0), pk)
+    return pk, rank, name, {'id': pk, 'name': name, 'year': year,
+                            'rating': rating}
+
+
+def slug_entry(pk, name, slug):
+    return pk, (tuple(split_words(name)), pk), name, {'name': name,
+                                                      'slug': slug}
+
+
+TITLE_FIELDS = ('pk', 'name', 'year', 'rating', 'rating_count')
+SLUG_FIELDS = ('pk', 'name', 'slug')
+
+
+class AutocompleteIndex:
+    """
+    In-process prefix index of title, genre and category names.
+    Built lazily on first search, updated after commit by model signals
+    of this process and rebuilt in background after AUTOCOMPLETE_INDEX_TTL,
+    which limits staleness of changes made by other processes.
+    """
+    sources = (
+        ('titles', Title, TITLE_FIELDS, title_entry),
+        ('genres', Genre, SLUG_FIELDS, slug_entry),
+        ('categories', Category, SLUG_FIELDS, slug_entry),
+    )
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.indexes = None
+        self.built_at = None
+        self.rebuilding = False
+        self.pending = None
+
+    def build_indexes(self):
+        indexes = {}
+        for name, model, fields, make_entry in self.sources:
+            index = indexes[name] = PrefixIndex()
+            for row in model.objects.values_list(*fields).iterator():
+                index.add(*make_entry(*row))
+        return indexes
+
+    def reset(self):
+        with self.lock:
+            self.indexes = None
+            self.built_at = None
+
+    def expire(self):
+        """
+        Rebuild in background on next search, current index is served
+        meanwhile.
+        """
+        with self.lock:
+            if self.indexes is not None:
+                self.built_at = float('-inf')
+
+    def get_indexes(self):
+        with self.lock:
+            if self.indexes is None:
+                self.indexes = self.build_indexes()
+                self.built_at = time.monotonic()
+            elif (not self.rebuilding and time.monotonic() - self.built_at
+                    > settings.AUTOCOMPLETE_INDEX_TTL):
+                self.rebuilding = True
+                self.pending = {name: set() for name, *_ in self.sources}
+                threading.Thread(target=self.rebuild, daemon=True).start()
+            return self.indexes
+
+    def rebuild(self):
+        try:
+            indexes = self.build_indexes()
+            with self.lock:
+                self.indexes = indexes
+                self.built_at = time.monotonic()
+                pending, self.pending = self.pending, None
+            # Changes made during build may be missing in snapshot,
+            # they are reloaded without blocking searches.
+            for name, pks in pending.items():
+                self.apply(name, pks)
+        finally:
+            with self.lock:
+                self.rebuilding = False
+                self.pending = None
+            connection.close()
+
+    def refresh(self, name, pks):
+        """
+        Reload entries of given objects after commit, so rolled back
+        changes never get into the index.
+        """
+        pks = set(pks)
+        if pks:
+            transaction.on_commit(lambda: self.apply(name, pks))
+
+    def apply(self, name, pks):
+        """
+        Reload entries of given objects, removed objects are dropped.
+        Does nothing until the index is built.
+        """
+        pks = set(pks)
+        if self.indexes is None or not pks:
+            return
+        _, model, fields, make_entry = next(
+            source for source in self.sources if source[0] == name)
+        # Searches are not blocked by the query.
+        rows = list(model.objects.filter(pk__in=pks).values_list(*fields))
+        with self.lock:
+            if self.indexes is None:
+                return
+            if self.pending is not None:
+                self.pending[name].update(pks)
+            index = self.indexes[name]
+            for row in rows:
+                pks.discard(row[0])
+                index.add(*make_entry(*row))
+            for pk in pks:
+                index.remove(pk)
+
+    def refresh_model(self, model, pks):
+        for name, source_model, *_ in self.sources:
+            if source_model is model:
+                self.refresh(name, pks)
+
+    def search(self, query, limit):
+        indexes = self.get_indexes()
+        with self.lock:
+            return {name: index.search(query, limit)
+                    for name, index in indexes.items()}
+
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,363 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .replicas import primary_reads, recorded_replica_reads
+
+
+def read_versions(keys, create=True):
+    """
+    Read version counters from Django cache. Versions are creation
+    times in nanoseconds, a lost one is created anew, so it never
+    revives entries or validators of an old one.
+    Without create None is returned when any version is missing.
+    """
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        if not create:
+            return None
+        now = time.time_ns()
+        for key in missing:
+            cache.add(key, now, None)
+        versions.update(cache.get_many(missing))
+    return tuple(versions[key] for key in keys)
+
+
+def request_digest(request):
+    query = sorted(request.query_params.lists())
+    return hashlib.md5(
+        f'{request.get_host()}{request.path}?{query}'.encode()).hexdigest()
+
+
+class Flight:
+    """
+    Computation of one key in this process, shared by its followers.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.data = None
+
+
+class ResponseCache:
+    """
+    Cache of response data in Django cache, keyed by host, path and
+    query string. invalidate() moves the cache to a new version, so old
+    entries are never read again and expire by themselves. The version
+    is moved once more after commit, entries filled by concurrent
+    readers before commit do not survive it.
+
+    fetch() computes a missing entry once: concurrent requests of the
+    process wait for its flight, other processes for lock in the cache.
+    Entry older than soft timeout is served stale while one worker
+    refreshes it, hard timeout is the lifetime of entry in the cache.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.version_key = f'response-cache:{prefix}:version'
+        self.lock = threading.Lock()
+        self.flights = {}
+        self.counters = {'hits': 0, 'misses': 0, 'stale': 0,
+                         'coalesced': 0, 'invalidations': 0}
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters)
+
+    def get_version(self):
+        return read_versions((self.version_key,))[0]
+
+    def invalidate(self):
+        def bump():
+            cache.set(self.version_key, time.time_ns(), None)
+
+        bump()
+        transaction.on_commit(bump)
+        self.count('invalidations')
+
+    def make_key(self, request):
+        return (f'response-cache:{self.prefix}:{self.get_version()}:'
+                f'{request_digest(request)}')
+
+    def get(self, key):
+        entry = cache.get(key)
+        self.count('misses' if entry is None else 'hits')
+        return entry
+
+    def set(self, key, data):
+        entry = {
+            'data': data,
+            'fresh_until': time.time() + settings.RESPONSE_CACHE_SOFT_TIMEOUT,
+        }
+        cache.set(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+
+    def acquire(self, key):
+        return cache.add(f'{key}:lock', True,
+                         settings.RESPONSE_CACHE_LOCK_TIMEOUT)
+
+    def release(self, key):
+        cache.delete(f'{key}:lock')
+
+    def fetch(self, key, compute):
+        """
+        Return response for key from the cache or from compute(),
+        only successful responses are stored.
+        """
+        entry = self.get(key)
+        if entry is None:
+            return self.coalesce(key, compute)
+        if entry['fresh_until'] > time.time():
+            return Response(entry['data'])
+        if not self.acquire(key):
+            self.count('stale')
+            return Response(entry['data'])
+        try:
+            return self.compute_and_store(key, compute)
+        finally:
+            self.release(key)
+
+    def coalesce(self, key, compute):
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = Flight()
+        if not leader:
+            flight.done.wait(settings.RESPONSE_CACHE_LOCK_TIMEOUT)
+            if flight.data is None:
+                # Leader failed or got uncacheable response.
+                return compute()
+            self.count('coalesced')
+            return Response(flight.data)
+        try:
+            response = self.compute_shared(key, compute)
+            if response.status_code == status.HTTP_200_OK:
+                flight.data = response.data
+            return response
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.done.set()
+
+    def compute_shared(self, key, compute):
+        acquired = self.acquire(key)
+        if not acquired:
+            entry = self.wait_for(key)
+            if entry is not None:
+                self.count('coalesced')
+                return Response(entry['data'])
+        try:
+            return self.compute_and_store(key, compute)
+        finally:
+            if acquired:
+                self.release(key)
+
+    def wait_for(self, key):
+        """
+        Wait for entry computed by another process while it holds lock.
+        """
+        deadline = time.monotonic() + settings.RESPONSE_CACHE_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(0.01)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry
+            if cache.get(f'{key}:lock') is None:
+                return None
+        return None
+
+    def compute_and_store(self, key, compute):
+        # Entry of new version computed from a lagging replica would be
+        # served to the author of the write as well.
+        with primary_reads():
+            response = compute()
+        if response.status_code == status.HTTP_200_OK:
+            self.set(key, response.data)
+        return response
+
+
+class ObjectCache(ResponseCache):
+    """
+    Response cache of single objects keyed by primary key, every object
+    and the collection as a whole have own versions.
+    invalidate_objects() bumps them right away and once more after
+    commit, so entries read before commit do not survive it.
+    """
+
+    def __init__(self, prefix):
+        super().__init__(prefix)
+        self.collection_key = f'response-cache:{prefix}:collection'
+
+    def object_version_key(self, pk):
+        return f'response-cache:{self.prefix}:{pk}:version'
+
+    def get_object_versions(self, pk, create=True):
+        return read_versions(
+            (self.version_key, self.object_version_key(pk)), create)
+
+    def get_collection_versions(self, create=True):
+        return read_versions((self.version_key, self.collection_key), create)
+
+    def make_key(self, pk, versions=None):
+        version, object_version = versions or self.get_object_versions(pk)
+        return f'response-cache:{self.prefix}:{version}:{pk}:{object_version}'
+
+    def make_list_key(self, request):
+        version, collection_version = self.get_collection_versions()
+        return (f'response-cache:{self.prefix}:{version}:list:'
+                f'{collection_version}:{request_digest(request)}')
+
+    def invalidate_objects(self, pks):
+        keys = [self.object_version_key(pk) for pk in set(pks)]
+        if not keys:
+            return
+        keys.append(self.collection_key)
+
+        def bump():
+            cache.set_many(dict.fromkeys(keys, time.time_ns()), None)
+
+        bump()
+        transaction.on_commit(bump)
+        self.count('invalidations')
+
+
+response_caches = {}
+title_cache = response_caches.setdefault('title', ObjectCache('title'))
+# Only versions are used: of reviews by title and comments by review.
+review_versions = response_caches.setdefault(
+    'reviews', ObjectCache('reviews'))
+comment_versions = response_caches.setdefault(
+    'comments', ObjectCache('comments'))
+
+
+def get_response_cache(prefix):
+    if prefix not in response_caches:
+        response_caches.setdefault(prefix, ResponseCache(prefix))
+    return response_caches[prefix]
+
+
+class CachedListMixin:
+    """
+    Serve list of viewset from response cache named cache_prefix.
+    Invalidation is done by model signals, see api.signals.
+    """
+    cache_prefix = None
+
+    def get_list_cache(self):
+        return get_response_cache(self.cache_prefix)
+
+    def get_list_cache_key(self, request):
+        return self.get_list_cache().make_key(request)
+
+    def list(self, request, *args, **kwargs):
+        return self.get_list_cache().fetch(
+            self.get_list_cache_key(request),
+            lambda: super(CachedListMixin, self).list(
+                request, *args, **kwargs))
+
+
+class CachedRetrieveMixin:
+    """
+    Serve retrieve of viewset from object_cache by primary key.
+    Invalidation is done by model signals, see api.signals.
+    Versions of object are created once it was served, so probing
+    of missing ids leaves nothing in the cache.
+    """
+    object_cache = None
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        if not pk.isdigit():
+            return super().retrieve(request, *args, **kwargs)
+        versions = self.object_cache.get_object_versions(int(pk), False)
+        if versions is None:
+            response = super().retrieve(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                self.object_cache.get_object_versions(int(pk))
+            return response
+        return self.object_cache.fetch(
+            self.object_cache.make_key(int(pk), versions),
+            lambda: super(CachedRetrieveMixin, self).retrieve(
+                request, *args, **kwargs))
+
+
+class ConditionalGetMixin:
+    """
+    Answer list and retrieve with ETag and Last-Modified derived from
+    content versions, unchanged content is answered with 304 before
+    rows are fetched or serialized.
+    Versions of content_versions object named by content_scope_kwarg
+    are used by default. Bodies read from replicas get no validators.
+    Missing versions are created only after 200 response, so 404 of
+    missing content is never hidden by 304.
+    """
+    content_versions = None
+    content_scope_kwarg = None
+
+    def get_content_versions(self, create=False):
+        """
+        Return tuple of versions of requested content, None disables
+        conditional responses.
+        """
+        return self.content_versions.get_object_versions(
+            int(self.kwargs[self.content_scope_kwarg]), create)
+
+    def get_last_modified(self, versions):
+        """
+        Last-Modified has one second resolution: content of version
+        younger than a second may still change within the same second,
+        so it is validated by ETag only.
+        """
+        latest = max(versions)
+        if time.time_ns() - latest < 10 ** 9:
+            return None
+        return latest // 10 ** 9
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        versions = self.get_content_versions()
+        if versions is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                self.get_content_versions(create=True)
+            return response
+        source = (f'{request.get_full_path()}|'
+                  f'{request.accepted_renderer.format}|{versions}')
+        etag = quote_etag(hashlib.md5(source.encode()).hexdigest())
+        last_modified = self.get_last_modified(versions)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            with recorded_replica_reads() as replicas:
+                response = handler(request, *args, **kwargs)
+            if replicas:
+                # Body of lagging replica may be older than versions,
+                # validators would make clients keep it after the lag.
+                return response
+        if response.status_code in (status.HTTP_200_OK,
+                                    status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs)
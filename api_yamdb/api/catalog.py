@@ -0,0 +1,384 @@
+import logging
+import threading
+import time
+from array import array
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .models import Category, Genre, Title
+
+logger = logging.getLogger('api.catalog')
+
+BUILD_CHUNK = 10000
+ROW_FIELDS = ('pk', 'year', 'category_id', 'genre_mask')
+
+
+def chunked(rows):
+    """
+    Yield lists of rows, so deadline is checked once per chunk.
+    """
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, BUILD_CHUNK))
+        if not chunk:
+            return
+        yield chunk
+
+
+def count_ones(value):
+    return bin(value).count('1')
+
+
+# int.bit_count() appeared in Python 3.10.
+bit_count = getattr(int, 'bit_count', count_ones)
+
+
+def set_bits(positions, size):
+    """
+    Bitset as int with given bit positions set.
+    """
+    data = bytearray((size + 7) // 8)
+    for position in positions:
+        data[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(data, 'little')
+
+
+def mask_bits(mask):
+    while mask:
+        bit = mask & -mask
+        yield bit
+        mask ^= bit
+
+
+class Selection:
+    """
+    Titles of one filter as bitset over rows of the index. Rows are
+    in order of id, so the highest bits are the newest titles.
+    """
+
+    def __init__(self, bits, ids):
+        self.bits = bits
+        self.ids = ids
+        self.total = bit_count(bits)
+
+    def page(self, offset, limit):
+        """
+        Ids of titles from offset to offset + limit in order of -id.
+        """
+        bits = self.bits
+        if offset:
+            if offset >= self.total:
+                return []
+            # Lowest row with no more than offset newer rows selected.
+            low, high = 0, bits.bit_length()
+            while low < high:
+                middle = (low + high) // 2
+                if bit_count(bits >> middle) <= offset:
+                    high = middle
+                else:
+                    low = middle + 1
+            bits &= (1 << low) - 1
+        ids = []
+        while bits and len(ids) < limit:
+            row = bits.bit_length() - 1
+            ids.append(self.ids[row])
+            bits ^= 1 << row
+        return ids
+
+
+class IndexedTitles:
+    """
+    Sequence of titles for Paginator: count and pages come from
+    selection, only titles of the page are read from queryset.
+    """
+
+    def __init__(self, queryset, selection):
+        self.queryset = queryset
+        self.selection = selection
+
+    def count(self):
+        return self.selection.total
+
+    def __len__(self):
+        return self.selection.total
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = self.selection.total if index.stop is None else index.stop
+        ids = self.selection.page(start, stop - start)
+        titles = self.queryset.filter(pk__in=ids).in_bulk()
+        # Titles deleted after the selection are skipped.
+        return [titles[pk] for pk in ids if pk in titles]
+
+
+class Columns:
+    """
+    Columns of titles by row, row bitsets of every category, year and
+    genre bit, slugs of categories and genres.
+    """
+
+    def __init__(self, rows, categories, genres):
+        self.ids = array('q')
+        self.years = array('q')
+        self.categories = array('q')
+        self.masks = array('q')
+        self.rows = {}
+        for row in rows:
+            self.append_row(row)
+        size = len(self.ids)
+        self.alive = (1 << size) - 1
+        self.by_year = self.group_bits(self.years, size)
+        self.by_category = self.group_bits(self.categories, size)
+        bit_rows = {}
+        for position, mask in enumerate(self.masks):
+            for bit in mask_bits(mask):
+                bit_rows.setdefault(bit, []).append(position)
+        self.by_genre = {bit: set_bits(positions, size)
+                         for bit, positions in bit_rows.items()}
+        self.category_slugs = dict(categories)
+        self.genre_slugs = dict(genres)
+
+    @staticmethod
+    def group_bits(column, size):
+        groups = {}
+        for position, value in enumerate(column):
+            if value:
+                groups.setdefault(value, []).append(position)
+        return {value: set_bits(positions, size)
+                for value, positions in groups.items()}
+
+    def append_row(self, row):
+        pk, year, category_id, mask = row
+        self.rows[pk] = len(self.ids)
+        self.ids.append(pk)
+        self.years.append(year or 0)
+        self.categories.append(category_id or 0)
+        self.masks.append(mask)
+
+    def toggle(self, position, on):
+        """
+        Add row to or remove it from bitsets of its values.
+        """
+        bit = 1 << position
+        groups = [(self.by_year, self.years[position]),
+                  (self.by_category, self.categories[position])]
+        groups.extend((self.by_genre, genre_bit)
+                      for genre_bit in mask_bits(self.masks[position]))
+        for bitsets, value in groups:
+            if not value:
+                continue
+            bits = bitsets.get(value, 0)
+            bitsets[value] = bits | bit if on else bits & ~bit
+        self.alive = self.alive | bit if on else self.alive & ~bit
+
+    def update_row(self, row):
+        """
+        Put changed title into its row, return False when a new title
+        can't be appended in order of id.
+        """
+        pk, year, category_id, mask = row
+        position = self.rows.get(pk)
+        if position is None:
+            if self.ids and pk < self.ids[-1]:
+                return False
+            self.append_row(row)
+            self.toggle(len(self.ids) - 1, True)
+            return True
+        self.toggle(position, False)
+        self.years[position] = year or 0
+        self.categories[position] = category_id or 0
+        self.masks[position] = mask
+        self.toggle(position, True)
+        return True
+
+    def delete_row(self, pk):
+        position = self.rows.pop(pk, None)
+        if position is not None:
+            self.toggle(position, False)
+
+    def select(self, params):
+        """
+        Selection of titles matching cleaned params of TitleFilter,
+        None when it needs the database. Sorted lists are read
+        from the database by ordering indexes of titles.
+        """
+        if (params.get('name') or params.get('search')
+                or params.get('ordering')):
+            return None
+        bits = self.alive
+        if params.get('year') is not None:
+            bits &= self.by_year.get(params['year'], 0)
+        if params.get('category'):
+            category_id = self.category_slugs.get(params['category'])
+            bits &= self.by_category.get(category_id, 0)
+        if params.get('genre'):
+            genre_bits = self.genre_bits(
+                params['genre'], params.get('genre_mode') == 'all')
+            if genre_bits is None:
+                return None
+            bits &= genre_bits
+        return Selection(bits, self.ids)
+
+    def genre_bits(self, value, require_all):
+        slugs = dict.fromkeys(
+            slug for slug in map(str.strip, value.split(',')) if slug)
+        if not slugs:
+            return self.alive
+        result = self.alive if require_all else 0
+        for slug in slugs:
+            if slug not in self.genre_slugs:
+                # Unknown genre has no titles.
+                if require_all:
+                    return 0
+                continue
+            mask = self.genre_slugs[slug]
+            if mask is None:
+                # Genres without bit are filtered through M2M table.
+                return None
+            bits = self.by_genre.get(mask, 0)
+            result = result & bits if require_all else result | bits
+        return result
+
+
+def load_slugs():
+    return (Category.objects.values_list('slug', 'pk'),
+            Genre.objects.values_list('slug', 'mask'))
+
+
+class CatalogIndex:
+    """
+    In-process columnar index of titles: filters of titles list are
+    applied to row bitsets, count and page ids are computed without
+    the database and only titles of the page are fetched.
+
+    Changes of this process are applied after commit by changed(),
+    every change increments version stamp in Django cache. A stamp
+    not made by this process means changes of other processes, index
+    is rebuilt in background and list is served from the database
+    meanwhile. Build taking more than CATALOG_INDEX_BUILD_TIMEOUT
+    disables the index in this process.
+    """
+    version_key = 'catalog-index:version'
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.columns = None
+        self.version = None
+        self.building = False
+        self.disabled = False
+
+    def get_stamp(self):
+        cache.add(self.version_key, 0, None)
+        return cache.get(self.version_key)
+
+    def build(self):
+        """
+        Build index from the database, return False on timeout.
+        """
+        version = self.get_stamp()
+        deadline = time.monotonic() + settings.CATALOG_INDEX_BUILD_TIMEOUT
+        rows = []
+        titles = Title.objects.order_by('pk').values_list(*ROW_FIELDS)
+        for chunk in chunked(titles.iterator(chunk_size=BUILD_CHUNK)):
+            if time.monotonic() > deadline:
+                logger.warning(
+                    'Catalog index is not built in %s seconds, disabled',
+                    settings.CATALOG_INDEX_BUILD_TIMEOUT)
+                return False
+            rows.extend(chunk)
+        columns = Columns(rows, *load_slugs())
+        with self.lock:
+            self.columns = columns
+            self.version = version
+        return True
+
+    def build_in_background(self):
+        try:
+            if not self.build():
+                self.disabled = True
+        finally:
+            self.building = False
+            connection.close()
+
+    def reset(self):
+        with self.lock:
+            self.columns = None
+            self.version = None
+
+    def get_columns(self):
+        """
+        Columns matching the version stamp, otherwise start a build
+        and return None.
+        """
+        if not settings.CATALOG_INDEX_ENABLED or self.disabled:
+            return None
+        stamp = cache.get(self.version_key)
+        with self.lock:
+            if self.columns is not None and stamp == self.version:
+                return self.columns
+            if not self.building:
+                self.building = True
+                threading.Thread(target=self.build_in_background,
+                                 daemon=True).start()
+        return None
+
+    def select(self, params):
+        columns = self.get_columns()
+        if columns is None:
+            return None
+        with self.lock:
+            return columns.select(params)
+
+    def changed(self, title_ids=None):
+        """
+        Apply changes of given titles after commit, None means that
+        anything may have changed and index is built anew. The stamp
+        is incremented even where the index is off, processes serving
+        from it see the change.
+        """
+        title_ids = None if title_ids is None else set(title_ids)
+        transaction.on_commit(lambda: self.apply(title_ids))
+
+    def increment_stamp(self):
+        try:
+            return cache.incr(self.version_key)
+        except ValueError:
+            return None
+
+    def apply(self, title_ids):
+        if not settings.CATALOG_INDEX_ENABLED:
+            self.increment_stamp()
+            return
+        with self.lock:
+            columns = self.columns
+            if title_ids is None or (
+                    columns is not None
+                    and not self.apply_rows(columns, title_ids)):
+                self.columns = None
+            stamp = self.increment_stamp()
+            if self.columns is None:
+                return
+            if stamp is None or stamp != self.version + 1:
+                # Lost stamp or changes of other processes.
+                self.columns = None
+            self.version = stamp
+
+    @staticmethod
+    def apply_rows(columns, title_ids):
+        rows = Title.objects.filter(pk__in=title_ids).values_list(
+            *ROW_FIELDS)
+        for row in rows:
+            title_ids.discard(row[0])
+            if not columns.update_row(row):
+                return False
+        for pk in title_ids:
+            columns.delete_row(pk)
+        return True
+
+
+catalog_index = CatalogIndex()
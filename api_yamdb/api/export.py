@@ -0,0 +1,69 @@
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Review, Title
+
+EXPORT_CHUNK_SIZE = 500
+
+
+def title_batches(since=0, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Walk titles by primary key in chunks, so memory does not depend
+    on catalog size.
+    """
+    titles = Title.objects.select_related('category').order_by('id')
+    last_id = since
+    while True:
+        batch = list(titles.filter(id__gt=last_id)[:chunk_size])
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+
+def export_catalog(since=0, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield titles with genres, category, rating and reviews
+    as newline delimited JSON. Reviews are streamed in order of
+    (title_id, id) and written one by one, so memory does not depend
+    on review count of a title either.
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for batch in title_batches(since, chunk_size):
+        ids = [title.id for title in batch]
+        genres = {title_id: [] for title_id in ids}
+        for title_id, name, slug in Title.genre.through.objects.filter(
+                title_id__in=ids).values_list(
+                    'title_id', 'genre__name', 'genre__slug'):
+            genres[title_id].append({'name': name, 'slug': slug})
+        reviews = Review.objects.filter(title_id__in=ids).values_list(
+            'title_id', 'id', 'author__username', 'text', 'score',
+            'pub_date',
+        ).order_by('title_id', 'id').iterator(chunk_size=chunk_size)
+        review = next(reviews, None)
+        for title in batch:
+            category = title.category
+            head = encoder.encode({
+                'id': title.id,
+                'name': title.name,
+                'year': title.year,
+                'rating': (None if title.rating is None
+                           else float(title.rating)),
+                'description': title.description,
+                'genre': genres[title.id],
+                'category': category and {
+                    'name': category.name, 'slug': category.slug},
+            })
+            yield head[:-1] + ', "reviews": ['
+            separator = ''
+            while review is not None and review[0] == title.id:
+                _, pk, author, text, score, pub_date = review
+                yield separator + encoder.encode({
+                    'id': pk,
+                    'author': author,
+                    'text': text,
+                    'score': score,
+                    'pub_date': pub_date,
+                })
+                separator = ', '
+                review = next(reviews, None)
+            yield ']}\n'
@@ -0,0 +1,42 @@
+from django.db.models import Count, F
+
+from .filters import TitleFilter
+from .models import Title
+
+YEAR_GROUPS = ('year', 'decade')
+# Facet name and filter parameter it ignores.
+FACETS = (
+    ('genre', 'genre', 'genre__slug'),
+    ('category', 'category', 'category__slug'),
+)
+
+
+def filtered_titles(params, exclude=None):
+    params = params.copy()
+    params.pop(exclude, None)
+    return TitleFilter(params, queryset=Title.objects.all()).qs.order_by()
+
+
+def grouped_counts(queryset, field, name):
+    rows = (queryset.exclude(**{f'{field}__isnull': True})
+            .values(field).annotate(count=Count('pk'))
+            .order_by('-count', field))
+    return [{name: row[field], 'count': row['count']} for row in rows]
+
+
+def count_facets(params, year_group='year'):
+    """
+    Count titles matching filters of titles list per genre, category
+    and year or decade with one grouped query per facet.
+    Every facet ignores own filter, so counts of alternative values
+    are shown next to the chosen one.
+    """
+    facets = {'count': filtered_titles(params).count()}
+    for name, param, field in FACETS:
+        facets[name] = grouped_counts(
+            filtered_titles(params, exclude=param), field, 'slug')
+    years = filtered_titles(params, exclude='year')
+    if year_group == 'decade':
+        years = years.annotate(decade=F('year') / 10 * 10)
+    facets[year_group] = grouped_counts(years, year_group, year_group)
+    return facets
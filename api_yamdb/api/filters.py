@@ -1,13 +1,91 @@
 from django_filters import rest_framework as filters
+from django_filters.constants import EMPTY_VALUES
 
-from .models import Title
+from .models import Genre, Title
+from .search import search_titles
+
+GENRE_MODES = (('any', 'Любой из жанров'), ('all', 'Все жанры'))
+
+
+def genre_condition(slugs, mode):
+    """
+    SQL condition and parameters of title having any or all genres with
+    given slugs. Bits of the genres are summed once by a subquery, then
+    every title costs one bitwise operation on genre_mask, which is
+    read from its index. Genres without bit use the M2M table.
+    """
+    title = Title._meta.db_table
+    genre = Genre._meta.db_table
+    through = Title.genre.through._meta.db_table
+    in_slugs = f'{genre}.slug IN ({", ".join(["%s"] * len(slugs))})'
+    mask = (f'(SELECT coalesce(sum(mask), 0) FROM {genre} '
+            f'WHERE {in_slugs})')
+    linked = (f'SELECT link.title_id FROM {through} link JOIN {genre} '
+              f'ON {genre}.id = link.genre_id '
+              f'WHERE {in_slugs} AND {genre}.mask IS NULL')
+    if mode != 'all':
+        return (f'(({title}.genre_mask & {mask}) != 0 '
+                f'OR {title}.id IN ({linked}))'), slugs * 2
+    unmasked = (f'(SELECT count(*) FROM {genre} '
+                f'WHERE {in_slugs} AND {genre}.mask IS NULL)')
+    return (
+        f'((SELECT count(*) FROM {genre} WHERE {in_slugs}) = {len(slugs)} '
+        f'AND ({title}.genre_mask & {mask}) = {mask} '
+        f'AND ({unmasked} = 0 OR {title}.id IN ({linked} '
+        f'GROUP BY link.title_id HAVING count(*) = {unmasked})))'
+    ), slugs * 6
+
+
+class StableOrderingFilter(filters.OrderingFilter):
+    """
+    Ordering ended by id in direction of the last field, so pages of
+    equal values do not overlap and indexes, which end with id in
+    SQLite, serve the whole ordering.
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        ordering = [self.get_ordering_value(param) for param in value]
+        return qs.order_by(
+            *ordering, '-id' if ordering[-1].startswith('-') else 'id')
 
 
 class TitleFilter(filters.FilterSet):
-    genre = filters.CharFilter(field_name='genre__slug')
+    genre = filters.CharFilter(method='filter_genre')
+    genre_mode = filters.ChoiceFilter(
+        choices=GENRE_MODES, method='filter_genre_mode')
     category = filters.CharFilter(field_name='category__slug')
     name = filters.CharFilter(field_name='name', lookup_expr='icontains')
+    search = filters.CharFilter(method='filter_search')
+    ordering = StableOrderingFilter(fields=(
+        ('rating', 'rating'),
+        ('year', 'year'),
+        ('rating_count', 'reviews'),
+        ('name', 'name'),
+    ))
 
     class Meta:
         model = Title
-        fields = ('genre', 'category', 'name', 'year')
+        fields = ('genre', 'genre_mode', 'category', 'name', 'year', 'search',
+                  'ordering')
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Filter by comma separated genre slugs, titles need any of them
+        or all of them depending on genre_mode.
+        """
+        slugs = list(dict.fromkeys(
+            slug for slug in map(str.strip, value.split(',')) if slug))
+        if not slugs:
+            return queryset
+        condition, params = genre_condition(
+            slugs, self.form.cleaned_data.get('genre_mode'))
+        return queryset.extra(where=(condition,), params=params)
+
+    def filter_genre_mode(self, queryset, name, value):
+        # Applied by filter_genre.
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Subquery
+
+from .models import Category, Genre, LeaderboardEntry, Title
+
+SCOPE_MODELS = {
+    LeaderboardEntry.CATEGORY: Category,
+    LeaderboardEntry.GENRE: Genre,
+}
+
+
+def weighted_score(rating_sum, rating_count):
+    """
+    Mean score after adding TOP_TITLES_PRIOR_COUNT reviews with
+    TOP_TITLES_PRIOR_SCORE, so a few reviews move a title little.
+    """
+    prior_count = settings.TOP_TITLES_PRIOR_COUNT
+    return ((rating_sum + prior_count * settings.TOP_TITLES_PRIOR_SCORE)
+            / (rating_count + prior_count))
+
+
+def title_scopes(titles):
+    """
+    Map ids of (title id, category id) pairs to lists they are in:
+    of all titles, of their category and of every genre.
+    """
+    scopes = {}
+    for title_id, category_id in titles:
+        scopes[title_id] = [(LeaderboardEntry.ALL, 0)]
+        if category_id is not None:
+            scopes[title_id].append((LeaderboardEntry.CATEGORY, category_id))
+    links = Title.genre.through.objects.filter(
+        title_id__in=list(scopes)).values_list('title_id', 'genre_id')
+    for title_id, genre_id in links:
+        scopes[title_id].append((LeaderboardEntry.GENRE, genre_id))
+    return scopes
+
+
+def build_entries(title_ids):
+    """
+    Entries of reviewed titles: in leaderboard of all titles, of their
+    category and of every genre.
+    """
+    rows = list(Title.objects.filter(
+        pk__in=title_ids, rating_count__gt=0,
+    ).values_list('pk', 'category_id', 'rating_sum', 'rating_count'))
+    if not rows:
+        return []
+    scopes = title_scopes(row[:2] for row in rows)
+    entries = []
+    for title_id, category_id, rating_sum, rating_count in rows:
+        score = weighted_score(rating_sum, rating_count)
+        entries.extend(
+            LeaderboardEntry(kind=kind, scope_id=scope_id,
+                             title_id=title_id, score=score)
+            for kind, scope_id in scopes[title_id])
+    return entries
+
+
+def refresh_leaderboard(title_ids):
+    """
+    Replace entries of given titles after their reviews, category
+    or genres changed.
+    """
+    title_ids = set(title_ids)
+    if not title_ids:
+        return
+    with transaction.atomic():
+        entries = build_entries(title_ids)
+        LeaderboardEntry.objects.filter(title_id__in=title_ids).delete()
+        LeaderboardEntry.objects.bulk_create(entries)
+
+
+def rebuild_leaderboard(batch_size=1000):
+    """
+    Build all leaderboards anew in one transaction, readers see
+    the old ones until commit. Return number of ranked titles.
+    """
+    title_ids = Title.objects.filter(rating_count__gt=0).order_by(
+        'pk').values_list('pk', flat=True)
+    last_id = 0
+    total = 0
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        while True:
+            batch = list(title_ids.filter(pk__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1]
+            LeaderboardEntry.objects.bulk_create(build_entries(batch))
+            total += len(batch)
+    return total
+
+
+def scope_id_of(kind, slug):
+    """
+    Subquery of category or genre id by slug, 0 for list of all titles.
+    """
+    if kind == LeaderboardEntry.ALL:
+        return 0
+    return Subquery(
+        SCOPE_MODELS[kind].objects.filter(slug=slug).values('pk')[:1])
+
+
+def top_titles(queryset, kind=LeaderboardEntry.ALL, slug=None, limit=10):
+    """
+    Best titles of leaderboard by weighted rating, annotated with
+    score. One range scan of the leaderboard index, the category or
+    genre is found by subquery.
+    """
+    return queryset.filter(
+        leaderboard_entries__kind=kind,
+        leaderboard_entries__scope_id=scope_id_of(kind, slug),
+    ).annotate(
+        score=F('leaderboard_entries__score'),
+    ).order_by(
+        '-leaderboard_entries__score', '-leaderboard_entries__id',
+    )[:limit]
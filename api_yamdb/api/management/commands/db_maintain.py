@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = ('Обслуживание базы SQLite: ANALYZE, инкрементальный VACUUM '
+            'и контрольная точка WAL.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Алиас базы данных.')
+        parser.add_argument(
+            '--vacuum-pages', type=int, default=0,
+            help='Сколько свободных страниц вернуть, 0 - все.')
+        parser.add_argument(
+            '--full-vacuum', action='store_true',
+            help='Перевести базу в auto_vacuum=INCREMENTAL полным VACUUM.')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда работает только с SQLite')
+        with connection.cursor() as cursor:
+            self.cursor = cursor
+            self.step('ANALYZE', 'ANALYZE')
+            auto_vacuum = self.fetch('PRAGMA auto_vacuum')
+            if options['full_vacuum']:
+                self.fetch('PRAGMA auto_vacuum = INCREMENTAL')
+                self.step('VACUUM', 'VACUUM')
+            elif auto_vacuum == 2:
+                freelist = self.fetch('PRAGMA freelist_count')
+                pages = options['vacuum_pages'] or ''
+                self.step(f'incremental vacuum, свободных страниц {freelist}',
+                          f'PRAGMA incremental_vacuum({pages})')
+            else:
+                self.stdout.write(
+                    'incremental vacuum пропущен: auto_vacuum выключен, '
+                    'используйте --full-vacuum')
+            if self.fetch('PRAGMA journal_mode') == 'wal':
+                self.step('WAL checkpoint',
+                          'PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def fetch(self, sql):
+        self.cursor.execute(sql)
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
+    def step(self, title, sql):
+        started = time.monotonic()
+        self.cursor.execute(sql)
+        self.cursor.fetchall()
+        elapsed = (time.monotonic() - started) * 1000
+        self.stdout.write(f'{title}: {elapsed:.1f} мс')
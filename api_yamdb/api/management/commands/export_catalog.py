@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from api.export import EXPORT_CHUNK_SIZE, export_catalog
+
+
+class Command(BaseCommand):
+    help = 'Выгружает произведения с отзывами в формате NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since', type=int, default=0,
+            help='Выгрузить только произведения с id больше указанного.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+            help='Количество произведений в одном запросе к базе.')
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout.')
+
+    def handle(self, *args, **options):
+        parts = export_catalog(options['since'], options['chunk_size'])
+        if not options['output']:
+            # Lines are written in parts, newlines come with the data.
+            self.stdout.ending = ''
+            self.write_parts(parts, self.stdout)
+            return
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            self.write_parts(parts, output)
+
+    @staticmethod
+    def write_parts(parts, output):
+        for part in parts:
+            output.write(part)
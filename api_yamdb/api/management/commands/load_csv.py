@@ -0,0 +1,183 @@
+import csv
+import os
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from api.caching import get_response_cache
+from api.catalog import catalog_index
+from api.models import Category, Comment, Genre, Review, Title, User
+
+DEFAULT_PATH = os.path.join(os.path.dirname(settings.BASE_DIR), 'data')
+
+
+def optional_int(value):
+    return int(value) if value else None
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """
+    Let bulk_create save pub_date from file instead of current time.
+    """
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def user_from_row(row):
+    user = User(
+        id=int(row['id']), username=row['username'], email=row['email'],
+        role=row['role'] or User.USER, bio=row['description'],
+        first_name=row['first_name'], last_name=row['last_name'])
+    user.set_unusable_password()
+    return user
+
+
+def category_from_row(row):
+    return Category(id=int(row['id']), name=row['name'], slug=row['slug'])
+
+
+def genre_from_row(row):
+    return Genre(id=int(row['id']), name=row['name'], slug=row['slug'])
+
+
+def title_from_row(row):
+    return Title(
+        id=int(row['id']), name=row['name'],
+        year=optional_int(row['year']),
+        category_id=optional_int(row['category']))
+
+
+def genre_title_from_row(row):
+    return Title.genre.through(
+        id=int(row['id']), title_id=int(row['title_id']),
+        genre_id=int(row['genre_id']))
+
+
+def review_from_row(row):
+    return Review(
+        id=int(row['id']), title_id=int(row['title_id']), text=row['text'],
+        author_id=int(row['author']), score=int(row['score']),
+        pub_date=parse_datetime(row['pub_date']))
+
+
+def comment_from_row(row):
+    return Comment(
+        id=int(row['id']), review_id=int(row['review_id']), text=row['text'],
+        author_id=int(row['author']),
+        pub_date=parse_datetime(row['pub_date']))
+
+
+# File, model, row converter and foreign keys checked against id maps.
+SOURCES = (
+    ('users.csv', User, user_from_row, {}),
+    ('category.csv', Category, category_from_row, {}),
+    ('genre.csv', Genre, genre_from_row, {}),
+    ('titles.csv', Title, title_from_row, {'category_id': Category}),
+    ('genre_title.csv', Title.genre.through, genre_title_from_row,
+     {'title_id': Title, 'genre_id': Genre}),
+    ('review.csv', Review, review_from_row,
+     {'title_id': Title, 'author_id': User}),
+    ('comments.csv', Comment, comment_from_row,
+     {'review_id': Review, 'author_id': User}),
+)
+
+
+class Command(BaseCommand):
+    help = ('Загружает данные из csv файлов. Строки с уже существующими '
+            'id пропускаются, поэтому загрузку можно повторить.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=DEFAULT_PATH,
+            help='Папка с csv файлами.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество строк в одной транзакции.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.isdir(path):
+            raise CommandError(f'Папка {path} не найдена')
+        self.batch_size = options['batch_size']
+        self.id_maps = {}
+        for filename, model, from_row, foreign_keys in SOURCES:
+            file_path = os.path.join(path, filename)
+            if not os.path.exists(file_path):
+                self.stdout.write(f'{filename}: файл не найден, пропущен')
+                continue
+            with keep_auto_now_add(model):
+                self.load_file(file_path, model, from_row, foreign_keys)
+        # bulk_create skips signals, so cached lists are dropped and
+        # genre masks and stored ratings are rebuilt here.
+        get_response_cache('categories').invalidate()
+        get_response_cache('genres').invalidate()
+        Genre.assign_masks()
+        Title.rebuild_genre_masks()
+        catalog_index.changed()
+        call_command('rebuild_ratings', batch_size=self.batch_size,
+                     stdout=self.stdout)
+        call_command('rebuild_leaderboard', batch_size=self.batch_size,
+                     stdout=self.stdout)
+        call_command('rebuild_trending', batch_size=self.batch_size,
+                     stdout=self.stdout)
+
+    def get_id_map(self, model):
+        if model not in self.id_maps:
+            self.id_maps[model] = set(
+                model.objects.values_list('pk', flat=True).iterator())
+        return self.id_maps[model]
+
+    @staticmethod
+    def has_missing_keys(obj, fk_maps):
+        for field, ids in fk_maps.items():
+            value = getattr(obj, field)
+            if value is not None and value not in ids:
+                return True
+        return False
+
+    def load_file(self, file_path, model, from_row, foreign_keys):
+        started = time.monotonic()
+        loaded = skipped = 0
+        known_ids = self.get_id_map(model)
+        fk_maps = {
+            field: self.get_id_map(related)
+            for field, related in foreign_keys.items()
+        }
+        with open(file_path, encoding='utf-8', newline='') as csv_file:
+            rows = csv.DictReader(csv_file)
+            for chunk in iter(lambda: list(islice(rows, self.batch_size)), []):
+                batch = []
+                for row in chunk:
+                    obj = from_row(row)
+                    if obj.pk in known_ids or self.has_missing_keys(
+                            obj, fk_maps):
+                        skipped += 1
+                        continue
+                    batch.append(obj)
+                with transaction.atomic():
+                    model.objects.bulk_create(batch, ignore_conflicts=True)
+                    # Rows rejected by unique constraints are not known ids.
+                    inserted = model.objects.filter(
+                        pk__in=[obj.pk for obj in batch]).values_list(
+                            'pk', flat=True)
+                    known_ids.update(inserted)
+                loaded += len(inserted)
+                skipped += len(batch) - len(inserted)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{os.path.basename(file_path)}: загружено {loaded}, '
+            f'пропущено {skipped}, {loaded / max(elapsed, 1e-6):.0f} строк/с')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from api.caching import title_cache
+from api.leaderboard import rebuild_leaderboard
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает рейтинги лучших произведений по сохраненным '
+            'оценкам, например после изменения TOP_TITLES_PRIOR_*.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество произведений в одном запросе.')
+
+    def handle(self, *args, **options):
+        total = rebuild_leaderboard(options['batch_size'])
+        title_cache.invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            f'В рейтингах произведений: {total}'))
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from api.autocomplete import autocomplete_index
+from api.caching import title_cache
+from api.catalog import catalog_index
+from api.models import RATING_EXPRESSION, Review, Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохраненные рейтинги произведений по отзывам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество произведений в одной транзакции.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        title_ids = Title.objects.order_by('pk').values_list('pk', flat=True)
+        last_id = 0
+        fixed = total = 0
+        while True:
+            batch = list(title_ids.filter(pk__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1]
+            with transaction.atomic():
+                fixed += self.rebuild_batch(batch)
+            total += len(batch)
+        # Bulk updates bypass signals, cached titles are dropped at once.
+        title_cache.invalidate()
+        autocomplete_index.expire()
+        catalog_index.changed()
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено произведений: {total}, исправлено: {fixed}'))
+
+    def rebuild_batch(self, batch):
+        aggregates = {
+            row['title_id']: (row['score_sum'], row['score_count'])
+            for row in Review.objects.filter(title_id__in=batch)
+            .values('title_id').order_by()
+            .annotate(score_sum=Sum('score'), score_count=Count('id'))
+        }
+        titles = Title.objects.select_for_update().filter(
+            pk__in=batch).only('rating_sum', 'rating_count')
+        changed = []
+        for title in titles:
+            rating_sum, rating_count = aggregates.get(title.pk, (0, 0))
+            if (title.rating_sum, title.rating_count) == (
+                    rating_sum, rating_count):
+                continue
+            title.rating_sum = rating_sum
+            title.rating_count = rating_count
+            changed.append(title)
+        Title.objects.bulk_update(changed, ('rating_sum', 'rating_count'))
+        # Average is recalculated for the whole batch to repair
+        # drift of the derived column as well.
+        Title.objects.filter(pk__in=batch).update(rating=RATING_EXPRESSION)
+        return len(changed)
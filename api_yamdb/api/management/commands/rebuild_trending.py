@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from api.trending import rebuild_trending
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает активность произведений по датам отзывов и '
+            'комментариев и удаляет из популярного угасшие произведения.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество произведений в одном запросе.')
+
+    def handle(self, *args, **options):
+        total = rebuild_trending(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'В популярном произведений: {total}'))
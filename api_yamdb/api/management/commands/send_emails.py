@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.outbox import send_pending
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящих писем.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Количество писем, забираемых из очереди за раз.')
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Количество потоков отправки.')
+        parser.add_argument(
+            '--max-attempts', type=int, default=5,
+            help='Максимальное количество попыток отправки письма.')
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Отправить доступные письма и завершиться.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_pending(
+                options['batch_size'], options['workers'],
+                options['max_attempts'])
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено: {sent}, ошибок: {failed}')
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,64 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import start_request_metrics, stop_request_metrics
+
+logger = logging.getLogger('api.metrics')
+
+
+class RequestMetricsMiddleware:
+    """
+    Count queries and time of database, serializers and whole view
+    for each request. Results are sent in Server-Timing header and
+    logged by route name, requests over thresholds are warnings.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics, token = start_request_metrics()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            stop_request_metrics(token)
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = metrics.db_time * 1000
+        serializer_ms = metrics.serializer_time * 1000
+        write_wait_ms = metrics.write_wait * 1000
+
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={db_ms:.2f};desc="{metrics.queries} queries"',
+            f'serializer;dur={serializer_ms:.2f}',
+            f'write-queue;dur={write_wait_ms:.2f}',
+            f'total;dur={total_ms:.2f}',
+        ))
+        thresholds = settings.REQUEST_METRICS_THRESHOLDS
+        slow = (metrics.queries > thresholds['QUERIES']
+                or db_ms > thresholds['DB_MS']
+                or total_ms > thresholds['TOTAL_MS'])
+        match = request.resolver_match
+        fields = {
+            'route': match.url_name if match else None,
+            'method': request.method,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'db_ms': round(db_ms, 2),
+            'serializer_ms': round(serializer_ms, 2),
+            'write_wait_ms': round(write_wait_ms, 2),
+            'total_ms': round(total_ms, 2),
+            'slow': slow,
+        }
+        logger.log(
+            logging.WARNING if slow else logging.INFO,
+            ' '.join(f'{key}={value}' for key, value in fields.items()),
+            extra={'metrics': fields})
+        return response
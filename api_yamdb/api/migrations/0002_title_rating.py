@@ -0,0 +1,42 @@
+# Generated by Django 2.2.6 on 2026-10-18 04:18
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_ratings(apps, schema_editor):
+    Title = apps.get_model('api', 'Title')
+    Review = apps.get_model('api', 'Review')
+    aggregates = (Review.objects.values('title_id').order_by()
+                  .annotate(score_sum=Sum('score'), score_count=Count('id')))
+    for row in aggregates.iterator():
+        Title.objects.filter(pk=row['title_id']).update(
+            rating_sum=row['score_sum'],
+            rating_count=row['score_count'],
+            rating=row['score_sum'] / row['score_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=4, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+# External content FTS5 index of title name and description, kept in
+# sync by triggers, so bulk inserts and raw updates are indexed too.
+CREATE_SQL = (
+    """
+    CREATE VIRTUAL TABLE api_title_search USING fts5(
+        name, description, content='api_title', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2')
+    """,
+    """
+    CREATE TRIGGER api_title_search_insert AFTER INSERT ON api_title BEGIN
+        INSERT INTO api_title_search(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER api_title_search_delete AFTER DELETE ON api_title BEGIN
+        INSERT INTO api_title_search(api_title_search, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER api_title_search_update
+    AFTER UPDATE OF name, description ON api_title BEGIN
+        INSERT INTO api_title_search(api_title_search, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO api_title_search(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO api_title_search(api_title_search) VALUES ('rebuild')",
+)
+DROP_SQL = (
+    'DROP TRIGGER IF EXISTS api_title_search_insert',
+    'DROP TRIGGER IF EXISTS api_title_search_delete',
+    'DROP TRIGGER IF EXISTS api_title_search_update',
+    'DROP TABLE IF EXISTS api_title_search',
+)
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        # Other backends fall back to icontains search, see api.search.
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_sqlite(CREATE_SQL),
+                             run_on_sqlite(DROP_SQL)),
+    ]
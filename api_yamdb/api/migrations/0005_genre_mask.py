@@ -0,0 +1,61 @@
+# Generated by Django 2.2.6 on 2026-10-18 05:00
+
+from importlib import import_module
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+GENRE_MASK_BITS = 63
+title_search = import_module('api.migrations.0004_title_search')
+# SQLite alters api_title by copying it to a new table, which drops
+# triggers of the search index, so they are created again.
+TRIGGER_NAMES = ('api_title_search_insert', 'api_title_search_delete',
+                 'api_title_search_update')
+TRIGGER_SQL = tuple(
+    f'DROP TRIGGER IF EXISTS {name}' for name in TRIGGER_NAMES
+) + title_search.CREATE_SQL[1:4]
+restore_search_triggers = title_search.run_on_sqlite(TRIGGER_SQL)
+
+
+def fill_genre_masks(apps, schema_editor):
+    Genre = apps.get_model('api', 'Genre')
+    Title = apps.get_model('api', 'Title')
+    genres = Genre.objects.order_by('pk')[:GENRE_MASK_BITS]
+    for bit, genre in enumerate(genres):
+        Genre.objects.filter(pk=genre.pk).update(mask=1 << bit)
+    masks = Title.genre.through.objects.filter(
+        title_id=OuterRef('pk'), genre__mask__isnull=False,
+    ).order_by().values('title_id').annotate(
+        total=Sum('genre__mask')).values('total')
+    Title.objects.update(genre_mask=Coalesce(
+        Subquery(masks, output_field=models.BigIntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_title_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop,
+                             restore_search_triggers),
+        migrations.AddField(
+            model_name='genre',
+            name='mask',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, unique=True, verbose_name='Бит в маске жанров'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='genre_mask',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Маска жанров'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['genre_mask'], name='api_title_genre_m_84a20f_idx'),
+        ),
+        migrations.RunPython(restore_search_triggers,
+                             migrations.RunPython.noop),
+        migrations.RunPython(fill_genre_masks, migrations.RunPython.noop),
+    ]
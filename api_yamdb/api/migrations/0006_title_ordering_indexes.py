@@ -0,0 +1,21 @@
+# Generated by Django 2.2.6 on 2026-10-18 05:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_genre_mask'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating'], name='api_title_rating_a4022a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating_count'], name='api_title_rating__8958d9_idx'),
+        ),
+    ]
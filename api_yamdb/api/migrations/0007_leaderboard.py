@@ -0,0 +1,59 @@
+# Generated by Django 2.2.6 on 2026-10-18 05:39
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_leaderboard(apps, schema_editor):
+    Title = apps.get_model('api', 'Title')
+    LeaderboardEntry = apps.get_model('api', 'LeaderboardEntry')
+    prior_count = settings.TOP_TITLES_PRIOR_COUNT
+    prior_sum = prior_count * settings.TOP_TITLES_PRIOR_SCORE
+    genres = {}
+    for title_id, genre_id in Title.genre.through.objects.values_list(
+            'title_id', 'genre_id').iterator():
+        genres.setdefault(title_id, []).append(genre_id)
+    entries = []
+    titles = Title.objects.filter(rating_count__gt=0).values_list(
+        'pk', 'category_id', 'rating_sum', 'rating_count')
+    for title_id, category_id, rating_sum, rating_count in titles.iterator():
+        score = (rating_sum + prior_sum) / (rating_count + prior_count)
+        scopes = [('all', 0)]
+        if category_id is not None:
+            scopes.append(('category', category_id))
+        scopes.extend(('genre', genre_id) for genre_id in genres.get(title_id, ()))
+        entries.extend(
+            LeaderboardEntry(kind=kind, scope_id=scope_id,
+                             title_id=title_id, score=score)
+            for kind, scope_id in scopes)
+    LeaderboardEntry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_title_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('all', 'Все произведения'), ('category', 'Категория'), ('genre', 'Жанр')], max_length=8, verbose_name='Вид')),
+                ('scope_id', models.PositiveIntegerField(default=0, verbose_name='Категория или жанр')),
+                ('score', models.FloatField(verbose_name='Взвешенный рейтинг')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='api.Title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Позиция в рейтинге',
+                'verbose_name_plural': 'Позиции в рейтинге',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['kind', 'scope_id', 'score'], name='api_leaderb_kind_a922e0_idx'),
+        ),
+        migrations.RunPython(fill_leaderboard, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 2.2.6 on 2026-10-18 05:50
+
+import math
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def fill_trending(apps, schema_editor):
+    Title = apps.get_model('api', 'Title')
+    Review = apps.get_model('api', 'Review')
+    Comment = apps.get_model('api', 'Comment')
+    TrendingEntry = apps.get_model('api', 'TrendingEntry')
+    now = timezone.now()
+    rate = math.log(2) / settings.TRENDING_HALF_LIFE
+    scores = {}
+    events = (
+        (Review.objects.values_list('title_id', 'pub_date'),
+         settings.TRENDING_REVIEW_WEIGHT),
+        (Comment.objects.values_list('review__title_id', 'pub_date'),
+         settings.TRENDING_COMMENT_WEIGHT),
+    )
+    for rows, weight in events:
+        for title_id, pub_date in rows.iterator():
+            scores[title_id] = scores.get(title_id, 0) + weight * math.exp(
+                -rate * (now - pub_date).total_seconds())
+    scores = {title_id: score for title_id, score in scores.items()
+              if score >= settings.TRENDING_MIN_SCORE}
+    genres = {}
+    for title_id, genre_id in Title.genre.through.objects.values_list(
+            'title_id', 'genre_id').iterator():
+        genres.setdefault(title_id, []).append(genre_id)
+    entries = []
+    titles = Title.objects.values_list('pk', 'category_id')
+    for title_id, category_id in titles.iterator():
+        if title_id not in scores:
+            continue
+        score = scores[title_id]
+        rank = math.log(score) + rate * now.timestamp()
+        scopes = [('all', 0)]
+        if category_id is not None:
+            scopes.append(('category', category_id))
+        scopes.extend(('genre', genre_id) for genre_id in genres.get(title_id, ()))
+        entries.extend(
+            TrendingEntry(kind=kind, scope_id=scope_id, title_id=title_id,
+                          score=score, updated_at=now, rank=rank)
+            for kind, scope_id in scopes)
+    TrendingEntry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_leaderboard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('all', 'Все произведения'), ('category', 'Категория'), ('genre', 'Жанр')], max_length=8, verbose_name='Вид')),
+                ('scope_id', models.PositiveIntegerField(default=0, verbose_name='Категория или жанр')),
+                ('score', models.FloatField(verbose_name='Активность')),
+                ('updated_at', models.DateTimeField(verbose_name='Время расчета активности')),
+                ('rank', models.FloatField(verbose_name='Порядок')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trending_entries', to='api.Title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Позиция в популярном',
+                'verbose_name_plural': 'Позиции в популярном',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='trendingentry',
+            index=models.Index(fields=['kind', 'scope_id', 'rank'], name='api_trendin_kind_a17d7e_idx'),
+        ),
+        migrations.RunPython(fill_trending, migrations.RunPython.noop),
+    ]
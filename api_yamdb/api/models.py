@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -62,9 +64,17 @@ class Category(models.Model):
         return self.name
 
 
+# Genres get bits of Title.genre_mask while they last, sign bit is
+# not used. Genres without bit are filtered through the M2M table.
+GENRE_MASK_BITS = 63
+
+
 class Genre(models.Model):
     name = models.CharField('Название', max_length=64)
     slug = models.SlugField('Slug', unique=True)
+    mask = models.BigIntegerField(
+        'Бит в маске жанров', unique=True, null=True, blank=True,
+        editable=False)
 
     class Meta:
         verbose_name = 'Жанр'
@@ -74,6 +84,31 @@ class Genre(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def free_masks(cls):
+        used = set(cls.objects.exclude(mask=None).values_list(
+            'mask', flat=True))
+        return [1 << bit for bit in range(GENRE_MASK_BITS)
+                if 1 << bit not in used]
+
+    @classmethod
+    def assign_masks(cls):
+        """
+        Give free bits to genres without them, for example created
+        by bulk_create that sends no signals.
+        """
+        genres = list(cls.objects.filter(mask=None).order_by('pk'))
+        for genre, mask in zip(genres, cls.free_masks()):
+            genre.mask = mask
+        cls.objects.bulk_update(genres, ('mask',))
+
+
+RATING_EXPRESSION = models.Case(
+    models.When(rating_count=0, then=models.Value(None)),
+    default=(Cast('rating_sum', models.FloatField())
+             / models.F('rating_count')),
+    output_field=models.DecimalField(max_digits=4, decimal_places=2))
+
 
 class Title(models.Model):
     name = models.CharField('Название', max_length=64)
@@ -92,6 +127,15 @@ class Title(models.Model):
         verbose_name='Жанр')
     year = models.PositiveSmallIntegerField(
         'Год создания', null=True, blank=True)
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок', default=0, editable=False)
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок', default=0, editable=False)
+    rating = models.DecimalField(
+        'Рейтинг', max_digits=4, decimal_places=2,
+        null=True, blank=True, editable=False)
+    genre_mask = models.BigIntegerField(
+        'Маска жанров', default=0, editable=False)
 
     class Meta:
         verbose_name = 'Произведение'
@@ -101,11 +145,42 @@ class Title(models.Model):
             models.Index(fields=('category',)),
             models.Index(fields=('name',)),
             models.Index(fields=('year',)),
+            models.Index(fields=('genre_mask',)),
+            models.Index(fields=('rating',)),
+            models.Index(fields=('rating_count',)),
         ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def apply_score_delta(cls, title_id, score_delta, count_delta):
+        """
+        Shift stored rating aggregates of title by given deltas
+        and recalculate average from updated columns.
+        """
+        titles = cls.objects.filter(pk=title_id)
+        titles.update(
+            rating_sum=models.F('rating_sum') + score_delta,
+            rating_count=models.F('rating_count') + count_delta)
+        titles.update(rating=RATING_EXPRESSION)
+
+    @classmethod
+    def rebuild_genre_masks(cls, title_ids=None):
+        """
+        Recalculate genre_mask of given or all titles from their genres.
+        """
+        masks = cls.genre.through.objects.filter(
+            title_id=models.OuterRef('pk'), genre__mask__isnull=False,
+        ).order_by().values('title_id').annotate(
+            total=models.Sum('genre__mask')).values('total')
+        titles = cls.objects.all()
+        if title_ids is not None:
+            titles = titles.filter(pk__in=title_ids)
+        titles.update(genre_mask=Coalesce(
+            models.Subquery(masks, output_field=models.BigIntegerField()),
+            0))
+
 
 class Review(models.Model):
     title = models.ForeignKey(
@@ -145,6 +220,83 @@ class Review(models.Model):
     def __str__(self):
         return self.text[:25]
 
+    def save(self, *args, **kwargs):
+        # Title rating aggregates are maintained by signal receivers,
+        # keep them in one transaction with review row.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class ScopedEntry(models.Model):
+    """
+    Row of title in a list of all titles, of a category or of a genre.
+    """
+    ALL = 'all'
+    CATEGORY = 'category'
+    GENRE = 'genre'
+    KINDS = (
+        (ALL, 'Все произведения'),
+        (CATEGORY, 'Категория'),
+        (GENRE, 'Жанр'),
+    )
+
+    kind = models.CharField('Вид', max_length=8, choices=KINDS)
+    scope_id = models.PositiveIntegerField(
+        'Категория или жанр', default=0)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f'{self.kind} {self.scope_id}: {self.title_id}'
+
+
+class LeaderboardEntry(ScopedEntry):
+    """
+    Weighted rating of reviewed title in one leaderboard: of all titles,
+    of a category or of a genre. Maintained by api.leaderboard.
+    """
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries',
+        verbose_name='Произведение'
+    )
+    score = models.FloatField('Взвешенный рейтинг')
+
+    class Meta:
+        verbose_name = 'Позиция в рейтинге'
+        verbose_name_plural = 'Позиции в рейтинге'
+        # Ties are ordered by id, which SQLite appends to the index.
+        indexes = [
+            models.Index(fields=('kind', 'scope_id', 'score')),
+        ]
+
+
+class TrendingEntry(ScopedEntry):
+    """
+    Recent review and comment activity of title in one trending list.
+    Score decays exponentially since updated_at, rank is its logarithm
+    moved to the epoch: it does not change with time and orders titles
+    by current activity. Maintained by api.trending.
+    """
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='trending_entries',
+        verbose_name='Произведение'
+    )
+    score = models.FloatField('Активность')
+    updated_at = models.DateTimeField('Время расчета активности')
+    rank = models.FloatField('Порядок')
+
+    class Meta:
+        verbose_name = 'Позиция в популярном'
+        verbose_name_plural = 'Позиции в популярном'
+        indexes = [
+            models.Index(fields=('kind', 'scope_id', 'rank')),
+        ]
+
 
 class Comment(models.Model):
     review = models.ForeignKey(
@@ -172,3 +324,27 @@ class Comment(models.Model):
 
     def __str__(self):
         return self.text[:25]
+
+
+class OutgoingEmail(models.Model):
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель')
+    to = models.EmailField('Получатель')
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('id',)
+        indexes = [
+            models.Index(fields=('sent_at', 'next_attempt_at')),
+        ]
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def queue_email(subject, body, to):
+    """
+    Put email to outbox, it is sent by `send_emails` command.
+    Call inside the transaction of the change that caused it.
+    """
+    return OutgoingEmail.objects.create(
+        subject=subject, body=body,
+        from_email=settings.FROM_EMAIL, to=to)
+
+
+def retry_delay(attempts):
+    delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_MAX_DELAY))
+
+
+def send_chunk(emails):
+    """
+    Send emails through one connection.
+    Return list of (email, error) pairs, error is None on success.
+    """
+    results = []
+    with get_connection() as connection:
+        for email in emails:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email, (email.to,),
+                connection=connection)
+            try:
+                message.send()
+            except Exception as error:
+                results.append((email, repr(error)))
+            else:
+                results.append((email, None))
+    return results
+
+
+def claim_batch(batch_size, max_attempts):
+    """
+    Take due emails and move their next attempt forward,
+    so another worker does not pick them while they are sent.
+    """
+    now = timezone.now()
+    ids = list(OutgoingEmail.objects.filter(
+        sent_at__isnull=True, attempts__lt=max_attempts,
+        next_attempt_at__lte=now).values_list('id', flat=True)[:batch_size])
+    lease = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+    OutgoingEmail.objects.filter(
+        id__in=ids, next_attempt_at__lte=now).update(next_attempt_at=lease)
+    return list(OutgoingEmail.objects.filter(
+        id__in=ids, next_attempt_at=lease))
+
+
+def send_pending(batch_size=100, workers=4, max_attempts=5):
+    """
+    Send one batch of due emails with a pool of threads.
+    Database is touched only from the calling thread.
+    Return (sent, failed) counters.
+    """
+    emails = claim_batch(batch_size, max_attempts)
+    if not emails:
+        return 0, 0
+    chunks = [emails[i::workers] for i in range(workers) if emails[i::workers]]
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        results = [pair for chunk in executor.map(send_chunk, chunks)
+                   for pair in chunk]
+    sent = failed = 0
+    now = timezone.now()
+    for email, error in results:
+        email.attempts += 1
+        if error is None:
+            email.sent_at = now
+            email.last_error = ''
+            sent += 1
+        else:
+            email.next_attempt_at = now + retry_delay(email.attempts)
+            email.last_error = error
+            failed += 1
+    OutgoingEmail.objects.bulk_update(
+        [email for email, _ in results],
+        ('attempts', 'sent_at', 'next_attempt_at', 'last_error'))
+    return sent, failed
@@ -0,0 +1,25 @@
+from rest_framework.pagination import CursorPagination
+
+from django.conf import settings
+
+PAGINATION_PARAM = 'pagination'
+CURSOR_MODE = 'cursor'
+
+
+def cursor_pagination_requested(request):
+    """
+    Cursor mode is chosen by `?pagination=cursor`, by the cursor
+    of a previous page or by PAGINATION_MODE setting.
+    """
+    params = request.query_params
+    if CursorPagination.cursor_query_param in params:
+        return True
+    mode = params.get(PAGINATION_PARAM, settings.PAGINATION_MODE)
+    return mode == CURSOR_MODE
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination on primary key, page N costs as page 1.
+    """
+    ordering = '-id'
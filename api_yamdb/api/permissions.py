@@ -37,3 +37,14 @@ class IsAdminModeratorAuthorOrCanCreateOrReadOnly(permissions.BasePermission):
         return (request.user == obj.author
                 or request.user.is_administrator
                 or request.user.is_moderator)
+
+    @staticmethod
+    def restrict_queryset(request, queryset):
+        """
+        Same rule as has_object_permission for unsafe methods,
+        applied as a filter, so it runs inside UPDATE or DELETE.
+        """
+        user = request.user
+        if user.is_administrator or user.is_moderator:
+            return queryset
+        return queryset.filter(author_id=user.pk)
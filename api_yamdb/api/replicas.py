@@ -0,0 +1,125 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework import permissions
+
+# Replica chosen for reads of current request, None means primary.
+_replica_alias = ContextVar('replica_alias', default=None)
+# Replicas read inside recorded_replica_reads() block.
+_replica_reads = ContextVar('replica_reads', default=None)
+
+
+def pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """
+    Read from primary for a while after user's write,
+    so the user sees own changes before replicas catch up.
+    """
+    cache.set(pin_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def start_replica_reads(request):
+    """
+    Route reads of safe request to a replica, unless the user
+    has written recently. Return token for stop_replica_reads.
+    """
+    replicas = settings.DATABASE_REPLICAS
+    if not replicas or request.method not in permissions.SAFE_METHODS:
+        return None
+    user = request.user
+    if user.is_authenticated and cache.get(pin_key(user.pk)):
+        return None
+    return _replica_alias.set(random.choice(replicas))
+
+
+def stop_replica_reads(token):
+    if token is not None:
+        _replica_alias.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """
+    Read from primary inside block, e.g. to fill caches shared
+    with users who have to see their own writes.
+    """
+    token = _replica_alias.set(None)
+    try:
+        yield
+    finally:
+        _replica_alias.reset(token)
+
+
+@contextmanager
+def recorded_replica_reads():
+    """
+    Yield set of replicas read inside block, empty when everything
+    was read from primary.
+    """
+    aliases = set()
+    token = _replica_reads.set(aliases)
+    try:
+        yield aliases
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Reads inside ReplicaReadMixin views go to the replica chosen for
+    request, everything else goes to primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _replica_alias.get()
+        if alias is None:
+            return DEFAULT_DB_ALIAS
+        reads = _replica_reads.get()
+        if reads is not None:
+            reads.add(alias)
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = (DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS)
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe requests of viewset from replicas,
+    pin author of successful write to primary.
+    """
+
+    replica_token = None
+
+    def dispatch(self, request, *args, **kwargs):
+        # Unhandled errors skip finalize_response, reset routing anyway.
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            stop_replica_reads(self.replica_token)
+            self.replica_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.replica_token = start_replica_reads(request)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (request.method not in permissions.SAFE_METHODS
+                and response.status_code < 400
+                and request.user.is_authenticated):
+            pin_to_primary(request.user.pk)
+        return super().finalize_response(request, response, *args, **kwargs)
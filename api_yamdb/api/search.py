@@ -0,0 +1,101 @@
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'api_title_search'
+# bm25 weights of indexed columns: name and description.
+SEARCH_RANK = f'bm25({SEARCH_TABLE}, 10.0, 1.0)'
+TERM_RE = re.compile(r'\w+')
+# Triggers keeping the index in sync, see migration 0004_title_search.
+SEARCH_TRIGGERS = {
+    'api_title_search_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS api_title_search_insert
+        AFTER INSERT ON api_title BEGIN
+            INSERT INTO {SEARCH_TABLE}(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+    """,
+    'api_title_search_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS api_title_search_delete
+        AFTER DELETE ON api_title BEGIN
+            INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name,
+                                       description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+    """,
+    'api_title_search_update': f"""
+        CREATE TRIGGER IF NOT EXISTS api_title_search_update
+        AFTER UPDATE OF name, description ON api_title BEGIN
+            INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name,
+                                       description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO {SEARCH_TABLE}(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+    """,
+}
+
+
+def ensure_search_triggers(connection):
+    """
+    Create missing triggers of the search index and rebuild the index.
+    SQLite drops triggers when a migration remakes api_title to alter it.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    names = (SEARCH_TABLE, *SEARCH_TRIGGERS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT name FROM sqlite_master WHERE name IN '
+            f'({", ".join(["%s"] * len(names))})', names)
+        existing = {name for name, in cursor.fetchall()}
+        missing = [name for name in SEARCH_TRIGGERS if name not in existing]
+        if SEARCH_TABLE not in existing or not missing:
+            return
+        for name in missing:
+            cursor.execute(SEARCH_TRIGGERS[name])
+        # Rows changed while triggers were missing are indexed anew.
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) "
+                       "VALUES ('rebuild')")
+
+
+def build_search_query(value):
+    """
+    Turn user input into FTS5 query: every word must match as prefix.
+    Words are quoted, so FTS5 operators in input are not interpreted.
+    """
+    return ' '.join(f'"{term}"*' for term in TERM_RE.findall(value))
+
+
+def search_titles(queryset, value):
+    """
+    Filter titles by words of name and description, best matches first
+    unless there are more than TITLE_SEARCH_RANK_LIMIT of them.
+    """
+    query = build_search_query(value)
+    if not query:
+        return queryset.none()
+    connection = connections[queryset.db]
+    if connection.vendor != 'sqlite':
+        return queryset.filter(name__icontains=value)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT count(*) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} '
+            'MATCH %s', (query,))
+        matches, = cursor.fetchone()
+    if matches > settings.TITLE_SEARCH_RANK_LIMIT:
+        # Ranking scores every match, too common words keep the order
+        # of the list, its first page is found without full sort.
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+            (query,)))
+    return queryset.extra(
+        tables=(SEARCH_TABLE,),
+        where=(f'{SEARCH_TABLE}.rowid = api_title.id',
+               f'{SEARCH_TABLE} MATCH %s'),
+        params=(query,),
+        select={'search_rank': SEARCH_RANK},
+        order_by=('search_rank', '-api_title.id'),
+    )
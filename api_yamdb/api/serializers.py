@@ -1,6 +1,27 @@
 from rest_framework import serializers
 
+from .metrics import measure_serializer
 from .models import Category, Comment, Genre, Review, Title, User
+from .trending import current_score
+
+
+class TimedDataMixin:
+    """
+    Account time of building representation in request metrics.
+    """
+
+    @property
+    def data(self):
+        with measure_serializer():
+            return super().data
+
+
+class TimedListSerializer(TimedDataMixin, serializers.ListSerializer):
+    pass
+
+
+class TimedModelSerializer(TimedDataMixin, serializers.ModelSerializer):
+    pass
 
 
 class UserAuthSerializer(serializers.Serializer):
@@ -12,42 +33,67 @@ class UserObtainTokenSerializer(serializers.Serializer):
     confirmation_code = serializers.CharField(max_length=150)
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedModelSerializer):
 
     class Meta:
         fields = ('first_name', 'last_name', 'username',
                   'bio', 'email', 'role')
         model = User
+        list_serializer_class = TimedListSerializer
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedModelSerializer):
 
     class Meta:
         model = Category
         fields = ('name', 'slug')
+        list_serializer_class = TimedListSerializer
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedModelSerializer):
 
     class Meta:
         model = Genre
         fields = ('name', 'slug')
+        list_serializer_class = TimedListSerializer
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(TimedModelSerializer):
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
     rating = serializers.DecimalField(max_digits=4, decimal_places=2,
                                       max_value=10.0, min_value=1.0,
-                                      coerce_to_string=False)
+                                      coerce_to_string=False,
+                                      read_only=True)
 
     class Meta:
         model = Title
         fields = ('id', 'name', 'year', 'rating',
                   'description', 'genre', 'category')
+        list_serializer_class = TimedListSerializer
+
+
+class TopTitleSerializer(TitleReadSerializer):
+    score = serializers.DecimalField(max_digits=4, decimal_places=2,
+                                     coerce_to_string=False, read_only=True)
+
+    class Meta(TitleReadSerializer.Meta):
+        fields = TitleReadSerializer.Meta.fields + ('score',)
+
+
+class TrendingTitleSerializer(TitleReadSerializer):
+    activity = serializers.SerializerMethodField()
+
+    class Meta(TitleReadSerializer.Meta):
+        fields = TitleReadSerializer.Meta.fields + ('activity',)
+
+    def get_activity(self, title):
+        # Stored activity is decayed on read.
+        return round(current_score(
+            title.activity_score, title.activity_updated_at), 2)
 
 
-class TitleWriteSerializer(serializers.ModelSerializer):
+class TitleWriteSerializer(TimedModelSerializer):
     genre = serializers.SlugRelatedField(
         slug_field='slug', many=True, required=False,
         queryset=Genre.objects.all()
@@ -62,7 +108,7 @@ class TitleWriteSerializer(serializers.ModelSerializer):
                   'description', 'genre', 'category')
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True)
@@ -70,9 +116,10 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ('id', 'text', 'author', 'pub_date')
         model = Comment
+        list_serializer_class = TimedListSerializer
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True)
@@ -80,6 +127,7 @@ class ReviewSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ('id', 'author', 'text', 'score', 'pub_date')
         model = Review
+        list_serializer_class = TimedListSerializer
 
     def validate(self, data):
         request = self.context['request']
@@ -0,0 +1,293 @@
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save, pre_delete, pre_save)
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .autocomplete import autocomplete_index
+from .caching import (comment_versions, get_response_cache, response_caches,
+                      review_versions, title_cache)
+from .catalog import catalog_index
+from .leaderboard import refresh_leaderboard
+from .models import Category, Comment, Genre, Review, Title, User
+from .search import ensure_search_triggers
+from .trending import record_activity, refresh_trending
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(sender, instance, raw, **kwargs):
+    """
+    Remember stored title and score of review before update,
+    so post_save can move rating aggregates by the difference.
+    """
+    instance._rating_previous = None
+    if raw or instance.pk is None:
+        return
+    instance._rating_previous = (
+        Review.objects.filter(pk=instance.pk)
+        .values_list('title_id', 'score').first())
+
+
+def title_ratings_changed(title_ids):
+    """
+    Refresh everything derived from rating aggregates of titles after
+    they were shifted. Shared by review receivers and the conditional
+    review update, whose UPDATE statement sends no signals.
+    """
+    title_cache.invalidate_objects(title_ids)
+    # Suggestions are ranked by review count and rating.
+    autocomplete_index.refresh('titles', title_ids)
+    refresh_leaderboard(title_ids)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_rating_previous', None)
+    if created or previous is None:
+        Title.apply_score_delta(instance.title_id, instance.score, 1)
+        title_ratings_changed((instance.title_id,))
+        return
+    title_id, score = previous
+    if title_id != instance.title_id:
+        Title.apply_score_delta(title_id, -score, -1)
+        Title.apply_score_delta(instance.title_id, instance.score, 1)
+        title_ratings_changed((title_id, instance.title_id))
+    elif score != instance.score:
+        Title.apply_score_delta(title_id, instance.score - score, 0)
+        title_ratings_changed((title_id,))
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    Title.apply_score_delta(instance.title_id, -instance.score, -1)
+    title_ratings_changed((instance.title_id,))
+
+
+def review_title_ids(instance):
+    title_ids = {instance.title_id}
+    previous = getattr(instance, '_rating_previous', None)
+    if previous is not None:
+        title_ids.add(previous[0])
+    return title_ids
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review_versions(sender, instance, **kwargs):
+    review_versions.invalidate_objects(review_title_ids(instance))
+    # Comments of deleted or moved review are not found by old URL.
+    comment_versions.invalidate_objects((instance.pk,))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_versions(sender, instance, **kwargs):
+    comment_versions.invalidate_objects((instance.review_id,))
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw, update_fields, **kwargs):
+    """
+    Remember stored username, reviews and comments show it as author.
+    """
+    instance._username_previous = None
+    if raw or instance.pk is None or (
+            update_fields is not None and 'username' not in update_fields):
+        return
+    instance._username_previous = (
+        User.objects.filter(pk=instance.pk)
+        .values_list('username', flat=True).first())
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_record(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def invalidate_authored_versions(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_username_previous', None)
+    if created or previous in (None, instance.username):
+        return
+    review_versions.invalidate_objects(
+        instance.reviews.values_list('title_id', flat=True))
+    comment_versions.invalidate_objects(
+        instance.comments.values_list('review_id', flat=True))
+
+
+@receiver(post_migrate)
+def clear_caches(sender, **kwargs):
+    # flush command emits post_migrate after wiping tables.
+    user_cache.clear()
+    autocomplete_index.reset()
+    catalog_index.reset()
+    for response_cache in response_caches.values():
+        response_cache.invalidate()
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    if sender.label == 'api':
+        ensure_search_triggers(connections[using])
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, **kwargs):
+    get_response_cache('categories').invalidate()
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genres(sender, **kwargs):
+    get_response_cache('genres').invalidate()
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    title_cache.invalidate_objects((instance.pk,))
+    review_versions.invalidate_objects((instance.pk,))
+    catalog_index.changed((instance.pk,))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if action == 'pre_clear' and reverse:
+        # Cleared from genre side: titles are unknown after the clear.
+        instance._title_ids = related_title_ids(instance)
+        return
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        title_cache.invalidate_objects((instance.pk,))
+    elif action == 'post_clear':
+        title_cache.invalidate_objects(instance._title_ids)
+    else:
+        title_cache.invalidate_objects(pk_set)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def refresh_title_genres(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        title_ids = (instance.pk,)
+    elif action == 'post_clear':
+        title_ids = instance._title_ids
+    else:
+        title_ids = pk_set
+    Title.rebuild_genre_masks(title_ids)
+    catalog_index.changed(title_ids)
+    refresh_leaderboard(title_ids)
+    refresh_trending(title_ids)
+
+
+@receiver(pre_save, sender=Genre)
+def assign_genre_mask(sender, instance, raw, **kwargs):
+    if raw or instance.pk is not None or instance.mask is not None:
+        return
+    instance.mask = next(iter(Genre.free_masks()), None)
+
+
+def related_title_ids(instance):
+    # Title fields are named after Category and Genre models.
+    return set(Title.objects.filter(
+        **{instance._meta.model_name: instance}
+    ).values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Genre)
+def remember_related_titles(sender, instance, **kwargs):
+    """
+    Remember titles of deleted category or genre: SET_NULL and
+    cascade of genre links change titles without their signals.
+    """
+    instance._title_ids = related_title_ids(instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def invalidate_related_titles(sender, instance, created, raw, **kwargs):
+    if created or raw:
+        return
+    title_cache.invalidate_objects(related_title_ids(instance))
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def invalidate_titles_of_deleted(sender, instance, **kwargs):
+    title_cache.invalidate_objects(getattr(instance, '_title_ids', ()))
+
+
+@receiver(post_delete, sender=Genre)
+def clear_deleted_genre_mask(sender, instance, **kwargs):
+    # Freed bit may be given to a new genre.
+    if instance.mask is not None:
+        Title.rebuild_genre_masks(getattr(instance, '_title_ids', ()))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def rebuild_catalog(sender, **kwargs):
+    # Slugs, genre bits and titles of deleted ones may change.
+    catalog_index.changed()
+
+
+@receiver(post_save, sender=Title)
+def refresh_title_rankings(sender, instance, created, raw, **kwargs):
+    # New titles have no reviews, changed ones may move to a category.
+    if not created and not raw:
+        refresh_leaderboard((instance.pk,))
+        refresh_trending((instance.pk,))
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def refresh_rankings_of_deleted(sender, instance, **kwargs):
+    title_ids = getattr(instance, '_title_ids', ())
+    refresh_leaderboard(title_ids)
+    refresh_trending(title_ids)
+
+
+@receiver(post_save, sender=Review)
+def record_review_activity(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        record_activity(instance.title_id, settings.TRENDING_REVIEW_WEIGHT,
+                        instance.pub_date)
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_activity(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        record_activity(instance.review.title_id,
+                        settings.TRENDING_COMMENT_WEIGHT, instance.pub_date)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def refresh_suggestions(sender, instance, **kwargs):
+    autocomplete_index.refresh_model(sender, (instance.pk,))
@@ -0,0 +1,140 @@
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Exp, Ln
+from django.utils import timezone
+
+from .leaderboard import scope_id_of, title_scopes
+from .models import Comment, Review, Title, TrendingEntry
+
+
+def decay_rate():
+    # Activity halves every TRENDING_HALF_LIFE seconds.
+    return math.log(2) / settings.TRENDING_HALF_LIFE
+
+
+def epoch_rank(moment):
+    """
+    Rank of activity 1 at moment, rank of score s is ln(s) more.
+    """
+    return decay_rate() * moment.timestamp()
+
+
+def current_score(score, updated_at, now=None):
+    """
+    Stored score of (score, updated_at) pair decayed to now.
+    """
+    elapsed = ((now or timezone.now()) - updated_at).total_seconds()
+    return score * math.exp(-decay_rate() * elapsed)
+
+
+def build_entries(activity):
+    """
+    Entries of titles by map of title id to (score, updated_at) pair:
+    in trending list of all titles, of their category and of every genre.
+    """
+    scopes = title_scopes(Title.objects.filter(
+        pk__in=list(activity)).values_list('pk', 'category_id'))
+    entries = []
+    for title_id, lists in scopes.items():
+        score, updated_at = activity[title_id]
+        rank = math.log(score) + epoch_rank(updated_at)
+        entries.extend(
+            TrendingEntry(kind=kind, scope_id=scope_id, title_id=title_id,
+                          score=score, updated_at=updated_at, rank=rank)
+            for kind, scope_id in lists)
+    return entries
+
+
+def record_activity(title_id, weight, moment=None):
+    """
+    Add weight to activity of title at moment. Stored score is decayed
+    to moment in the same UPDATE of all entries of title, so concurrent
+    writes are not lost and may come in any order.
+    """
+    moment = moment or timezone.now()
+    base = epoch_rank(moment)
+    score = Exp(F('rank') - base) + weight
+    with transaction.atomic():
+        updated = TrendingEntry.objects.filter(title_id=title_id).update(
+            score=score, updated_at=moment, rank=Ln(score) + base)
+        if not updated:
+            TrendingEntry.objects.bulk_create(
+                build_entries({title_id: (weight, moment)}))
+
+
+def refresh_trending(title_ids):
+    """
+    Move activity of titles to lists of their current category
+    and genres.
+    """
+    title_ids = set(title_ids)
+    if not title_ids:
+        return
+    with transaction.atomic():
+        entries = TrendingEntry.objects.filter(title_id__in=title_ids)
+        activity = {
+            title_id: (score, updated_at)
+            for title_id, score, updated_at in entries.filter(
+                kind=TrendingEntry.ALL,
+            ).values_list('title_id', 'score', 'updated_at')
+        }
+        if not activity:
+            return
+        entries.delete()
+        TrendingEntry.objects.bulk_create(build_entries(activity))
+
+
+def rebuild_trending(now=None, batch_size=1000):
+    """
+    Calculate activity of all titles anew from publication dates
+    of reviews and comments, titles with activity below
+    TRENDING_MIN_SCORE are dropped. Return number of trending titles.
+    """
+    now = now or timezone.now()
+    rate = decay_rate()
+    scores = {}
+    events = (
+        (Review.objects.values_list('title_id', 'pub_date'),
+         settings.TRENDING_REVIEW_WEIGHT),
+        (Comment.objects.values_list('review__title_id', 'pub_date'),
+         settings.TRENDING_COMMENT_WEIGHT),
+    )
+    for rows, weight in events:
+        for title_id, pub_date in rows.iterator():
+            scores[title_id] = scores.get(title_id, 0) + weight * math.exp(
+                -rate * (now - pub_date).total_seconds())
+    title_ids = sorted(
+        title_id for title_id, score in scores.items()
+        if score >= settings.TRENDING_MIN_SCORE)
+    with transaction.atomic():
+        TrendingEntry.objects.all().delete()
+        for start in range(0, len(title_ids), batch_size):
+            TrendingEntry.objects.bulk_create(build_entries({
+                title_id: (scores[title_id], now)
+                for title_id in title_ids[start:start + batch_size]
+            }))
+    return len(title_ids)
+
+
+def trending_titles(queryset, kind=TrendingEntry.ALL, slug=None, limit=10,
+                    now=None):
+    """
+    Titles of trending list by current activity, annotated with stored
+    activity_score and activity_updated_at. One range scan of the
+    trending index from the top down to TRENDING_MIN_SCORE.
+    """
+    min_rank = (math.log(settings.TRENDING_MIN_SCORE)
+                + epoch_rank(now or timezone.now()))
+    return queryset.filter(
+        trending_entries__kind=kind,
+        trending_entries__scope_id=scope_id_of(kind, slug),
+        trending_entries__rank__gte=min_rank,
+    ).annotate(
+        activity_score=F('trending_entries__score'),
+        activity_updated_at=F('trending_entries__updated_at'),
+    ).order_by(
+        '-trending_entries__rank', '-trending_entries__id',
+    )[:limit]
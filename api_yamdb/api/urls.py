@@ -5,7 +5,7 @@ from django.urls import include, path
 from .views import (
     CategoryViewSet, CommentViewSet, GenreViewSet,
     ReviewViewSet, TitleViewSet, UserViewSet,
-    create_user_or_get_code, obtain_token)
+    autocomplete, create_user_or_get_code, obtain_token, service_metrics)
 
 API_VERSION = 'v1'
 
@@ -29,5 +29,7 @@ auth_patterns = [
 
 urlpatterns = (
     path(f'{API_VERSION}/auth/', include(auth_patterns)),
+    path(f'{API_VERSION}/metrics/', service_metrics, name='metrics'),
+    path(f'{API_VERSION}/autocomplete/', autocomplete, name='autocomplete'),
     path(f'{API_VERSION}/', include(v1_router.urls)),
 )
@@ -1,32 +1,55 @@
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, permissions, status, viewsets
+from rest_framework import (exceptions, filters, mixins, permissions, status,
+                            viewsets)
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import AccessToken
 
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import transaction
+from django.db.models import Subquery, Value
+from django.db.models.functions import Coalesce
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 
+from .autocomplete import autocomplete_index
+from .caching import (CachedListMixin, CachedRetrieveMixin,
+                      ConditionalGetMixin, comment_versions, response_caches,
+                      review_versions, title_cache)
+from .catalog import IndexedTitles, catalog_index
+from .export import export_catalog
+from .facets import YEAR_GROUPS, count_facets
 from .filters import TitleFilter
-from .models import Category, Genre, Title, Review, User
+from .leaderboard import top_titles
+from .models import (Category, Comment, Genre, ScopedEntry, Title, Review,
+                     User)
+from .outbox import queue_email
+from .pagination import IdCursorPagination, cursor_pagination_requested
 from .permissions import (IsAdmin, IsAdminOrReadOnly,
                           IsAdminModeratorAuthorOrCanCreateOrReadOnly)
+from .replicas import ReplicaReadMixin
 from .serializers import (
     CategorySerializer, CommentSerializer, GenreSerializer,
     ReviewSerializer, TitleReadSerializer, TitleWriteSerializer,
+    TopTitleSerializer, TrendingTitleSerializer,
     UserAuthSerializer, UserObtainTokenSerializer, UserSerializer
 )
+from .signals import title_ratings_changed
+from .trending import trending_titles
+from .writes import (
+    SerializedUpdateMixin, SerializedWriteMixin, get_write_queue,
+    serialized_write,
+)
 
 
 @api_view(('POST',))
 @permission_classes([permissions.AllowAny])
+@serialized_write
 def create_user_or_get_code(request):
     """
     Create user with email from request an random password.
-    Send mail with password as confirmation_code.
+    Queue mail with password as confirmation_code.
     User is not active yet.
     """
     serializer = UserAuthSerializer(data=request.data)
@@ -37,16 +60,16 @@ def create_user_or_get_code(request):
         email=email
     )
     confirmation_code = default_token_generator.make_token(user)
-    send_mail('Запрос confirmation_code для YamDB',
-              f'Ваш confirmation_code: {confirmation_code}',
-              from_email=settings.FROM_EMAIL,
-              recipient_list=(email,))
+    queue_email('Запрос confirmation_code для YamDB',
+                f'Ваш confirmation_code: {confirmation_code}',
+                to=email)
     content = {'email': email}
     return Response(content, status=status.HTTP_200_OK)
 
 
 @api_view(('POST',))
 @permission_classes([permissions.AllowAny])
+@serialized_write
 def obtain_token(request):
     """
     Takes email and confirmation_code from request and
@@ -72,7 +95,36 @@ def obtain_token(request):
                     status=status.HTTP_200_OK)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+@api_view(('GET',))
+@permission_classes([IsAdmin])
+def service_metrics(request):
+    """
+    Counters of in-process subsystems for monitoring.
+    """
+    return Response({
+        'write_queue': get_write_queue().stats(),
+        'response_cache': {
+            prefix: response_cache.stats()
+            for prefix, response_cache in response_caches.items()
+        },
+    })
+
+
+@api_view(('GET',))
+@permission_classes([permissions.AllowAny])
+def autocomplete(request):
+    """
+    Suggest titles, genres and categories with names containing words
+    starting with words of `q`, served from in-process index.
+    """
+    query = request.query_params.get('q', '')
+    if len(query.strip()) < settings.AUTOCOMPLETE_MIN_LENGTH:
+        return Response({'titles': [], 'genres': [], 'categories': []})
+    return Response(
+        autocomplete_index.search(query, settings.AUTOCOMPLETE_LIMIT))
+
+
+class UserViewSet(SerializedUpdateMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     filter_backends = (filters.SearchFilter,)
@@ -86,10 +138,16 @@ class UserViewSet(viewsets.ModelViewSet):
         """
         Return user info on GET, and correct user profile on PATCH.
         """
-        user = request.user
         if request.method in permissions.SAFE_METHODS:
+            # request.user holds only fields cached by authentication.
+            user = get_object_or_404(User, pk=request.user.pk)
             serializer = self.get_serializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.update_me(request)
+
+    @serialized_write
+    def update_me(self, request):
+        user = get_object_or_404(User, pk=request.user.pk)
         serializer = self.get_serializer(user, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
@@ -97,6 +155,7 @@ class UserViewSet(viewsets.ModelViewSet):
 
 
 class ListCreateDestroyAPIView(
+    SerializedWriteMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
@@ -105,7 +164,80 @@ class ListCreateDestroyAPIView(
     pass
 
 
-class CategoryViewSet(ListCreateDestroyAPIView):
+class SelectablePaginationMixin:
+    """
+    Use cursor_pagination_class instead of page number pagination
+    when client or settings ask for cursor mode.
+    """
+    cursor_pagination_class = IdCursorPagination
+
+    @property
+    def paginator(self):
+        if (not hasattr(self, '_paginator')
+                and cursor_pagination_requested(self.request)):
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
+
+class ConditionalWriteMixin:
+    """
+    Update and delete author content with one conditional statement:
+    parent scope and author permission are part of its WHERE clause.
+    403 and 404 are told apart only when no row was affected.
+    Used with ConditionalGetMixin, whose content versions are bumped.
+    Scope is rows of scope_model matching scope_filter, a map of
+    lookups to URL kwargs holding their values.
+    """
+    write_permission_class = IsAdminModeratorAuthorOrCanCreateOrReadOnly
+    scope_model = None
+    scope_filter = None
+
+    def get_scoped_queryset(self):
+        return self.scope_model.objects.filter(**{
+            lookup: self.kwargs.get(kwarg)
+            for lookup, kwarg in self.scope_filter.items()
+        })
+
+    def get_writable_queryset(self):
+        queryset = self.get_scoped_queryset().filter(pk=self.kwargs['pk'])
+        return self.write_permission_class.restrict_queryset(
+            self.request, queryset)
+
+    def raise_write_denied(self):
+        if self.get_scoped_queryset().filter(pk=self.kwargs['pk']).exists():
+            raise exceptions.PermissionDenied
+        raise Http404
+
+    def perform_conditional_update(self, queryset, data):
+        if not data:
+            return queryset.exists()
+        return queryset.update(**data)
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        serializer = self.get_serializer(data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        updated = self.perform_conditional_update(
+            self.get_writable_queryset(), serializer.validated_data)
+        if not updated:
+            self.raise_write_denied()
+        # Update statement sends no signals that bump versions.
+        self.content_versions.invalidate_objects(
+            (int(self.kwargs[self.content_scope_kwarg]),))
+        instance = self.get_scoped_queryset().select_related(
+            'author').get(pk=self.kwargs['pk'])
+        return Response(self.get_serializer(instance).data)
+
+    def destroy(self, request, *args, **kwargs):
+        deleted, _ = self.get_writable_queryset().delete()
+        if not deleted:
+            self.raise_write_denied()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CategoryViewSet(CachedListMixin, ReplicaReadMixin,
+                      ListCreateDestroyAPIView):
+    cache_prefix = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     filter_backends = (filters.SearchFilter,)
@@ -114,7 +246,9 @@ class CategoryViewSet(ListCreateDestroyAPIView):
     permission_classes = (IsAdminOrReadOnly,)
 
 
-class GenreViewSet(ListCreateDestroyAPIView):
+class GenreViewSet(CachedListMixin, ReplicaReadMixin,
+                   ListCreateDestroyAPIView):
+    cache_prefix = 'genres'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     filter_backends = (filters.SearchFilter,)
@@ -123,9 +257,12 @@ class GenreViewSet(ListCreateDestroyAPIView):
     permission_classes = (IsAdminOrReadOnly,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('-id')
+class TitleViewSet(ConditionalGetMixin, CachedListMixin, CachedRetrieveMixin,
+                   ReplicaReadMixin, SerializedUpdateMixin,
+                   SelectablePaginationMixin, viewsets.ModelViewSet):
+    object_cache = title_cache
+    queryset = Title.objects.select_related(
+        'category').prefetch_related('genre').order_by('-id')
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     permission_classes = (IsAdminOrReadOnly,)
@@ -135,8 +272,126 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    def filter_queryset(self, queryset):
+        if self.action != 'list':
+            return super().filter_queryset(queryset)
+        if cursor_pagination_requested(self.request):
+            # Cursor pages are keyed by id only, they would drop both
+            # ordering and ranking of search.
+            params = self.request.query_params
+            if params.get('ordering'):
+                raise exceptions.ValidationError(
+                    {'ordering': 'Сортировка недоступна в режиме cursor'})
+            if params.get('search'):
+                raise exceptions.ValidationError(
+                    {'search': 'Поиск недоступен в режиме cursor'})
+        else:
+            filterset = TitleFilter(self.request.query_params,
+                                    queryset=queryset)
+            if filterset.is_valid():
+                selection = catalog_index.select(filterset.form.cleaned_data)
+                if selection is not None:
+                    return IndexedTitles(queryset, selection)
+        return super().filter_queryset(queryset)
+
+    def get_list_cache(self):
+        return title_cache
+
+    def get_list_cache_key(self, request):
+        return title_cache.make_list_key(request)
+
+    def get_content_versions(self, create=False):
+        if self.action == 'list':
+            return title_cache.get_collection_versions(create)
+        pk = self.kwargs['pk']
+        if not pk.isdigit():
+            return None
+        return title_cache.get_object_versions(int(pk), create)
+
+    @action(methods=('get',), detail=False, permission_classes=(IsAdmin,),
+            pagination_class=None, filter_backends=())
+    def export(self, request):
+        """
+        Stream the whole catalog with reviews as NDJSON.
+        `since` returns only titles with greater id.
+        """
+        since = request.query_params.get('since', '0')
+        if not since.isdigit():
+            raise exceptions.ValidationError(
+                {'since': 'Ожидается целое неотрицательное число'})
+        return StreamingHttpResponse(
+            export_catalog(since=int(since)),
+            content_type='application/x-ndjson')
+
+    @action(methods=('get',), detail=False, pagination_class=None,
+            filter_backends=())
+    def facets(self, request):
+        """
+        Counts of titles per genre, category and year for the same
+        filters as list, `year_group=decade` groups years by decades.
+        """
+        year_group = request.query_params.get('year_group', 'year')
+        if year_group not in YEAR_GROUPS:
+            raise exceptions.ValidationError(
+                {'year_group': f'Ожидается одно из: {", ".join(YEAR_GROUPS)}'})
+        filterset = TitleFilter(request.query_params, queryset=self.queryset)
+        if not filterset.is_valid():
+            raise exceptions.ValidationError(filterset.errors)
+        return title_cache.fetch(
+            title_cache.make_list_key(request),
+            lambda: Response(count_facets(request.query_params, year_group)))
 
-class CommentViewSet(viewsets.ModelViewSet):
+    @action(methods=('get',), detail=False, pagination_class=None,
+            filter_backends=())
+    def top(self, request):
+        """
+        Best titles by weighted rating: of all titles, of `category`
+        or of `genre`, `limit` titles at most.
+        """
+        titles = top_titles(self.queryset, *self.get_ranking_params(
+            settings.TOP_TITLES_LIMIT, settings.TOP_TITLES_MAX_LIMIT))
+        return title_cache.fetch(
+            title_cache.make_list_key(request),
+            lambda: Response(TopTitleSerializer(titles, many=True).data))
+
+    @action(methods=('get',), detail=False, pagination_class=None,
+            filter_backends=())
+    def trending(self, request):
+        """
+        Titles with most reviews and comments lately: of all titles,
+        of `category` or of `genre`, `limit` titles at most. Not cached,
+        activity decays with every second.
+        """
+        titles = trending_titles(self.queryset, *self.get_ranking_params(
+            settings.TRENDING_LIMIT, settings.TRENDING_MAX_LIMIT))
+        return Response(TrendingTitleSerializer(titles, many=True).data)
+
+    def get_ranking_params(self, default_limit, max_limit):
+        """
+        Kind and slug of ranked list from `category` or `genre`
+        and its length from `limit`.
+        """
+        params = self.request.query_params
+        scopes = [kind for kind in (ScopedEntry.CATEGORY, ScopedEntry.GENRE)
+                  if params.get(kind)]
+        if len(scopes) > 1:
+            raise exceptions.ValidationError(
+                {'genre': 'Укажите только категорию или только жанр'})
+        kind = scopes[0] if scopes else ScopedEntry.ALL
+        limit = params.get('limit', str(default_limit))
+        if not limit.isdigit() or not 0 < int(limit) <= max_limit:
+            raise exceptions.ValidationError(
+                {'limit': f'Ожидается число от 1 до {max_limit}'})
+        return kind, params.get(kind), int(limit)
+
+
+class CommentViewSet(ConditionalGetMixin, ReplicaReadMixin,
+                     SerializedUpdateMixin, ConditionalWriteMixin,
+                     SelectablePaginationMixin, viewsets.ModelViewSet):
+    content_versions = comment_versions
+    content_scope_kwarg = 'review_id'
+    scope_model = Comment
+    scope_filter = {'review_id': 'review_id', 'review__title_id': 'title_id'}
     serializer_class = CommentSerializer
     permission_classes = (IsAdminModeratorAuthorOrCanCreateOrReadOnly,)
 
@@ -144,7 +399,7 @@ class CommentViewSet(viewsets.ModelViewSet):
         review_id = self.kwargs.get('review_id')
         title_id = self.kwargs.get('title_id')
         review = get_object_or_404(Review, id=review_id, title=title_id)
-        return review.comments.all()
+        return review.comments.select_related('author')
 
     def perform_create(self, serializer):
         review_id = self.kwargs.get('review_id')
@@ -155,14 +410,38 @@ class CommentViewSet(viewsets.ModelViewSet):
             review=review)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, ReplicaReadMixin,
+                    SerializedUpdateMixin, ConditionalWriteMixin,
+                    SelectablePaginationMixin, viewsets.ModelViewSet):
+    content_versions = review_versions
+    content_scope_kwarg = 'title_id'
+    scope_model = Review
+    scope_filter = {'title_id': 'title_id'}
     serializer_class = ReviewSerializer
     permission_classes = (IsAdminModeratorAuthorOrCanCreateOrReadOnly,)
 
     def get_queryset(self):
         title_id = self.kwargs.get('title_id')
         title = get_object_or_404(Title, id=title_id)
-        return title.reviews.all()
+        return title.reviews.select_related('author')
+
+    def perform_conditional_update(self, queryset, data):
+        if 'score' not in data:
+            return super().perform_conditional_update(queryset, data)
+        # Shift title rating by the difference with stored score before
+        # the row changes, nothing is shifted for unavailable review.
+        score = data['score']
+        title_id = int(self.kwargs['title_id'])
+        stored_score = Coalesce(
+            Subquery(queryset.values('score')[:1]), Value(score))
+        with transaction.atomic():
+            Title.apply_score_delta(title_id, score - stored_score, 0)
+            updated = queryset.update(**data)
+            if not updated:
+                transaction.set_rollback(True)
+            else:
+                title_ratings_changed((title_id,))
+        return updated
 
     def perform_create(self, serializer, *args, **kwargs):
         title_id = self.kwargs.get('title_id')
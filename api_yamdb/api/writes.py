@@ -0,0 +1,156 @@
+import random
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import (DEFAULT_DB_ALIAS, OperationalError, connections,
+                       transaction)
+from rest_framework import exceptions, status
+
+from .metrics import add_write_wait
+
+
+class DatabaseBusy(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'База данных занята, повторите запрос позже.'
+    default_code = 'database_busy'
+
+
+def is_lock_error(error):
+    return 'locked' in str(error)
+
+
+class WriteQueue:
+    """
+    Runs writes of one database one at a time in this process.
+    Waiting for the turn is bounded by timeout, transient lock errors
+    from other processes are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, timeout, retries, backoff, max_backoff):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.local = threading.local()
+        self.counters = {
+            'depth': 0, 'max_depth': 0, 'writes': 0, 'retries': 0,
+            'timeouts': 0, 'failures': 0, 'wait_total': 0.0,
+            'wait_max': 0.0,
+        }
+
+    def stats(self):
+        with self.stats_lock:
+            stats = dict(self.counters)
+        stats['wait_avg'] = stats['wait_total'] / max(stats['writes'], 1)
+        return stats
+
+    def count(self, name, value=1):
+        with self.stats_lock:
+            self.counters[name] += value
+
+    def acquire(self):
+        with self.stats_lock:
+            self.counters['depth'] += 1
+            self.counters['max_depth'] = max(
+                self.counters['max_depth'], self.counters['depth'])
+        started = time.monotonic()
+        acquired = self.lock.acquire(timeout=self.timeout)
+        waited = time.monotonic() - started
+        add_write_wait(waited)
+        with self.stats_lock:
+            self.counters['depth'] -= 1
+            if acquired:
+                self.counters['writes'] += 1
+                self.counters['wait_total'] += waited
+                self.counters['wait_max'] = max(
+                    self.counters['wait_max'], waited)
+            else:
+                self.counters['timeouts'] += 1
+        if not acquired:
+            raise DatabaseBusy
+
+    def run(self, func, *args, **kwargs):
+        if getattr(self.local, 'holding', False):
+            return func(*args, **kwargs)
+        self.acquire()
+        self.local.holding = True
+        try:
+            return self.run_with_retries(func, args, kwargs)
+        finally:
+            self.local.holding = False
+            self.lock.release()
+
+    def run_with_retries(self, func, args, kwargs):
+        for attempt in range(self.retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as error:
+                if not is_lock_error(error):
+                    raise
+                if attempt == self.retries:
+                    self.count('failures')
+                    raise DatabaseBusy from error
+            self.count('retries')
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+            time.sleep(delay * random.uniform(0.5, 1.5))
+
+
+write_queues = {}
+write_queues_lock = threading.Lock()
+
+
+def get_write_queue(using=DEFAULT_DB_ALIAS):
+    with write_queues_lock:
+        if using not in write_queues:
+            options = settings.WRITE_QUEUE
+            write_queues[using] = WriteQueue(
+                options['TIMEOUT'], options['RETRIES'],
+                options['BACKOFF'], options['MAX_BACKOFF'])
+        return write_queues[using]
+
+
+def serialized_write(func=None, using=DEFAULT_DB_ALIAS):
+    """
+    Run view or method in a transaction through write queue of
+    the database. Only SQLite writes are queued.
+    """
+    if func is None:
+        return lambda func: serialized_write(func, using)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        atomic_func = transaction.atomic(using=using)(func)
+        if (not settings.WRITE_QUEUE['ENABLED']
+                or connections[using].vendor != 'sqlite'):
+            return atomic_func(*args, **kwargs)
+        return get_write_queue(using).run(atomic_func, *args, **kwargs)
+    return wrapper
+
+
+class SerializedWriteMixin:
+    """
+    Pass create and destroy of viewset through write queue.
+    """
+
+    @serialized_write
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @serialized_write
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)
+
+
+class SerializedUpdateMixin(SerializedWriteMixin):
+    """
+    Pass update through write queue too. Only for viewsets with
+    UpdateModelMixin: router maps PUT and PATCH when update exists.
+    """
+
+    @serialized_write
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
@@ -22,6 +22,7 @@ INSTALLED_APPS = (
 )
 
 MIDDLEWARE = (
+    'api.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -31,6 +32,30 @@ MIDDLEWARE = (
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 )
 
+# Requests over any threshold are logged by api.metrics as warnings.
+REQUEST_METRICS_THRESHOLDS = {
+    'QUERIES': 20,
+    'DB_MS': 200,
+    'TOTAL_MS': 500,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.metrics': {
+            'handlers': ('console',),
+            'level': os.getenv('METRICS_LOG_LEVEL', 'INFO'),
+            'propagate': True,
+        },
+    },
+}
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
@@ -52,13 +77,61 @@ TEMPLATES = (
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+# 'production' enables persistent connections and SQLITE_PRAGMAS below.
+DB_PROFILE = os.getenv('DB_PROFILE', 'development')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'NAME': os.getenv('DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+        'CONN_MAX_AGE': 600 if DB_PROFILE == 'production' else 0,
     }
 }
 
+# Use shared backend (memcached, database) in production, caches
+# are invalidated by signals of every process.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Seconds to keep cached responses. After soft timeout entry is served
+# stale while one worker refreshes it, lock of refresh expires after
+# lock timeout.
+RESPONSE_CACHE_TIMEOUT = 300
+RESPONSE_CACHE_SOFT_TIMEOUT = 60
+RESPONSE_CACHE_LOCK_TIMEOUT = 10
+
+# Read replicas, comma separated sqlite files, for example copies
+# of primary database kept up to date by an external tool.
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+        filter(None, os.getenv('DB_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica_{number}'] = dict(
+        DATABASES['default'], NAME=name, TEST={'MIRROR': 'default'})
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ('api.replicas.ReplicaRouter',)
+
+# Seconds to read from primary after user's write.
+REPLICA_STICKY_SECONDS = 10
+
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+# Applied to every new sqlite connection, see api.signals.
+SQLITE_PRAGMAS = (SQLITE_PRODUCTION_PRAGMAS
+                  if DB_PROFILE == 'production' else {})
+
 AUTH_PASSWORD_VALIDATORS = (
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -95,7 +168,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -104,6 +177,9 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 }
 
+# 'page' or 'cursor', clients may override it with ?pagination=
+PAGINATION_MODE = os.getenv('PAGINATION_MODE', 'page')
+
 SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
@@ -119,8 +195,63 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# Writes to SQLite are queued per process, see api.writes.
+# TIMEOUT and backoffs are in seconds.
+WRITE_QUEUE = {
+    'ENABLED': True,
+    'TIMEOUT': 10,
+    'RETRIES': 5,
+    'BACKOFF': 0.05,
+    'MAX_BACKOFF': 1.0,
+}
+
+# Title search results are ranked when there are no more matches.
+TITLE_SEARCH_RANK_LIMIT = 5000
+
+# In-process autocomplete index: suggestions per kind, shortest query
+# and seconds before background rebuild picks up changes made by
+# other processes.
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MIN_LENGTH = 2
+AUTOCOMPLETE_INDEX_TTL = 300
+
+# Top titles are ranked by mean score with TOP_TITLES_PRIOR_COUNT
+# reviews of TOP_TITLES_PRIOR_SCORE added to every title, run
+# rebuild_leaderboard after changing them. LIMIT is the default length
+# of /titles/top/, clients may ask for up to MAX_LIMIT titles.
+TOP_TITLES_PRIOR_SCORE = 5.5
+TOP_TITLES_PRIOR_COUNT = 10
+TOP_TITLES_LIMIT = 10
+TOP_TITLES_MAX_LIMIT = 100
+
+# Trending titles are ranked by reviews and comments weighted by
+# TRENDING_*_WEIGHT, each halves every TRENDING_HALF_LIFE seconds.
+# Titles with activity decayed below TRENDING_MIN_SCORE are not listed,
+# rebuild_trending drops them from the table.
+TRENDING_HALF_LIFE = 24 * 60 * 60
+TRENDING_REVIEW_WEIGHT = 1.0
+TRENDING_COMMENT_WEIGHT = 0.5
+TRENDING_MIN_SCORE = 0.05
+TRENDING_LIMIT = 10
+TRENDING_MAX_LIMIT = 100
+
+# In-process columnar index of titles for filters of titles list,
+# see api.catalog. Enabled by CATALOG_INDEX=on, a build slower than
+# the timeout in seconds disables it in the process.
+CATALOG_INDEX_ENABLED = os.getenv('CATALOG_INDEX', 'off') == 'on'
+CATALOG_INDEX_BUILD_TIMEOUT = 60
+
+# In-process cache of users resolved from JWT, TTL in seconds.
+AUTH_USER_CACHE_SIZE = 10000
+AUTH_USER_CACHE_TTL = 60
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 FROM_EMAIL = 'admin@YamDb.com'
+
+# Outbox worker (manage.py send_emails), all values in seconds.
+EMAIL_OUTBOX_RETRY_DELAY = 30
+EMAIL_OUTBOX_MAX_DELAY = 60 * 60
+EMAIL_OUTBOX_LEASE = 5 * 60
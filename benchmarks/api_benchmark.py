@@ -0,0 +1,224 @@
+"""
+Latency and throughput of API endpoints on synthetic catalog.
+
+    python -m benchmarks.api_benchmark --scale 1k --output result.json
+    python -m benchmarks.api_benchmark --scale 1k --baseline result.json
+
+Data is seeded into a separate test database. Pass --db with file name
+and --keepdb to seed large scales once and reuse them.
+Exit code is 1 when any case is slower than baseline by more than
+--tolerance.
+"""
+import argparse
+import platform
+import sys
+from contextlib import ExitStack
+
+from .common import (benchmark_database, compare, measure, read_results,
+                     setup_django, write_report)
+
+
+def remove_written_rows(admin, admin_client, review, write_title):
+    """
+    Delete rows created by write cases and restore updated review.
+    """
+    from api.models import Comment, OutgoingEmail, User
+
+    User.objects.filter(username__startswith='writer').delete()
+    write_title.delete()
+    admin_client.patch(f'/api/v1/titles/{review.title_id}/reviews/'
+                       f'{review.id}/', data={'score': review.score})
+    Comment.objects.filter(review=review, author=admin).delete()
+    OutgoingEmail.objects.filter(to=admin.email).delete()
+
+
+def with_uncached(cases):
+    """
+    Follow every case with -uncached variant, which drops title
+    response cache before each request and so measures the queries.
+    """
+    from api.caching import title_cache
+
+    def uncached(call):
+        def wrapper(number):
+            title_cache.invalidate()
+            call(number)
+        return wrapper
+
+    result = []
+    for name, call in cases:
+        result += [(name, call), (f'{name}-uncached', uncached(call))]
+    return result
+
+
+def build_cases(cleanup):
+    """
+    Return list of (name, callable) measured by the suite. Rows created
+    by write cases are removed by callbacks added to cleanup ExitStack,
+    so seeded database stays reusable with --keepdb.
+    """
+    from django.contrib.auth.tokens import default_token_generator
+    from rest_framework.settings import api_settings
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from api.models import Review, Title, User
+
+    def client_for(user=None):
+        client = APIClient()
+        if user is not None:
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client
+
+    def get(client, url):
+        def call(number):
+            response = client.get(url)
+            assert response.status_code == 200, (url, response.status_code)
+        return call
+
+    admin = User.objects.filter(username='bench-admin').first() or (
+        User.objects.create_superuser(
+            'bench-admin', 'bench-admin@yamdb.fake', 'password'))
+    anonymous = client_for()
+    admin_client = client_for(admin)
+    title = Title.objects.order_by('-rating_count', 'id').first()
+    review = Review.objects.filter(title=title).first()
+    sample = Title.objects.select_related('category').exclude(
+        category=None).first()
+    genre = sample.genre.first()
+    reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+    comments_url = f'{reviews_url}{review.id}/comments/'
+    code = default_token_generator.make_token(admin)
+    last_page = -(-Title.objects.count() // api_settings.PAGE_SIZE)
+
+    title_cases = [
+        ('titles-list', get(anonymous, '/api/v1/titles/')),
+        ('titles-list-last-page',
+         get(anonymous, f'/api/v1/titles/?page={last_page}')),
+        ('titles-list-cursor',
+         get(anonymous, '/api/v1/titles/?pagination=cursor')),
+        ('titles-filter-genre',
+         get(anonymous, f'/api/v1/titles/?genre={genre.slug}')),
+        ('titles-filter-category',
+         get(anonymous, f'/api/v1/titles/?category={sample.category.slug}')),
+        ('titles-filter-name',
+         get(anonymous, f'/api/v1/titles/?name={sample.name[:4]}')),
+        ('titles-search',
+         get(anonymous, f'/api/v1/titles/?search={sample.name[:4]}')),
+        ('titles-filter-year',
+         get(anonymous, f'/api/v1/titles/?year={sample.year}')),
+        ('titles-detail', get(anonymous, f'/api/v1/titles/{title.id}/')),
+        ('titles-facets', get(anonymous, '/api/v1/titles/facets/')),
+        ('titles-facets-genre',
+         get(anonymous, f'/api/v1/titles/facets/?genre={genre.slug}')),
+        ('titles-list-auth', get(admin_client, '/api/v1/titles/')),
+    ]
+    cases = with_uncached(title_cases) + [
+        ('reviews-list', get(anonymous, reviews_url)),
+        ('reviews-detail', get(anonymous, f'{reviews_url}{review.id}/')),
+        ('comments-list', get(anonymous, comments_url)),
+        ('categories-list', get(anonymous, '/api/v1/categories/')),
+        ('genres-list', get(anonymous, '/api/v1/genres/')),
+    ]
+
+    def obtain_token(number):
+        response = anonymous.post('/api/v1/auth/token/', data={
+            'email': admin.email, 'confirmation_code': code})
+        assert response.status_code == 200, response.status_code
+
+    def request_code(number):
+        response = anonymous.post(
+            '/api/v1/auth/email/', data={'email': admin.email})
+        assert response.status_code == 200, response.status_code
+
+    def create_comment(number):
+        response = admin_client.post(comments_url, data={'text': 'Новый'})
+        assert response.status_code == 201, response.status_code
+
+    def update_review(number):
+        response = admin_client.patch(
+            f'{reviews_url}{review.id}/', data={'score': number % 10 + 1})
+        assert response.status_code == 200, response.status_code
+
+    write_title, _ = Title.objects.get_or_create(name='Для записи')
+    cleanup.callback(remove_written_rows, admin, admin_client, review,
+                     write_title)
+
+    def create_review(number):
+        user = User.objects.create(
+            username=f'writer{number}', email=f'writer{number}@yamdb.fake')
+        response = client_for(user).post(
+            f'/api/v1/titles/{write_title.id}/reviews/',
+            data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 201, response.status_code
+
+    cases += [
+        ('auth-token', obtain_token),
+        ('auth-email', request_code),
+        ('comments-create', create_comment),
+        ('reviews-update', update_review),
+        # Includes creating the author, the only way to get unique pairs.
+        ('reviews-create', create_review),
+    ]
+    return cases
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--scale', default='1k',
+                        help='Dataset scale: 1k, 100k or 1m.')
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--db', help='File of benchmark database.')
+    parser.add_argument('--keepdb', action='store_true',
+                        help='Keep benchmark database after run.')
+    parser.add_argument('--case', action='append',
+                        help='Run only cases with this name prefix.')
+    parser.add_argument('--output', help='Write results to JSON file.')
+    parser.add_argument('--baseline', help='Compare with results file.')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed slowdown share against baseline.')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    import django
+
+    from .dataset import SCALES, is_seeded, seed
+    if args.scale not in SCALES:
+        parser.error(f'unknown scale {args.scale}, use {", ".join(SCALES)}')
+
+    with benchmark_database(args.db, args.keepdb):
+        if not is_seeded(args.scale):
+            seed(args.scale)
+        results = {}
+        with ExitStack() as cleanup:
+            for name, func in build_cases(cleanup):
+                if args.case and not name.startswith(tuple(args.case)):
+                    continue
+                results[name] = measure(func, args.iterations)
+                stats = results[name]
+                print(f'{name:<32} p50 {stats["p50_ms"]:>8.2f} ms  '
+                      f'p99 {stats["p99_ms"]:>8.2f} ms  '
+                      f'{stats["throughput_rps"]:>8.1f} rps')
+
+    meta = {
+        'scale': args.scale,
+        'iterations': args.iterations,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+    }
+    if args.output:
+        write_report(args.output, meta, results)
+    if args.baseline:
+        regressions = compare(
+            results, read_results(args.baseline), args.tolerance)
+        for case, before, after in regressions:
+            print(f'REGRESSION {case}: p50 {before:.2f} -> {after:.2f} ms')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Autocomplete latency of in-process prefix index, with build time.
+
+    python -m benchmarks.autocomplete --db search.sqlite3 --keepdb
+"""
+import argparse
+import sys
+import time
+
+from .common import benchmark_database, measure, setup_django, write_report
+
+QUERIES = ('до', 'гор', 'звезд', 'love', 'ночь мо', 'king last')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--titles', type=int, default=100000)
+    parser.add_argument('--iterations', type=int, default=1000)
+    parser.add_argument('--db', help='Файл тестовой базы для --keepdb.')
+    parser.add_argument('--keepdb', action='store_true')
+    parser.add_argument('--output', help='JSON отчет с результатами.')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.conf import settings
+    from rest_framework.test import APIClient
+
+    from api.autocomplete import AutocompleteIndex
+    from api.models import Title
+
+    from .title_search import seed_titles
+    with benchmark_database(args.db, keepdb=args.keepdb):
+        if Title.objects.count() != args.titles:
+            Title.objects.all().delete()
+            seed_titles(args.titles)
+        index = AutocompleteIndex()
+        started = time.perf_counter()
+        index.get_indexes()
+        print(f'Индекс {args.titles} произведений построен за '
+              f'{time.perf_counter() - started:.1f} с')
+        limit = settings.AUTOCOMPLETE_LIMIT
+        url = '/api/v1/autocomplete/'
+        client = APIClient()
+        results = {}
+        for query in QUERIES:
+            results[f'index-{query}'] = measure(
+                lambda number: index.search(query, limit), args.iterations)
+        for query in QUERIES:
+            results[f'api-{query}'] = measure(
+                lambda number: client.get(url, {'q': query}),
+                args.iterations // 10)
+        for case, stats in results.items():
+            print(f'{case:<20} p50 {stats["p50_ms"]:>8.3f} ms  '
+                  f'p99 {stats["p99_ms"]:>8.3f} ms')
+    if args.output:
+        write_report(args.output, {'titles': args.titles}, results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
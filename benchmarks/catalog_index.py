@@ -0,0 +1,113 @@
+"""
+Titles list filters: database queries against in-process catalog index.
+
+    python -m benchmarks.catalog_index --db genres.sqlite3 --keepdb
+"""
+import argparse
+import sys
+import time
+
+from .common import benchmark_database, measure, setup_django, write_report
+
+CATEGORIES = 20
+CASES = (
+    ('all', {}),
+    ('category', {'category': 'category-3'}),
+    ('year', {'year': 1990}),
+    ('genres-any', {'genre': 'genre-0,genre-1'}),
+    ('genres-all', {'genre': 'genre-0,genre-2', 'genre_mode': 'all'}),
+    ('combined', {'category': 'category-3', 'genre': 'genre-0,genre-2',
+                  'year': 1990}),
+    ('deep-page', {'category': 'category-3', 'page': 400}),
+)
+
+
+def seed_categories():
+    from django.db.models import F
+    from django.db.models.functions import Mod
+
+    from api.models import Category, Title
+    started = time.perf_counter()
+    for i in range(CATEGORIES):
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+    first = Category.objects.order_by('pk').first().pk
+    Title.objects.update(category_id=Mod(F('id'), CATEGORIES) + first)
+    return time.perf_counter() - started
+
+
+def run_list(use_index, params):
+    from django.core.paginator import Paginator
+    from rest_framework.settings import api_settings
+
+    from api.catalog import IndexedTitles, catalog_index
+    from api.filters import TitleFilter
+    from api.models import Title
+
+    params = dict(params)
+    page = params.pop('page', 1)
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre').order_by('-id')
+
+    def call(number):
+        filterset = TitleFilter(params, queryset=queryset)
+        titles = filterset.qs
+        if use_index:
+            filterset.is_valid()
+            titles = IndexedTitles(queryset, catalog_index.select(
+                filterset.form.cleaned_data))
+        # Same work as list view: count and titles of the page.
+        list(Paginator(titles, api_settings.PAGE_SIZE).page(page))
+    return call
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--titles', type=int, default=1000000)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--db', help='Файл тестовой базы для --keepdb.')
+    parser.add_argument('--keepdb', action='store_true')
+    parser.add_argument('--output', help='JSON отчет с результатами.')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.conf import settings
+
+    from api.catalog import catalog_index
+    from api.models import Category, Genre, Title
+
+    from .genre_filter import GENRES, seed_genres
+    from .title_search import seed_titles
+    settings.CATALOG_INDEX_ENABLED = True
+    with benchmark_database(args.db, keepdb=args.keepdb):
+        if Title.objects.count() != args.titles:
+            Title.objects.all().delete()
+            seconds = seed_titles(args.titles)
+            print(f'Создано произведений: {args.titles} за {seconds:.1f} с')
+        if Genre.objects.count() != GENRES:
+            Genre.objects.all().delete()
+            seconds = seed_genres()
+            print(f'Создано жанров: {GENRES} за {seconds:.1f} с')
+        if Category.objects.count() != CATEGORIES:
+            Category.objects.all().delete()
+            seconds = seed_categories()
+            print(f'Создано категорий: {CATEGORIES} за {seconds:.1f} с')
+        settings.CATALOG_INDEX_BUILD_TIMEOUT = float('inf')
+        started = time.perf_counter()
+        catalog_index.build()
+        print(f'Индекс построен за {time.perf_counter() - started:.1f} с')
+        results = {}
+        for name, params in CASES:
+            for method, use_index in (('db', False), ('index', True)):
+                case = f'{method}-{name}'
+                results[case] = measure(
+                    run_list(use_index, params), args.iterations, warmup=1)
+                print(f'{case:<20} p50 {results[case]["p50_ms"]:>10.2f} ms  '
+                      f'p90 {results[case]["p90_ms"]:>10.2f} ms')
+    if args.output:
+        write_report(args.output, {'titles': args.titles}, results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
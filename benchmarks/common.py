@@ -0,0 +1,98 @@
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.join(BASE_DIR, 'api_yamdb')
+
+
+def setup_django():
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+    django.setup()
+    # One log line per request would dominate the measurements.
+    logging.getLogger('api.metrics').setLevel(logging.ERROR)
+
+
+@contextmanager
+def benchmark_database(name=None, keepdb=False):
+    """
+    Run block against a test database, never against db.sqlite3.
+    With file name and keepdb seeded data is reused between runs.
+    """
+    from django.conf import settings
+    from django.test.utils import (setup_databases, setup_test_environment,
+                                   teardown_databases,
+                                   teardown_test_environment)
+    if name:
+        settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = name
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False,
+                                 keepdb=keepdb)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(func, iterations, warmup=3):
+    """
+    Call func repeatedly and return latency statistics in milliseconds.
+    func receives iteration number.
+    """
+    for number in range(warmup):
+        func(-number - 1)
+    latencies = []
+    started = time.perf_counter()
+    for number in range(iterations):
+        call_started = time.perf_counter()
+        func(number)
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    elapsed = time.perf_counter() - started
+    return {
+        'iterations': iterations,
+        'mean_ms': round(statistics.mean(latencies), 3),
+        'p50_ms': round(percentile(latencies, 0.5), 3),
+        'p90_ms': round(percentile(latencies, 0.9), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'throughput_rps': round(iterations / elapsed, 1),
+    }
+
+
+def compare(results, baseline, tolerance, metric='p50_ms'):
+    """
+    Return list of (case, baseline value, current value) for cases
+    slower than baseline by more than tolerance share.
+    """
+    regressions = []
+    for case, stats in results.items():
+        reference = baseline.get(case)
+        if reference is None:
+            continue
+        if stats[metric] > reference[metric] * (1 + tolerance):
+            regressions.append((case, reference[metric], stats[metric]))
+    return regressions
+
+
+def write_report(path, meta, results):
+    with open(path, 'w', encoding='utf-8') as report:
+        json.dump({'meta': meta, 'results': results}, report,
+                  ensure_ascii=False, indent=2)
+
+
+def read_results(path):
+    with open(path, encoding='utf-8') as report:
+        return json.load(report)['results']
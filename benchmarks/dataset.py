@@ -0,0 +1,102 @@
+"""
+Synthetic catalog of given scale, generated with fixed random seed.
+Call setup_django() before using this module.
+"""
+import io
+import random
+
+from django.core.management import call_command
+from django.db import transaction
+from django.db.models import Max, Min
+
+from api.models import Category, Comment, Genre, Review, Title, User
+
+SCALES = {
+    '1k': {'categories': 5, 'genres': 20, 'titles': 200, 'users': 50,
+           'reviews_per_title': 5, 'comments': 1000},
+    '100k': {'categories': 10, 'genres': 50, 'titles': 5000, 'users': 500,
+             'reviews_per_title': 20, 'comments': 20000},
+    '1m': {'categories': 20, 'genres': 50, 'titles': 20000, 'users': 1000,
+           'reviews_per_title': 50, 'comments': 100000},
+}
+BATCH_SIZE = 5000
+WORDS = ('дом', 'река', 'ночь', 'город', 'звезда', 'море', 'путь', 'огонь',
+         'ветер', 'сад', 'love', 'dark', 'last', 'story', 'king', 'night')
+
+
+def chunked_create(model, objects):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == BATCH_SIZE:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+
+
+def seeded_users():
+    # Benchmarks add their own users, reviews and titles to the catalog,
+    # so only rows created by seed() tell its scale.
+    return User.objects.filter(username__regex=r'^bench[0-9]+$')
+
+
+def is_seeded(scale):
+    return seeded_users().count() == SCALES[scale]['users']
+
+
+def seed(scale, seed_value=0):
+    """
+    Fill empty database with catalog of given scale.
+    """
+    if seeded_users().exists():
+        raise RuntimeError(
+            f'Database is seeded with other scale than {scale}, '
+            'use another --db file.')
+    spec = SCALES[scale]
+    rnd = random.Random(seed_value)
+    with transaction.atomic():
+        chunked_create(Category, (
+            Category(name=f'Категория {i}', slug=f'category-{i}')
+            for i in range(spec['categories'])))
+        chunked_create(Genre, (
+            Genre(name=f'Жанр {i}', slug=f'genre-{i}')
+            for i in range(spec['genres'])))
+        category_ids = list(Category.objects.values_list('id', flat=True))
+        genre_ids = list(Genre.objects.values_list('id', flat=True))
+        chunked_create(User, (
+            User(username=f'bench{i}', email=f'bench{i}@yamdb.fake',
+                 password='!')
+            for i in range(spec['users'])))
+        user_ids = list(User.objects.values_list('id', flat=True))
+        chunked_create(Title, (
+            Title(name=' '.join(rnd.choices(WORDS, k=3)).capitalize(),
+                  year=rnd.randint(1900, 2021),
+                  category_id=rnd.choice(category_ids),
+                  description='Описание')
+            for _ in range(spec['titles'])))
+        title_ids = list(Title.objects.values_list('id', flat=True))
+        chunked_create(Title.genre.through, (
+            Title.genre.through(title_id=title_id, genre_id=genre_id)
+            for title_id in title_ids
+            for genre_id in rnd.sample(genre_ids, 2)))
+        chunked_create(Review, (
+            Review(title_id=title_id, author_id=author_id, text='Отзыв',
+                   score=rnd.randint(1, 10))
+            for title_id in title_ids
+            for author_id in rnd.sample(user_ids, spec['reviews_per_title'])))
+        review_range = Review.objects.aggregate(
+            first=Min('id'), last=Max('id'))
+        chunked_create(Comment, (
+            Comment(review_id=rnd.randint(review_range['first'],
+                                          review_range['last']),
+                    author_id=rnd.choice(user_ids), text='Комментарий')
+            for _ in range(spec['comments'])))
+    Genre.assign_masks()
+    Title.rebuild_genre_masks()
+    call_command('rebuild_ratings', batch_size=BATCH_SIZE,
+                 stdout=io.StringIO())
+    call_command('rebuild_leaderboard', batch_size=BATCH_SIZE,
+                 stdout=io.StringIO())
+    call_command('rebuild_trending', batch_size=BATCH_SIZE,
+                 stdout=io.StringIO())
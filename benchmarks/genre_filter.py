@@ -0,0 +1,111 @@
+"""
+Multi-genre filter latency: joins through genre links against genre_mask.
+
+    python -m benchmarks.genre_filter --db genres.sqlite3 --keepdb
+"""
+import argparse
+import random
+import sys
+import time
+
+from .common import benchmark_database, measure, setup_django, write_report
+
+GENRES = 50
+# Genres of a title: one to three, popular genres are drawn more often.
+GENRE_WEIGHTS = [1 / (rank + 1) for rank in range(GENRES)]
+CASES = (
+    ('one', ('genre-0',), 'any'),
+    ('any-popular', ('genre-0', 'genre-1'), 'any'),
+    ('any-rare', ('genre-40', 'genre-45', 'genre-49'), 'any'),
+    ('all-popular', ('genre-0', 'genre-1'), 'all'),
+    ('all-three', ('genre-0', 'genre-2', 'genre-5'), 'all'),
+)
+
+
+def seed_genres(seed_value=0):
+    from api.models import Genre, Title
+
+    from .dataset import chunked_create
+    rnd = random.Random(seed_value)
+    started = time.perf_counter()
+    for i in range(GENRES):
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+    genre_ids = list(Genre.objects.order_by('pk').values_list('pk', flat=True))
+    chunked_create(Title.genre.through, (
+        Title.genre.through(title_id=title_id, genre_id=genre_id)
+        for title_id in Title.objects.values_list('pk', flat=True).iterator()
+        for genre_id in set(rnd.choices(
+            genre_ids, GENRE_WEIGHTS, k=rnd.randint(1, 3)))))
+    Title.rebuild_genre_masks()
+    return time.perf_counter() - started
+
+
+def join_queryset(slugs, mode):
+    from api.models import Title
+    queryset = Title.objects.order_by('-id')
+    if mode == 'any':
+        return queryset.filter(genre__slug__in=slugs).distinct()
+    for slug in slugs:
+        queryset = queryset.filter(genre__slug=slug)
+    return queryset
+
+
+def mask_queryset(slugs, mode):
+    from api.filters import TitleFilter
+    from api.models import Title
+    return TitleFilter({'genre': ','.join(slugs), 'genre_mode': mode},
+                       queryset=Title.objects.order_by('-id')).qs
+
+
+def run_query(make_queryset, slugs, mode):
+    from rest_framework.settings import api_settings
+
+    def call(number):
+        queryset = make_queryset(slugs, mode)
+        # Same work as paginated list: count and first page.
+        queryset.count()
+        list(queryset[:api_settings.PAGE_SIZE])
+    return call
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--titles', type=int, default=1000000)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--db', help='Файл тестовой базы для --keepdb.')
+    parser.add_argument('--keepdb', action='store_true')
+    parser.add_argument('--output', help='JSON отчет с результатами.')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from api.models import Genre, Title
+
+    from .title_search import seed_titles
+    with benchmark_database(args.db, keepdb=args.keepdb):
+        if Title.objects.count() != args.titles:
+            Title.objects.all().delete()
+            seconds = seed_titles(args.titles)
+            print(f'Создано произведений: {args.titles} за {seconds:.1f} с')
+        if Genre.objects.count() != GENRES:
+            Genre.objects.all().delete()
+            seconds = seed_genres()
+            print(f'Создано жанров: {GENRES} за {seconds:.1f} с')
+        results = {}
+        for name, slugs, mode in CASES:
+            for method, make_queryset in (('join', join_queryset),
+                                          ('mask', mask_queryset)):
+                case = f'{method}-{name}'
+                results[case] = measure(
+                    run_query(make_queryset, slugs, mode),
+                    args.iterations, warmup=1)
+                print(f'{case:<20} p50 {results[case]["p50_ms"]:>10.2f} ms  '
+                      f'p90 {results[case]["p90_ms"]:>10.2f} ms')
+    if args.output:
+        write_report(args.output, {'titles': args.titles, 'genres': GENRES},
+                     results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Reader throughput of titles list during sustained review writes,
+with default SQLite settings and with production profile.
+
+    python -m benchmarks.sqlite_concurrency --readers 4 --duration 5
+
+Readers and the writer are separate processes, as workers of a server
+would be: they contend for the database file and not for the GIL.
+The default profile opens a connection per request in rollback journal
+mode, the production one keeps persistent connections in WAL mode.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from .common import benchmark_database, setup_django
+
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+COUNTERS = ('reads', 'writes', 'errors')
+
+
+def setup_worker(path, profile, pragmas):
+    # Settings read the database and profile from environment.
+    os.environ['DB_NAME'] = path
+    os.environ['DB_PROFILE'] = profile
+    setup_django()
+    from django.conf import settings
+    from django.test.utils import setup_test_environment
+    setup_test_environment(debug=False)
+    settings.SQLITE_PRAGMAS = pragmas
+
+
+def read_titles(stop, counters):
+    from django.db import OperationalError
+    from rest_framework.test import APIClient
+
+    from api.caching import title_cache
+
+    client = APIClient()
+    while not stop.is_set():
+        # Response cache of this process would hide the database.
+        title_cache.invalidate()
+        try:
+            response = client.get('/api/v1/titles/')
+        except OperationalError:
+            counters['errors'] += 1
+        else:
+            counters['reads' if response.status_code == 200
+                     else 'errors'] += 1
+
+
+def write_reviews(stop, counters, prefix):
+    from django.db import OperationalError, close_old_connections
+
+    from api.models import Review, Title, User
+
+    title_ids = list(Title.objects.values_list('id', flat=True)[:100])
+    number = 0
+    while not stop.is_set():
+        number += 1
+        try:
+            user = User.objects.create(
+                username=f'{prefix}-{number}',
+                email=f'{prefix}-{number}@yamdb.fake')
+            Review.objects.create(
+                title_id=title_ids[number % len(title_ids)],
+                author=user, text='Отзыв', score=number % 10 + 1)
+        except OperationalError:
+            counters['errors'] += 1
+        else:
+            counters['writes'] += 1
+        # Connection is kept or closed as at the end of a request.
+        close_old_connections()
+
+
+def run_worker(role, path, profile, pragmas, ready, start, stop, totals):
+    """
+    Set up Django in spawned process, run role between start and stop
+    and add its counters to shared totals.
+    """
+    setup_worker(path, profile, pragmas)
+    from django.db import connection
+
+    counters = dict.fromkeys(COUNTERS, 0)
+    ready.release()
+    start.wait()
+    if role == 'writer':
+        write_reviews(stop, counters, profile)
+    else:
+        read_titles(stop, counters)
+    connection.close()
+    with totals.get_lock():
+        for index, name in enumerate(COUNTERS):
+            totals[index] += counters[name]
+
+
+def run_profile(path, profile, pragmas, readers, duration):
+    context = multiprocessing.get_context('spawn')
+    ready = context.Semaphore(0)
+    start, stop = context.Event(), context.Event()
+    totals = context.Array('l', len(COUNTERS))
+    roles = ['writer'] + ['reader'] * readers
+    processes = [
+        context.Process(target=run_worker, args=(
+            role, path, profile, pragmas, ready, start, stop, totals))
+        for role in roles
+    ]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.acquire()
+    start.set()
+    time.sleep(duration)
+    stop.set()
+    for process in processes:
+        process.join()
+    values = dict(zip(COUNTERS, totals[:]))
+    return {
+        'reads': values['reads'] / duration,
+        'writes': values['writes'] / duration,
+        'errors': values['errors'],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--scale', default='1k')
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+
+    from .dataset import seed
+    # Processes need a file database, in-memory one is per connection.
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.sqlite3')
+        with benchmark_database(path):
+            seed(args.scale)
+            connection.close()
+            for profile, pragmas in (
+                    ('development', DEFAULT_PRAGMAS),
+                    ('production', settings.SQLITE_PRODUCTION_PRAGMAS)):
+                result = run_profile(
+                    path, profile, pragmas, args.readers, args.duration)
+                print(f'{profile:<12} reads {result["reads"]:>8.1f}/s  '
+                      f'writes {result["writes"]:>7.1f}/s  '
+                      f'errors {result["errors"]}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Title search latency: `name` icontains filter against FTS5 `search`.
+
+    python -m benchmarks.title_search --db search.sqlite3 --keepdb
+"""
+import argparse
+import random
+import sys
+import time
+
+from .common import benchmark_database, measure, setup_django, write_report
+
+RARE_WORDS = 5000
+TERMS = (
+    ('common', 'город'),
+    ('prefix', 'звез'),
+    ('rare', 'слово123'),
+    ('two-words', 'ночь море'),
+)
+
+
+def seed_titles(count, seed_value=0):
+    from api.models import Title
+
+    from .dataset import WORDS, chunked_create
+    rnd = random.Random(seed_value)
+    started = time.perf_counter()
+    chunked_create(Title, (
+        Title(name=' '.join(rnd.choices(WORDS, k=3)).capitalize(),
+              description=f'слово{rnd.randrange(RARE_WORDS)} '
+                          f'{" ".join(rnd.choices(WORDS, k=5))}',
+              year=rnd.randint(1900, 2021))
+        for _ in range(count)))
+    return time.perf_counter() - started
+
+
+def run_filter(params):
+    from rest_framework.settings import api_settings
+
+    from api.filters import TitleFilter
+    from api.models import Title
+
+    def call(number):
+        queryset = TitleFilter(params, queryset=Title.objects.order_by(
+            '-id')).qs
+        # Same work as paginated list: count and first page.
+        queryset.count()
+        list(queryset[:api_settings.PAGE_SIZE])
+    return call
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--titles', type=int, default=1000000)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--db', help='Файл тестовой базы для --keepdb.')
+    parser.add_argument('--keepdb', action='store_true')
+    parser.add_argument('--output', help='JSON отчет с результатами.')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from api.models import Title
+
+    with benchmark_database(args.db, keepdb=args.keepdb):
+        if Title.objects.count() != args.titles:
+            Title.objects.all().delete()
+            seconds = seed_titles(args.titles)
+            print(f'Создано произведений: {args.titles} за {seconds:.1f} с')
+        results = {}
+        for name, term in TERMS:
+            for mode in ('name', 'search'):
+                case = f'{mode}-{name}'
+                results[case] = measure(
+                    run_filter({mode: term}), args.iterations, warmup=1)
+                print(f'{case:<20} p50 {results[case]["p50_ms"]:>10.2f} ms  '
+                      f'p90 {results[case]["p90_ms"]:>10.2f} ms')
+    if args.output:
+        write_report(args.output, {'titles': args.titles}, results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
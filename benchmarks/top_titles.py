@@ -0,0 +1,97 @@
+"""
+Top titles latency: weighted rating over reviews against leaderboard.
+
+    python -m benchmarks.top_titles --scale 1m --db bench.sqlite3 --keepdb
+"""
+import argparse
+import sys
+
+from .common import benchmark_database, measure, setup_django, write_report
+
+SCOPES = (
+    ('all', 'all', None),
+    ('category', 'category', 'category-0'),
+    ('genre', 'genre', 'genre-0'),
+)
+
+
+def run_reviews(kind, slug):
+    from django.conf import settings
+    from django.db.models import (
+        Count, ExpressionWrapper, F, FloatField, Sum,
+    )
+
+    from api.models import Title
+
+    prior_count = settings.TOP_TITLES_PRIOR_COUNT
+    prior_sum = prior_count * settings.TOP_TITLES_PRIOR_SCORE
+    titles = Title.objects.all()
+    if kind != 'all':
+        titles = titles.filter(**{f'{kind}__slug': slug})
+
+    def call(number):
+        # Weighted rating calculated from reviews on every request.
+        list(titles.annotate(
+            review_sum=Sum('reviews__score'), review_count=Count('reviews'),
+        ).filter(review_count__gt=0).annotate(
+            score=ExpressionWrapper(
+                (F('review_sum') + prior_sum)
+                / (F('review_count') + prior_count),
+                output_field=FloatField()),
+        ).order_by('-score', '-id').values_list('pk', 'score')[:10])
+    return call
+
+
+def run_leaderboard(kind, slug):
+    from api.leaderboard import top_titles
+    from api.models import Title
+
+    def call(number):
+        list(top_titles(Title.objects.all(), kind, slug).values_list(
+            'pk', 'score'))
+    return call
+
+
+def run_refresh():
+    from api.leaderboard import refresh_leaderboard
+    from api.models import Title
+    title_ids = list(Title.objects.values_list('pk', flat=True)[:1000])
+
+    def call(number):
+        refresh_leaderboard((title_ids[number % len(title_ids)],))
+    return call
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--scale', default='1m')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--db', help='Файл тестовой базы для --keepdb.')
+    parser.add_argument('--keepdb', action='store_true')
+    parser.add_argument('--output', help='JSON отчет с результатами.')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from . import dataset
+    with benchmark_database(args.db, keepdb=args.keepdb):
+        if not dataset.is_seeded(args.scale):
+            dataset.seed(args.scale)
+        results = {}
+        for name, kind, slug in SCOPES:
+            for method, run in (('reviews', run_reviews),
+                                ('leaderboard', run_leaderboard)):
+                case = f'{method}-{name}'
+                results[case] = measure(
+                    run(kind, slug), args.iterations, warmup=1)
+        results['refresh-title'] = measure(run_refresh(), args.iterations)
+        for case, result in results.items():
+            print(f'{case:<22} p50 {result["p50_ms"]:>10.2f} ms  '
+                  f'p90 {result["p90_ms"]:>10.2f} ms')
+    if args.output:
+        write_report(args.output, {'scale': args.scale}, results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Trending titles latency: recent activity window against decayed scores.
+
+    python -m benchmarks.trending_titles --scale 1m --db bench.sqlite3 --keepdb
+"""
+import argparse
+import sys
+
+from .common import benchmark_database, measure, setup_django, write_report
+
+SCOPES = (
+    ('all', 'all', None),
+    ('category', 'category', 'category-0'),
+    ('genre', 'genre', 'genre-0'),
+)
+
+
+def run_window(kind, slug):
+    from datetime import timedelta
+
+    from django.conf import settings
+    from django.db.models import Count, F, FloatField, Q
+    from django.db.models.functions import Cast
+    from django.utils import timezone
+
+    from api.models import Title
+
+    titles = Title.objects.all()
+    if kind != 'all':
+        titles = titles.filter(**{f'{kind}__slug': slug})
+
+    def call(number):
+        # Reviews and comments of the last half-life counted on every
+        # request, comments are joined through reviews.
+        since = timezone.now() - timedelta(
+            seconds=settings.TRENDING_HALF_LIFE)
+        recent = titles.annotate(
+            review_count=Count(
+                'reviews', filter=Q(reviews__pub_date__gte=since),
+                distinct=True),
+            comment_count=Count(
+                'reviews__comments',
+                filter=Q(reviews__comments__pub_date__gte=since)),
+        ).annotate(activity=Cast(
+            F('review_count') * settings.TRENDING_REVIEW_WEIGHT
+            + F('comment_count') * settings.TRENDING_COMMENT_WEIGHT,
+            FloatField()))
+        list(recent.filter(activity__gt=0).order_by(
+            '-activity', '-id').values_list('pk', 'activity')[:10])
+    return call
+
+
+def run_trending(kind, slug):
+    from api.models import Title
+    from api.trending import trending_titles
+
+    def call(number):
+        list(trending_titles(Title.objects.all(), kind, slug).values_list(
+            'pk', 'activity_score'))
+    return call
+
+
+def run_record():
+    from django.conf import settings
+
+    from api.models import Title
+    from api.trending import record_activity
+    title_ids = list(Title.objects.values_list('pk', flat=True)[:1000])
+
+    def call(number):
+        record_activity(title_ids[number % len(title_ids)],
+                        settings.TRENDING_REVIEW_WEIGHT)
+    return call
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--scale', default='1m')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--db', help='Файл тестовой базы для --keepdb.')
+    parser.add_argument('--keepdb', action='store_true')
+    parser.add_argument('--output', help='JSON отчет с результатами.')
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from . import dataset
+    with benchmark_database(args.db, keepdb=args.keepdb):
+        if not dataset.is_seeded(args.scale):
+            dataset.seed(args.scale)
+        results = {}
+        for name, kind, slug in SCOPES:
+            for method, run in (('window', run_window),
+                                ('trending', run_trending)):
+                case = f'{method}-{name}'
+                results[case] = measure(
+                    run(kind, slug), args.iterations, warmup=1)
+        results['record-activity'] = measure(run_record(), args.iterations)
+        for case, result in results.items():
+            print(f'{case:<22} p50 {result["p50_ms"]:>10.2f} ms  '
+                  f'p90 {result["p90_ms"]:>10.2f} ms')
+    if args.output:
+        write_report(args.output, {'scale': args.scale}, results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -109,6 +109,10 @@ class Test02CategoryAPI:
         assert response.status_code == 405, (
             'Проверьте, что при PATCH запросе `/api/v1/categories/{slug}/` возвращаете статус 405'
         )
+        response = user_client.put('/api/v1/categories/books/', data={'name': 'Новое', 'slug': 'new'})
+        assert response.status_code == 405, (
+            'Проверьте, что при PUT запросе `/api/v1/categories/{slug}/` возвращаете статус 405'
+        )
 
     def check_permissions(self, user, user_name, categories):
         client_user = auth_client(user)
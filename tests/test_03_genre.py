@@ -100,6 +100,10 @@ class Test03GenreAPI:
         assert response.status_code == 405, (
             'Проверьте, что при PATCH запросе `/api/v1/genres/{slug}/` возвращаете статус 405'
         )
+        response = user_client.put(f'/api/v1/genres/{genres[0]["slug"]}/', data={'name': 'Новое', 'slug': 'new'})
+        assert response.status_code == 405, (
+            'Проверьте, что при PUT запросе `/api/v1/genres/{slug}/` возвращаете статус 405'
+        )
 
     def check_permissions(self, user, user_name, genres):
         client_user = auth_client(user)
@@ -0,0 +1,60 @@
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_reviews
+
+
+class Test07TitleRating:
+
+    def get_title(self, title_id):
+        from api.models import Title
+        return Title.objects.get(pk=title_id)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_follows_reviews(self, user_client, admin):
+        reviews, titles, user, moderator = create_reviews(user_client, admin)
+        title = self.get_title(titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (12, 3), (
+            'Проверьте, что при создании отзыва обновляются `rating_sum` и `rating_count` произведения'
+        )
+        assert title.rating == 4, (
+            'Проверьте, что при создании отзыва пересчитывается `rating` произведения'
+        )
+
+        client_user = auth_client(user)
+        client_user.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/',
+            data={'score': 9})
+        title = self.get_title(titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (18, 3), (
+            'Проверьте, что при изменении оценки отзыва обновляется рейтинг произведения'
+        )
+
+        user_client.delete(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/')
+        title = self.get_title(titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (13, 2), (
+            'Проверьте, что при удалении отзыва обновляется рейтинг произведения'
+        )
+        assert title.rating == 6.5
+
+        moderator.delete()
+        user.delete()
+        title = self.get_title(titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (0, 0, None), (
+            'Проверьте, что при каскадном удалении отзывов рейтинг произведения сбрасывается'
+        )
+        response = user_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json().get('rating') is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_ratings(self, user_client, admin):
+        from api.models import Title
+        _, titles, _, _ = create_reviews(user_client, admin)
+        Title.objects.update(rating_sum=100, rating_count=1, rating=None)
+        call_command('rebuild_ratings', batch_size=1)
+        title = self.get_title(titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (12, 3, 4), (
+            'Проверьте, что команда `rebuild_ratings` восстанавливает рейтинг по отзывам'
+        )
+        title = self.get_title(titles[1]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (0, 0, None)
@@ -0,0 +1,65 @@
+import pytest
+
+from .common import create_reviews
+
+
+class Test08CursorPagination:
+
+    def create_titles(self, count):
+        from api.models import Title
+        Title.objects.bulk_create(Title(name=f'Title {i}') for i in range(count))
+
+    def collect(self, client, url):
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в режиме курсорной пагинации не выполняется подсчет `count`'
+            )
+            ids.extend(item['id'] for item in data['results'])
+            url = data['next']
+        return ids
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cursor(self, client):
+        from api.models import Title
+        self.create_titles(25)
+        ids = self.collect(client, '/api/v1/titles/?pagination=cursor')
+        assert ids == list(Title.objects.order_by('-id').values_list('id', flat=True)), (
+            'Проверьте, что при GET запросе `/api/v1/titles/?pagination=cursor` '
+            'страницы возвращают все произведения по убыванию `id`'
+        )
+
+        response = client.get('/api/v1/titles/?pagination=cursor')
+        next_page = client.get(response.json()['next']).json()
+        previous_page = client.get(next_page['previous']).json()
+        assert previous_page['results'] == response.json()['results'], (
+            'Проверьте, что ссылка `previous` курсорной пагинации возвращает предыдущую страницу'
+        )
+
+        data = client.get('/api/v1/titles/').json()
+        assert data['count'] == 25, (
+            'Проверьте, что по умолчанию сохраняется пагинация по номеру страницы'
+        )
+        assert client.get('/api/v1/titles/?pagination=cursor&search=title').status_code == 400, (
+            'Проверьте, что `search` с ранжированием отклоняется в режиме cursor, как и `ordering`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_comments_cursor(self, client, user_client, admin, settings):
+        reviews, titles, _, _ = create_reviews(user_client, admin)
+        settings.PAGINATION_MODE = 'cursor'
+        ids = self.collect(client, f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        assert ids == sorted((review['id'] for review in reviews), reverse=True), (
+            'Проверьте, что настройка `PAGINATION_MODE` включает курсорную пагинацию отзывов'
+        )
+        response = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/')
+        assert 'count' not in response.json()
+        response = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/?pagination=page')
+        assert response.json()['count'] == 3, (
+            'Проверьте, что параметр `pagination=page` возвращает пагинацию по номеру страницы'
+        )
@@ -0,0 +1,65 @@
+import pytest
+from rest_framework.pagination import PageNumberPagination
+
+from .common import create_comments
+
+
+def create_catalog(title_count):
+    from django.contrib.auth import get_user_model
+
+    from api.models import Category, Comment, Genre, Review, Title
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(3)]
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {i}', year=2000, category=category)
+        for i in range(title_count))
+    titles = list(Title.objects.all())
+    for title in titles:
+        title.genre.set(genres)
+    users = [
+        get_user_model().objects.create(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(title_count)
+    ]
+    title = titles[0]
+    reviews = [Review.objects.create(title=title, author=user, text='text', score=5) for user in users]
+    Comment.objects.bulk_create(
+        Comment(review=reviews[0], author=user, text='text') for user in users)
+    return title, reviews[0]
+
+
+class Test09QueryBudget:
+
+    @pytest.mark.parametrize('page_size', (10, 100))
+    @pytest.mark.django_db(transaction=True)
+    def test_01_list_budget(self, client, monkeypatch, django_assert_max_num_queries, page_size):
+        monkeypatch.setattr(PageNumberPagination, 'page_size', page_size)
+        title, review = create_catalog(page_size)
+        budgets = (
+            ('/api/v1/titles/', 3),
+            ('/api/v1/titles/?genre=genre-1&category=films', 3),
+            ('/api/v1/categories/', 2),
+            ('/api/v1/genres/', 2),
+            (f'/api/v1/titles/{title.id}/reviews/', 3),
+            (f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/', 3),
+        )
+        for url, budget in budgets:
+            with django_assert_max_num_queries(budget):
+                response = client.get(url)
+            assert response.status_code == 200
+            assert response.json()['results'], (
+                f'Проверьте, что при GET запросе `{url}` возвращаются данные'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_detail_budget(self, client, user_client, admin, django_assert_max_num_queries):
+        comments, reviews, titles, _, _ = create_comments(user_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        budgets = (
+            (f'/api/v1/titles/{title_id}/', 2),
+            (f'/api/v1/titles/{title_id}/reviews/{review_id}/', 2),
+            (f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comments[0]["id"]}/', 2),
+        )
+        for url, budget in budgets:
+            with django_assert_max_num_queries(budget):
+                response = client.get(url)
+            assert response.status_code == 200
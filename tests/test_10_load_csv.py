@@ -0,0 +1,46 @@
+import io
+import os
+
+import pytest
+from django.core.management import call_command
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+class Test10LoadCsv:
+
+    def count_rows(self, filename):
+        import csv
+        with open(os.path.join(DATA_DIR, filename), encoding='utf-8', newline='') as csv_file:
+            return sum(1 for _ in csv.DictReader(csv_file))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_load_csv(self, client):
+        from api.models import Comment, Review, Title
+        call_command('load_csv', path=DATA_DIR, batch_size=7, stdout=io.StringIO())
+        assert Title.objects.count() == self.count_rows('titles.csv'), (
+            'Проверьте, что команда `load_csv` загружает все произведения'
+        )
+        assert Title.genre.through.objects.count() == self.count_rows('genre_title.csv'), (
+            'Проверьте, что команда `load_csv` загружает жанры произведений'
+        )
+        reviews = Review.objects.count()
+        assert 0 < reviews <= self.count_rows('review.csv'), (
+            'Проверьте, что команда `load_csv` загружает отзывы'
+        )
+        assert Comment.objects.count() == self.count_rows('comments.csv')
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что команда `load_csv` сохраняет `pub_date` из файла'
+        )
+        title = Title.objects.get(pk=1)
+        assert title.rating_count == title.reviews.count(), (
+            'Проверьте, что после загрузки отзывов пересчитывается рейтинг'
+        )
+
+        out = io.StringIO()
+        call_command('load_csv', path=DATA_DIR, stdout=out)
+        assert 'загружено 0' in out.getvalue()
+        assert Review.objects.count() == reviews, (
+            'Проверьте, что повторный запуск `load_csv` не дублирует данные'
+        )
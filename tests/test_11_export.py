@@ -0,0 +1,69 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_reviews
+
+
+class Test11Export:
+
+    def read_lines(self, response):
+        content = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_export_endpoint(self, client, user_client, admin):
+        reviews, titles, user, _ = create_reviews(user_client, admin)
+        response = client.get('/api/v1/titles/export/')
+        assert response.status_code == 401, (
+            'Проверьте, что выгрузка `/api/v1/titles/export/` недоступна без токена'
+        )
+        response = auth_client(user).get('/api/v1/titles/export/')
+        assert response.status_code == 403, (
+            'Проверьте, что выгрузка `/api/v1/titles/export/` доступна только администратору'
+        )
+        response = user_client.get('/api/v1/titles/export/')
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = self.read_lines(response)
+        assert [line['id'] for line in lines] == [titles[0]['id'], titles[1]['id']], (
+            'Проверьте, что выгрузка содержит все произведения по возрастанию `id`'
+        )
+        first = lines[0]
+        assert first['rating'] == 4
+        assert first['category']['slug'] == titles[0]['category']
+        assert sorted(genre['slug'] for genre in first['genre']) == sorted(titles[0]['genre'])
+        assert sorted(review['id'] for review in first['reviews']) == sorted(
+            review['id'] for review in reviews), (
+            'Проверьте, что выгрузка содержит отзывы произведения'
+        )
+
+        response = user_client.get(f'/api/v1/titles/export/?since={titles[0]["id"]}')
+        assert [line['id'] for line in self.read_lines(response)] == [titles[1]['id']], (
+            'Проверьте, что параметр `since` выгружает только произведения с большим `id`'
+        )
+        response = user_client.get('/api/v1/titles/export/?since=abc')
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_export_command(self, user_client, admin):
+        _, titles, _, _ = create_reviews(user_client, admin)
+        out = io.StringIO()
+        call_command('export_catalog', chunk_size=1, stdout=out)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert [line['id'] for line in lines] == [title['id'] for title in titles], (
+            'Проверьте, что команда `export_catalog` выгружает все произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_reviews_streamed(self, user_client, admin):
+        from api.export import export_catalog
+        reviews, titles, _, _ = create_reviews(user_client, admin)
+        parts = list(export_catalog(chunk_size=1))
+        assert len(parts) == 2 * len(titles) + len(reviews), (
+            'Проверьте, что отзывы выгружаются по одному, а не собираются в памяти'
+        )
+        lines = [json.loads(line) for line in ''.join(parts).splitlines()]
+        assert [len(line['reviews']) for line in lines] == [3, 0]
@@ -0,0 +1,62 @@
+import io
+import os
+
+import pytest
+from django.core.management import call_command
+
+
+class Test12EmailOutbox:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_code_is_queued(self, client, settings, tmp_path):
+        from api.models import OutgoingEmail
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+        settings.EMAIL_FILE_PATH = str(tmp_path)
+        response = client.post('/api/v1/auth/email/', data={'email': 'new@yamdb.fake'})
+        assert response.status_code == 200
+        assert not os.listdir(tmp_path), (
+            'Проверьте, что `/api/v1/auth/email/` не отправляет письмо во время запроса'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.to == 'new@yamdb.fake' and email.sent_at is None, (
+            'Проверьте, что `/api/v1/auth/email/` кладет письмо в очередь исходящих писем'
+        )
+
+        call_command('send_emails', once=True, workers=2, stdout=io.StringIO())
+        email.refresh_from_db()
+        assert email.sent_at is not None and email.attempts == 1, (
+            'Проверьте, что команда `send_emails` отправляет письма из очереди'
+        )
+        sent = ''.join(open(tmp_path / name).read() for name in os.listdir(tmp_path))
+        assert 'new@yamdb.fake' in sent and 'confirmation_code' in sent
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_failed_email_is_retried(self, monkeypatch, settings):
+        from django.core import mail
+        from django.utils import timezone
+
+        from api.models import OutgoingEmail
+        from api.outbox import queue_email, send_pending
+
+        for number in range(5):
+            queue_email('Тема', 'Текст', f'user{number}@yamdb.fake')
+
+        def send_messages(backend, messages):
+            raise ConnectionError('SMTP недоступен')
+        monkeypatch.setattr('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                            send_messages)
+        assert send_pending(workers=3) == (0, 5)
+        email = OutgoingEmail.objects.first()
+        assert email.attempts == 1 and email.next_attempt_at > timezone.now(), (
+            'Проверьте, что неотправленное письмо откладывается на следующую попытку'
+        )
+        assert 'SMTP' in email.last_error
+        assert send_pending() == (0, 0), (
+            'Проверьте, что письма не отправляются повторно до наступления следующей попытки'
+        )
+
+        monkeypatch.undo()
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        assert send_pending(batch_size=3) == (3, 0)
+        assert send_pending(batch_size=3) == (2, 0)
+        assert len(mail.outbox) == 5
@@ -0,0 +1,51 @@
+import pytest
+
+from .common import auth_client, create_users_api
+
+
+class Test13CachedAuthentication:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cached_user(self, client, user_client, django_assert_num_queries):
+        client.get('/api/v1/titles/')
+        user_client.get('/api/v1/titles/')
+        # Titles list is served from response cache, user is not queried.
+        with django_assert_num_queries(0):
+            user_client.get('/api/v1/titles/')
+        with django_assert_num_queries(0):
+            client.get('/api/v1/titles/')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_invalidation(self, user_client):
+        user, _ = create_users_api(user_client)
+        client_user = auth_client(user)
+        assert client_user.get('/api/v1/users/').status_code == 403
+
+        user_client.patch(f'/api/v1/users/{user.username}/', data={'role': 'admin'})
+        assert client_user.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что после смены роли пользователя права применяются сразу'
+        )
+
+        response = client_user.get('/api/v1/users/me/')
+        assert response.json()['email'] == user.email, (
+            'Проверьте, что `/api/v1/users/me/` возвращает полные данные пользователя'
+        )
+
+        user_client.delete(f'/api/v1/users/{user.username}/')
+        assert client_user.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что токен удаленного пользователя перестает действовать'
+        )
+
+    def test_03_lru_ttl(self, monkeypatch):
+        from api.authentication import UserRecordCache
+        now = [0]
+        monkeypatch.setattr('api.authentication.time.monotonic', lambda: now[0])
+        cache = UserRecordCache(maxsize=2, ttl=10)
+        cache.set(1, 'first')
+        cache.set(2, 'second')
+        assert cache.get(1) == 'first'
+        cache.set(3, 'third')
+        assert cache.get(2) is None, 'Проверьте, что вытесняется давно не использованная запись'
+        assert cache.get(1) == 'first'
+        now[0] = 11
+        assert cache.get(1) is None, 'Проверьте, что запись устаревает по TTL'
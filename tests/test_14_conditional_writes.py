@@ -0,0 +1,55 @@
+import pytest
+
+from .common import auth_client, create_comments, create_reviews
+
+
+class Test14ConditionalWrites:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_comment_writes(self, user_client, admin, django_assert_num_queries):
+        comments, reviews, titles, user, moderator = create_comments(user_client, admin)
+        client_user = auth_client(user)
+        client_user.get('/api/v1/titles/')
+        pre_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+
+        # BEGIN of write transaction, UPDATE and SELECT for response
+        with django_assert_num_queries(3):
+            response = client_user.patch(f'{pre_url}{comments[1]["id"]}/', data={'text': 'new'})
+        assert response.status_code == 200 and response.json()['text'] == 'new', (
+            'Проверьте, что автор может изменить свой комментарий'
+        )
+        with django_assert_num_queries(3):
+            response = client_user.patch(f'{pre_url}{comments[0]["id"]}/', data={'text': 'new'})
+        assert response.status_code == 403
+        # BEGIN, SELECT for delete signals and DELETE
+        with django_assert_num_queries(3):
+            response = client_user.delete(f'{pre_url}{comments[1]["id"]}/')
+        assert response.status_code == 204, (
+            'Проверьте, что удаление комментария выполняется одним условным запросом'
+        )
+        response = client_user.delete(f'{pre_url}{comments[1]["id"]}/')
+        assert response.status_code == 404
+        other_review = f'/api/v1/titles/{titles[1]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        response = user_client.delete(f'{other_review}{comments[0]["id"]}/')
+        assert response.status_code == 404, (
+            'Проверьте, что комментарий нельзя удалить через чужое произведение'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_review_score_update(self, user_client, admin):
+        from api.models import Title
+        reviews, titles, user, moderator = create_reviews(user_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = auth_client(user).patch(f'{url}{reviews[0]["id"]}/', data={'score': 10})
+        assert response.status_code == 403
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.rating_sum == 12, (
+            'Проверьте, что запрещенное изменение отзыва не меняет рейтинг'
+        )
+        response = auth_client(moderator).patch(f'{url}{reviews[0]["id"]}/', data={'score': 8})
+        assert response.status_code == 200 and response.json()['score'] == 8
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating) == (15, 5), (
+            'Проверьте, что изменение оценки модератором пересчитывает рейтинг'
+        )
+
@@ -0,0 +1,34 @@
+import logging
+
+import pytest
+
+from .common import create_titles
+
+
+class Test15RequestMetrics:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_server_timing(self, client, user_client, caplog, settings):
+        create_titles(user_client)
+        with caplog.at_level(logging.INFO, logger='api.metrics'):
+            response = client.get('/api/v1/titles/')
+        timing = response['Server-Timing']
+        assert 'db;dur=' in timing and 'serializer;dur=' in timing and 'total;dur=' in timing, (
+            'Проверьте, что ответ содержит заголовок `Server-Timing` с временем БД, сериализации и запроса'
+        )
+        assert 'desc="3 queries"' in timing
+        record = caplog.records[-1]
+        assert record.metrics['route'] == 'titles-list', (
+            'Проверьте, что в лог пишется имя маршрута'
+        )
+        assert record.metrics['queries'] == 3 and not record.metrics['slow']
+        assert record.metrics['serializer_ms'] > 0
+
+        settings.REQUEST_METRICS_THRESHOLDS = {'QUERIES': 1, 'DB_MS': 1000, 'TOTAL_MS': 1000}
+        with caplog.at_level(logging.INFO, logger='api.metrics'):
+            client.get(f'/api/v1/titles/{response.json()["results"][0]["id"]}/')
+        record = caplog.records[-1]
+        assert record.levelno == logging.WARNING and record.metrics['slow'], (
+            'Проверьте, что запросы сверх порогов помечаются как медленные'
+        )
+        assert record.metrics['route'] == 'titles-detail'
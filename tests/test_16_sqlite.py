@@ -0,0 +1,33 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+
+class Test16SqliteProfile:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_pragmas(self, settings):
+        from django.db import connection
+
+        from api.signals import apply_sqlite_pragmas
+        settings.SQLITE_PRAGMAS = {'cache_size': -1234, 'busy_timeout': 777}
+        apply_sqlite_pragmas(None, connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            assert cursor.fetchone()[0] == -1234, (
+                'Проверьте, что при подключении к SQLite применяются `SQLITE_PRAGMAS`'
+            )
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] == 777
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_db_maintain(self):
+        out = io.StringIO()
+        call_command('db_maintain', stdout=out)
+        assert 'ANALYZE' in out.getvalue(), (
+            'Проверьте, что команда `db_maintain` выполняет ANALYZE и выводит время'
+        )
+        out = io.StringIO()
+        call_command('db_maintain', full_vacuum=True, stdout=out)
+        assert 'VACUUM' in out.getvalue()
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+
+from .common import create_reviews
+
+
+def sqlite_connection(path):
+    from django.db import connections
+    from django.db.backends.sqlite3.base import DatabaseWrapper
+    settings_dict = dict(connections['default'].settings_dict, NAME=str(path), OPTIONS={'timeout': 0})
+    return DatabaseWrapper(settings_dict, alias='stress')
+
+
+class Test17WriteQueue:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_concurrent_writes_to_file(self, tmp_path):
+        from api.writes import WriteQueue
+        path = tmp_path / 'stress.sqlite3'
+        setup = sqlite_connection(path)
+        with setup.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id INTEGER PRIMARY KEY, worker INTEGER)')
+        setup.close()
+
+        queue = WriteQueue(timeout=30, retries=500, backoff=0.001, max_backoff=0.02)
+        stop = threading.Event()
+        workers, writes = 6, 30
+        errors = []
+
+        def insert(connection, worker):
+            with connection.cursor() as cursor:
+                cursor.execute('INSERT INTO item (worker) VALUES (%s)', (worker,))
+
+        def queued_writer(worker):
+            connection = sqlite_connection(path)
+            try:
+                for _ in range(writes):
+                    queue.run(insert, connection, worker)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        def other_process_writer():
+            # Holds write lock outside of the queue, as another process would.
+            connection = sqlite_connection(path)
+            connection.ensure_connection()
+            raw = connection.connection
+            while not stop.is_set():
+                try:
+                    raw.execute('BEGIN IMMEDIATE')
+                    raw.execute('INSERT INTO item (worker) VALUES (-1)')
+                    time.sleep(0.005)
+                    raw.execute('COMMIT')
+                except Exception:
+                    if raw.in_transaction:
+                        raw.execute('ROLLBACK')
+                time.sleep(0.001)
+            connection.close()
+
+        blocker = threading.Thread(target=other_process_writer)
+        blocker.start()
+        threads = [threading.Thread(target=queued_writer, args=(worker,)) for worker in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stop.set()
+        blocker.join()
+
+        assert not errors, f'Проверьте, что записи через очередь не падают с ошибкой: {errors[:1]}'
+        check = sqlite_connection(path)
+        with check.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM item WHERE worker >= 0')
+            assert cursor.fetchone()[0] == workers * writes, (
+                'Проверьте, что все записи через очередь сохраняются при блокировках базы'
+            )
+        check.close()
+        stats = queue.stats()
+        assert stats['writes'] == workers * writes and stats['depth'] == 0
+        assert stats['max_depth'] > 1 and stats['failures'] == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_busy_response_and_metrics(self, user_client, admin, monkeypatch):
+        from api.writes import get_write_queue
+        reviews, titles, _, _ = create_reviews(user_client, admin)
+        queue = get_write_queue()
+        monkeypatch.setattr(queue, 'timeout', 0.01)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        with queue.lock:
+            response = user_client.post(url, data={'text': 'Текст'})
+        assert response.status_code == 503, (
+            'Проверьте, что при переполненной очереди записи возвращается статус 503'
+        )
+        response = user_client.post(url, data={'text': 'Текст'})
+        assert response.status_code == 201
+        assert 'write-queue;dur=' in response['Server-Timing']
+
+        stats = user_client.get('/api/v1/metrics/').json()['write_queue']
+        assert stats['timeouts'] >= 1 and stats['writes'] >= 1, (
+            'Проверьте, что `/api/v1/metrics/` возвращает счетчики очереди записи'
+        )
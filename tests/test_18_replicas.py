@@ -0,0 +1,121 @@
+import sqlite3
+
+import pytest
+
+from .common import auth_client, create_comments, create_reviews
+
+REPLICA = 'replica_test'
+
+
+@pytest.fixture
+def replica(tmp_path, settings):
+    """
+    Replica stand-in: file copy of primary, it lags until next sync().
+    """
+    from django.core.cache import cache
+    from django.db import connections
+    path = str(tmp_path / 'replica.sqlite3')
+    connections.databases[REPLICA] = dict(connections['default'].settings_dict, NAME=path)
+    settings.DATABASE_REPLICAS = [REPLICA]
+    cache.clear()
+
+    def sync():
+        connections[REPLICA].close()
+        connections['default'].ensure_connection()
+        target = sqlite3.connect(path)
+        connections['default'].connection.backup(target)
+        target.close()
+
+    yield sync
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.databases[REPLICA]
+
+
+class Test18ReplicaRouter:
+
+    def comment_texts(self, client, url):
+        return {comment['text'] for comment in client.get(url).json()['results']}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_read_your_writes(self, client, user_client, admin, replica, settings):
+        comments, reviews, titles, user, _ = create_comments(user_client, admin)
+        replica()
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        client_user = auth_client(user)
+        assert len(self.comment_texts(client_user, url)) == 3
+
+        response = client_user.post(url, data={'text': 'свежий'})
+        assert response.status_code == 201, (
+            'Проверьте, что запись выполняется в основную базу при настроенных репликах'
+        )
+        assert 'свежий' not in self.comment_texts(client, url), (
+            'Проверьте, что безопасные запросы читают из реплики'
+        )
+        assert 'свежий' in self.comment_texts(client_user, url), (
+            'Проверьте, что после записи пользователь читает из основной базы'
+        )
+
+        settings.REPLICA_STICKY_SECONDS = 0
+        client_user.post(url, data={'text': 'еще один'})
+        assert 'еще один' not in self.comment_texts(client_user, url), (
+            'Проверьте, что после окончания окна пользователь снова читает из реплики'
+        )
+
+        replica()
+        assert {'свежий', 'еще один'} <= self.comment_texts(client, url), (
+            'Проверьте, что после синхронизации реплики новые данные видны всем'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_only_catalog_views(self, user_client, admin, replica):
+        from django.db import connections
+        replica()
+        connections[REPLICA].close()
+        # The replica file is not a database now, only catalog reads notice it.
+        with open(connections.databases[REPLICA]['NAME'], 'w') as replica_file:
+            replica_file.write('not a database')
+        assert user_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что запросы вне каталога читают из основной базы'
+        )
+        with pytest.raises(Exception):
+            user_client.get('/api/v1/titles/1/reviews/')
+        assert user_client.get('/api/v1/genres/').status_code == 200, (
+            'Проверьте, что кешируемые ответы вычисляются в основной базе'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_cache_filled_from_primary(self, client, user_client, admin, replica):
+        reviews, titles, user, _ = create_reviews(user_client, admin)
+        replica()
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] == 4
+        client_user = auth_client(user)
+        client_user.patch(f'{url}reviews/{reviews[1]["id"]}/', data={'score': 9})
+        client.get(url)
+        assert client_user.get(url).json()['rating'] == 6, (
+            'Проверьте, что кеш заполняется из основной базы: '
+            'иначе автор записи получает из кеша данные отстающей реплики'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_validators_of_primary_reads(self, client, user_client, admin, replica):
+        comments, reviews, titles, user, _ = create_comments(user_client, admin)
+        replica()
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        client_user = auth_client(user)
+        client_user.post(url, data={'text': 'свежий'})
+        assert 'ETag' not in client.get(url), (
+            'Проверьте, что ответ из реплики отдается без ETag: '
+            'реплика может отставать от версии данных'
+        )
+        response = client_user.get(url)
+        assert 'ETag' in response
+        assert client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 304, (
+            'Проверьте, что ETag ответа из основной базы подтверждается без чтения реплики'
+        )
+        # First response creates versions of the title.
+        client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert 'ETag' in client.get(f'/api/v1/titles/{titles[0]["id"]}/'), (
+            'Проверьте, что ответы из кеша, вычисленные в основной базе, отдаются с ETag'
+        )
@@ -0,0 +1,70 @@
+import pytest
+
+from .common import create_categories, create_genre
+
+
+class Test19ListCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cached_lists(self, client, user_client, django_assert_num_queries):
+        from api.caching import get_response_cache
+        from api.models import Genre
+        create_categories(user_client)
+        create_genre(user_client)
+        stats = get_response_cache('categories').stats()
+
+        client.get('/api/v1/categories/')
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/categories/')
+        assert len(response.json()['results']) == 2, (
+            'Проверьте, что повторный запрос `/api/v1/categories/` отдается из кеша без запросов к базе'
+        )
+        assert get_response_cache('categories').stats()['hits'] == stats['hits'] + 1
+
+        response = client.get('/api/v1/categories/?search=Книги')
+        assert [item['slug'] for item in response.json()['results']] == ['books'], (
+            'Проверьте, что ключ кеша учитывает параметры запроса'
+        )
+
+        user_client.delete('/api/v1/categories/books/')
+        response = client.get('/api/v1/categories/')
+        assert len(response.json()['results']) == 1, (
+            'Проверьте, что удаление категории сбрасывает кеш списка'
+        )
+
+        client.get('/api/v1/genres/')
+        Genre.objects.create(name='Фэнтези', slug='fantasy')
+        assert len(client.get('/api/v1/genres/').json()['results']) == 4, (
+            'Проверьте, что изменения жанров вне API (например, в админке) сбрасывают кеш'
+        )
+
+        stats = user_client.get('/api/v1/metrics/').json()['response_cache']
+        assert stats['genres']['misses'] >= 2 and stats['categories']['hits'] >= 1, (
+            'Проверьте, что `/api/v1/metrics/` возвращает счетчики попаданий в кеш'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_invalidation_after_commit(self, client):
+        import io
+
+        from django.core.management import call_command
+        from django.db import transaction
+
+        from api.caching import get_response_cache
+        from api.models import Category, Genre
+
+        from .test_10_load_csv import DATA_DIR
+        genres = get_response_cache('genres')
+        with transaction.atomic():
+            Genre.objects.create(name='Фэнтези', slug='fantasy')
+            # Version a concurrent reader would fill with rows before commit.
+            version = genres.get_version()
+        assert genres.get_version() != version, (
+            'Проверьте, что кеш списка сбрасывается еще раз после фиксации транзакции'
+        )
+
+        client.get('/api/v1/categories/')
+        call_command('load_csv', path=DATA_DIR, stdout=io.StringIO())
+        assert client.get('/api/v1/categories/').json()['count'] == Category.objects.count(), (
+            'Проверьте, что `load_csv` сбрасывает кеш списков категорий и жанров'
+        )
@@ -0,0 +1,66 @@
+import pytest
+
+from .common import auth_client, create_reviews
+
+
+class Test20TitleCache:
+
+    def get_title(self, client, title_id):
+        return client.get(f'/api/v1/titles/{title_id}/').json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cached_detail(self, client, user_client, admin, django_assert_num_queries):
+        reviews, titles, user, _ = create_reviews(user_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        client.get(url)
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response.json()['rating'] == 4, (
+            'Проверьте, что повторный запрос `/api/v1/titles/{title_id}/` отдается из кеша'
+        )
+
+        auth_client(user).patch(f'{url}reviews/{reviews[1]["id"]}/', data={'score': 9})
+        assert self.get_title(client, titles[0]['id'])['rating'] == 6, (
+            'Проверьте, что изменение оценки отзыва сбрасывает кеш произведения'
+        )
+        user_client.delete(f'{url}reviews/{reviews[0]["id"]}/')
+        assert self.get_title(client, titles[0]['id'])['rating'] == 6.5, (
+            'Проверьте, что удаление отзыва сбрасывает кеш произведения'
+        )
+
+        user_client.patch(url, data={'name': 'Поворот обратно', 'genre': ['drama']})
+        title = self.get_title(client, titles[0]['id'])
+        assert title['name'] == 'Поворот обратно' and [genre['slug'] for genre in title['genre']] == ['drama'], (
+            'Проверьте, что изменение произведения и его жанров сбрасывает кеш'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_related_changes(self, client, user_client, admin):
+        from api.models import Genre, Title
+        _, titles, _, _ = create_reviews(user_client, admin)
+        first, second = (title['id'] for title in titles)
+        self.get_title(client, first)
+        self.get_title(client, second)
+
+        genre = Genre.objects.get(slug='horror')
+        genre.name = 'Хоррор'
+        genre.save()
+        assert 'Хоррор' in {item['name'] for item in self.get_title(client, first)['genre']}, (
+            'Проверьте, что переименование жанра сбрасывает кеш его произведений'
+        )
+
+        user_client.delete('/api/v1/categories/books/')
+        assert self.get_title(client, second)['category'] is None, (
+            'Проверьте, что удаление категории сбрасывает кеш ее произведений'
+        )
+        user_client.delete('/api/v1/genres/drama/')
+        assert self.get_title(client, second)['genre'] == [], (
+            'Проверьте, что удаление жанра сбрасывает кеш его произведений'
+        )
+
+        Genre.objects.get(slug='comedy').title_set.clear()
+        assert 'comedy' not in {item['slug'] for item in self.get_title(client, first)['genre']}, (
+            'Проверьте, что изменение связей со стороны жанра сбрасывает кеш'
+        )
+        Title.objects.get(pk=first).genre.add(Genre.objects.get(slug='comedy'))
+        assert 'comedy' in {item['slug'] for item in self.get_title(client, first)['genre']}
@@ -0,0 +1,130 @@
+import pytest
+
+from .common import auth_client, create_comments
+
+
+class Test21ConditionalGet:
+
+    def fetch(self, client, url):
+        # The first response of content creates its versions.
+        client.get(url)
+        return client.get(url)
+
+    def advance(self, monkeypatch, seconds):
+        import time
+        time_ns = time.time_ns
+        monkeypatch.setattr(time, 'time_ns', lambda: time_ns() + seconds * 10 ** 9)
+
+    def assert_not_modified(self, client, url, response, assert_num_queries):
+        with assert_num_queries(0):
+            cached = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert cached.status_code == 304, (
+            f'Проверьте, что GET запрос `{url}` с актуальным `If-None-Match` возвращает 304 без запросов к базе'
+        )
+        assert cached['ETag'] == response['ETag']
+
+    def assert_modified(self, client, url, response, message):
+        fresh = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert fresh.status_code == 200 and fresh['ETag'] != response['ETag'], message
+        return fresh
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reviews_and_comments(self, client, user_client, admin, django_assert_num_queries):
+        comments, reviews, titles, user, moderator = create_comments(user_client, admin)
+        client_user = auth_client(user)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+
+        response = self.fetch(client, reviews_url)
+        assert response.has_header('ETag'), (
+            'Проверьте, что ответ со списком отзывов содержит `ETag`'
+        )
+        self.assert_not_modified(client, reviews_url, response, django_assert_num_queries)
+        client_user.patch(f'{reviews_url}{reviews[1]["id"]}/', data={'text': 'изменен'})
+        self.assert_modified(
+            client, reviews_url, response,
+            'Проверьте, что изменение отзыва меняет `ETag` списка отзывов'
+        )
+
+        detail_url = f'{comments_url}{comments[1]["id"]}/'
+        response = self.fetch(client, detail_url)
+        self.assert_not_modified(client, detail_url, response, django_assert_num_queries)
+        response = self.fetch(client, comments_url)
+        client_user.patch(detail_url, data={'text': 'изменен'})
+        response = self.assert_modified(
+            client, comments_url, response,
+            'Проверьте, что изменение комментария меняет `ETag` списка комментариев'
+        )
+        client_user.delete(detail_url)
+        response = self.assert_modified(
+            client, comments_url, response,
+            'Проверьте, что удаление комментария меняет `ETag` списка комментариев'
+        )
+
+        user_client.patch(f'/api/v1/users/{moderator.username}/', data={'username': 'renamed'})
+        self.assert_modified(
+            client, comments_url, response,
+            'Проверьте, что смена имени автора меняет `ETag` его комментариев'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_titles(self, client, user_client, admin, django_assert_num_queries, monkeypatch):
+        _, reviews, titles, user, _ = create_comments(user_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        self.fetch(client, title_url)
+        self.advance(monkeypatch, 2)
+        response = client.get(title_url)
+        assert response.has_header('Last-Modified'), (
+            'Проверьте, что ответ с произведением содержит `Last-Modified`'
+        )
+        with django_assert_num_queries(0):
+            cached = client.get(title_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        assert cached.status_code == 304, (
+            'Проверьте, что GET запрос произведения с `If-Modified-Since` возвращает 304'
+        )
+        list_response = self.fetch(client, '/api/v1/titles/')
+        self.assert_not_modified(client, '/api/v1/titles/', list_response, django_assert_num_queries)
+        assert client.get(
+            '/api/v1/titles/?year=2000', HTTP_IF_NONE_MATCH=list_response['ETag']
+        ).status_code == 200, 'Проверьте, что `ETag` учитывает параметры запроса'
+
+        auth_client(user).patch(f'{title_url}reviews/{reviews[1]["id"]}/', data={'score': 1})
+        self.assert_modified(
+            client, title_url, response,
+            'Проверьте, что изменение оценки меняет `ETag` произведения'
+        )
+        self.assert_modified(
+            client, '/api/v1/titles/', list_response,
+            'Проверьте, что изменение оценки меняет `ETag` списка произведений'
+        )
+        assert client.get(
+            title_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        ).status_code == 200, 'Проверьте, что изменение оценки меняет `Last-Modified` произведения'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_validators_of_new_content(self, client, user_client, admin):
+        import time
+
+        from django.core.cache import cache
+        from django.utils.http import http_date
+
+        from api.caching import review_versions, title_cache
+        _, reviews, titles, user, _ = create_comments(user_client, admin)
+        future = http_date(time.time() + 3600)
+        for url in ('/api/v1/titles/9999/', '/api/v1/titles/9999/reviews/'):
+            assert client.get(url, HTTP_IF_MODIFIED_SINCE=future).status_code == 404, (
+                f'Проверьте, что `{url}` несуществующего объекта возвращает 404, а не 304'
+            )
+        assert cache.get(title_cache.object_version_key(9999)) is None
+        assert cache.get(review_versions.object_version_key(9999)) is None, (
+            'Проверьте, что запросы несуществующих объектов не создают версий в кеше'
+        )
+
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        self.fetch(client, reviews_url)
+        auth_client(user).patch(f'{reviews_url}{reviews[1]["id"]}/', data={'text': 'изменен'})
+        response = client.get(reviews_url, HTTP_IF_MODIFIED_SINCE=http_date(time.time()))
+        assert response.status_code == 200 and not response.has_header('Last-Modified'), (
+            'Проверьте, что для данных, измененных меньше секунды назад, '
+            '`Last-Modified` не отдается и `If-Modified-Since` не учитывается'
+        )
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+from rest_framework.response import Response
+
+
+class Test22SingleFlight:
+
+    @pytest.fixture
+    def response_cache(self):
+        from django.core.cache import cache
+
+        from api.caching import ResponseCache
+        cache.clear()
+        return ResponseCache('test-single-flight')
+
+    def slow_compute(self, calls, data=None, status=200):
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return Response(data or {'value': len(calls)}, status=status)
+        return compute
+
+    def fetch_concurrently(self, response_cache, key, compute, count=10):
+        responses = []
+        threads = [
+            threading.Thread(target=lambda: responses.append(response_cache.fetch(key, compute)))
+            for _ in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return responses
+
+    def test_01_coalesce_in_process(self, response_cache):
+        calls = []
+        responses = self.fetch_concurrently(response_cache, 'key', self.slow_compute(calls))
+        assert len(calls) == 1, (
+            'Проверьте, что одновременные одинаковые запросы вычисляются один раз'
+        )
+        assert {response.data['value'] for response in responses} == {1}
+        assert response_cache.stats()['coalesced'] == 9
+
+        calls = []
+        responses = self.fetch_concurrently(
+            response_cache, 'missing', self.slow_compute(calls, status=404), count=3)
+        assert {response.status_code for response in responses} == {404}
+        assert len(calls) >= 2, 'Проверьте, что ответы с ошибкой не попадают в кеш'
+
+    def test_02_lock_across_processes(self, response_cache):
+        from django.core.cache import cache
+        calls = []
+        assert response_cache.acquire('key')
+        # Another process stores entry and releases its lock.
+        timer = threading.Timer(0.1, lambda: (response_cache.set('key', {'value': 'other'}),
+                                              response_cache.release('key')))
+        timer.start()
+        response = response_cache.fetch('key', self.slow_compute(calls))
+        timer.join()
+        assert not calls and response.data == {'value': 'other'}, (
+            'Проверьте, что процесс ждет результат другого процесса, держащего блокировку'
+        )
+        assert cache.get('key:lock') is None
+
+    def test_03_stale_while_revalidate(self, response_cache, settings):
+        settings.RESPONSE_CACHE_SOFT_TIMEOUT = 0
+        calls = []
+        compute = self.slow_compute(calls)
+        assert response_cache.fetch('key', compute).data == {'value': 1}
+
+        assert response_cache.acquire('key')
+        response = response_cache.fetch('key', compute)
+        assert response.data == {'value': 1} and len(calls) == 1, (
+            'Проверьте, что устаревшая запись отдается, пока другой процесс ее обновляет'
+        )
+        assert response_cache.stats()['stale'] == 1
+        response_cache.release('key')
+
+        responses = self.fetch_concurrently(response_cache, 'key', compute, count=5)
+        assert len(calls) == 2, 'Проверьте, что устаревшую запись обновляет один процесс'
+        assert {response.data['value'] for response in responses} == {1, 2}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_titles_list_cache(self, client, user_client, django_assert_num_queries):
+        from .common import create_titles
+        titles, _, _ = create_titles(user_client)
+        client.get('/api/v1/titles/')
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/titles/')
+        assert len(response.json()['results']) == 2, (
+            'Проверьте, что список произведений отдается из кеша'
+        )
+        user_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Новое имя'})
+        names = {title['name'] for title in client.get('/api/v1/titles/').json()['results']}
+        assert 'Новое имя' in names, (
+            'Проверьте, что изменение произведения сбрасывает кеш списка'
+        )
@@ -0,0 +1,73 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test23TitleSearch:
+
+    def search(self, client, query):
+        response = client.get('/api/v1/titles/', {'search': query})
+        assert response.status_code == 200
+        return [title['name'] for title in response.json()['results']]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search(self, client, user_client):
+        from api.models import Title
+        titles, _, _ = create_titles(user_client)
+        Title.objects.bulk_create([
+            Title(name='Вираж', description='Поворот и еще поворот'),
+            Title(name='Другое', description='Совсем другое'),
+        ])
+        assert self.search(client, 'ПОВОР') == ['Поворот туда', 'Вираж'], (
+            'Проверьте, что `search` ищет по началу слов без учета регистра '
+            'и сначала возвращает совпадения в названии'
+        )
+        assert self.search(client, 'драма года') == ['Проект'], (
+            'Проверьте, что `search` ищет по описанию и требует совпадения всех слов'
+        )
+        assert self.search(client, 'пике" ( * - ^') == ['Поворот туда'], (
+            'Проверьте, что операторы FTS5 в запросе не интерпретируются'
+        )
+        assert self.search(client, '***') == []
+
+        response = client.get('/api/v1/titles/', {'search': 'поворот', 'year': 2000})
+        assert [title['name'] for title in response.json()['results']] == ['Поворот туда'], (
+            'Проверьте, что `search` сочетается с другими фильтрами'
+        )
+
+        user_client.patch(f'/api/v1/titles/{titles[1]["id"]}/', data={'name': 'Переименован'})
+        assert self.search(client, 'переим') == ['Переименован'], (
+            'Проверьте, что индекс поиска обновляется при изменении произведения'
+        )
+        user_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert self.search(client, 'поворот') == ['Вираж'], (
+            'Проверьте, что удаленные произведения не находятся поиском'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_triggers_after_migrate(self, client):
+        from django.core.management import call_command
+        from django.db import connection
+
+        from api.models import Title
+        from api.search import SEARCH_TRIGGERS
+
+        def triggers():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+                return {name for name, in cursor.fetchall()} & set(SEARCH_TRIGGERS)
+
+        assert triggers() == set(SEARCH_TRIGGERS), (
+            'Проверьте, что после миграций есть триггеры индекса поиска'
+        )
+        # Lost as when a migration remakes api_title.
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER api_title_search_insert')
+        Title.objects.create(name='Потерянное')
+        call_command('migrate', verbosity=0)
+        assert triggers() == set(SEARCH_TRIGGERS), (
+            'Проверьте, что `migrate` восстанавливает потерянные триггеры индекса поиска'
+        )
+        assert self.search(client, 'потерян') == ['Потерянное'], (
+            'Проверьте, что после восстановления триггеров индекс поиска перестраивается'
+        )
@@ -0,0 +1,81 @@
+import pytest
+
+from .common import auth_client, create_reviews
+
+
+class Test24Autocomplete:
+
+    def suggest(self, client, query):
+        response = client.get('/api/v1/autocomplete/', {'q': query})
+        assert response.status_code == 200
+        return response.json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_suggestions(self, client, user_client, admin, django_assert_num_queries):
+        from api.models import Genre
+        _, titles, user, _ = create_reviews(user_client, admin)
+        response = user_client.post('/api/v1/titles/', data={
+            'name': 'Проект Ёж', 'year': 2021, 'genre': ['drama'], 'category': 'books'})
+        hedgehog_id = response.json()['id']
+
+        data = self.suggest(client, 'про')
+        assert [title['name'] for title in data['titles']] == ['Проект', 'Проект Ёж'], (
+            'Проверьте, что `/api/v1/autocomplete/` находит произведения по началу слов'
+        )
+        assert self.suggest(client, 'пов')['titles'] == [
+            {'id': titles[0]['id'], 'name': 'Поворот туда', 'year': 2000, 'rating': 4.0}]
+        with django_assert_num_queries(0):
+            data = self.suggest(client, 'ПРОЕКТ еж')
+        assert [title['name'] for title in data['titles']] == ['Проект Ёж'], (
+            'Проверьте, что подсказки строятся из памяти и учитывают все слова запроса'
+        )
+        assert self.suggest(client, 'кни')['categories'] == [{'name': 'Книги', 'slug': 'books'}]
+        assert self.suggest(client, 'д')['genres'] == [], (
+            'Проверьте, что слишком короткий запрос не выполняет поиск'
+        )
+
+        Genre.objects.create(name='Драматургия', slug='dramaturgy')
+        assert [genre['slug'] for genre in self.suggest(client, 'драм')['genres']] == [
+            'drama', 'dramaturgy'], 'Проверьте, что индекс обновляется при изменении жанров'
+
+        response = auth_client(user).post(
+            f'/api/v1/titles/{hedgehog_id}/reviews/', data={'text': 'отзыв', 'score': 5})
+        assert [title['name'] for title in self.suggest(client, 'проект')['titles']] == [
+            'Проект Ёж', 'Проект'], (
+            'Проверьте, что сначала подсказываются произведения с большим числом отзывов'
+        )
+        user_client.delete(f'/api/v1/titles/{hedgehog_id}/reviews/{response.json()["id"]}/')
+        assert [title['name'] for title in self.suggest(client, 'проект')['titles']] == [
+            'Проект', 'Проект Ёж']
+
+        user_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert [title['name'] for title in self.suggest(client, 'проект')['titles']] == ['Проект Ёж'], (
+            'Проверьте, что удаленные произведения не подсказываются'
+        )
+
+    def test_02_prefix_index(self):
+        from api.autocomplete import PrefixIndex
+        index = PrefixIndex()
+        for key, rank, name in ((1, (3, 1), 'Дом у реки'), (2, (1, 2), 'Речной дом'),
+                                (3, (2, 3), 'Дорога')):
+            index.add(key, rank, name, name)
+        assert index.search('до', 10) == ['Речной дом', 'Дорога', 'Дом у реки']
+        assert index.search('ре до', 10) == ['Речной дом', 'Дом у реки']
+        index.add(2, (4, 2), 'Речной дом', 'Речной дом')
+        index.remove(3)
+        assert index.search('до', 1) == ['Дом у реки']
+        assert index.words == ['дом', 'реки', 'речной', 'у']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rolled_back_changes(self, client, user_client, admin):
+        from django.db import transaction
+
+        from api.models import Genre
+        create_reviews(user_client, admin)
+        assert self.suggest(client, 'драм')['genres']
+        with pytest.raises(RuntimeError), transaction.atomic():
+            Genre.objects.create(name='Драматургия', slug='dramaturgy')
+            raise RuntimeError
+        assert [genre['slug'] for genre in self.suggest(client, 'драм')['genres']] == ['drama'], (
+            'Проверьте, что индекс обновляется только после фиксации транзакции'
+        )
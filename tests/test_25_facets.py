@@ -0,0 +1,46 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test25Facets:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_facets(self, client, user_client, django_assert_max_num_queries):
+        from api.models import Title
+        create_titles(user_client)
+        user_client.post('/api/v1/titles/', data={
+            'name': 'Третье', 'year': 2005, 'genre': ['drama', 'comedy'], 'category': 'films'})
+        Title.objects.create(name='Без всего')
+
+        with django_assert_max_num_queries(4):
+            response = client.get('/api/v1/titles/facets/')
+        assert response.status_code == 200
+        assert response.json() == {
+            'count': 4,
+            'genre': [{'slug': 'comedy', 'count': 2}, {'slug': 'drama', 'count': 2},
+                      {'slug': 'horror', 'count': 1}],
+            'category': [{'slug': 'films', 'count': 2}, {'slug': 'books', 'count': 1}],
+            'year': [{'year': 2000, 'count': 1}, {'year': 2005, 'count': 1},
+                     {'year': 2020, 'count': 1}],
+        }, 'Проверьте, что `/api/v1/titles/facets/` возвращает количество произведений по жанрам, категориям и годам'
+
+        response = client.get('/api/v1/titles/facets/', {'genre': 'drama', 'year_group': 'decade'})
+        data = response.json()
+        assert data['count'] == 2
+        assert data['genre'][0] == {'slug': 'comedy', 'count': 2}, (
+            'Проверьте, что фасет не учитывает собственный фильтр'
+        )
+        assert data['category'] == [{'slug': 'books', 'count': 1}, {'slug': 'films', 'count': 1}]
+        assert data['decade'] == [{'decade': 2000, 'count': 1}, {'decade': 2020, 'count': 1}], (
+            'Проверьте, что `year_group=decade` группирует годы по десятилетиям'
+        )
+
+        with django_assert_max_num_queries(0):
+            client.get('/api/v1/titles/facets/')
+        user_client.delete('/api/v1/genres/comedy/')
+        assert [genre['slug'] for genre in client.get('/api/v1/titles/facets/').json()['genre']] == [
+            'drama', 'horror'], 'Проверьте, что изменение жанров сбрасывает кеш фасетов'
+
+        assert client.get('/api/v1/titles/facets/', {'year_group': 'century'}).status_code == 400
+        assert client.get('/api/v1/titles/facets/', {'year': 'abc'}).status_code == 400
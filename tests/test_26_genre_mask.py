@@ -0,0 +1,89 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test26GenreMask:
+
+    def names(self, client, params):
+        response = client.get('/api/v1/titles/', params)
+        assert response.status_code == 200
+        return sorted(title['name'] for title in response.json()['results'])
+
+    def masks(self):
+        from api.models import Genre, Title
+        bits = dict(Genre.objects.values_list('slug', 'mask'))
+        return {
+            name: {slug for slug, bit in bits.items() if bit and mask & bit}
+            for name, mask in Title.objects.values_list('name', 'genre_mask')
+        }
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_mask_follows_genres(self, user_client):
+        from api.models import Genre, Title
+        titles, _, _ = create_titles(user_client)
+        assert len(set(Genre.objects.values_list('mask', flat=True))) == 3, (
+            'Проверьте, что каждый новый жанр получает свой бит маски'
+        )
+        assert self.masks() == {'Поворот туда': {'horror', 'comedy'}, 'Проект': {'drama'}}, (
+            'Проверьте, что маска жанров заполняется при создании произведения'
+        )
+
+        user_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data={'genre': ['drama']})
+        assert self.masks()['Поворот туда'] == {'drama'}, (
+            'Проверьте, что маска жанров обновляется при изменении жанров произведения'
+        )
+
+        drama = Genre.objects.get(slug='drama')
+        comedy = Genre.objects.get(slug='comedy')
+        comedy.title_set.add(*Title.objects.all())
+        assert self.masks() == {'Поворот туда': {'drama', 'comedy'}, 'Проект': {'drama', 'comedy'}}
+        drama.title_set.clear()
+        assert self.masks() == {'Поворот туда': {'comedy'}, 'Проект': {'comedy'}}, (
+            'Проверьте, что маска обновляется при изменении связей со стороны жанра'
+        )
+
+        mask = comedy.mask
+        user_client.delete('/api/v1/genres/comedy/')
+        assert self.masks() == {'Поворот туда': set(), 'Проект': set()}
+        assert Title.objects.filter(genre_mask=0).count() == 2, (
+            'Проверьте, что удаление жанра снимает его бит с произведений'
+        )
+        user_client.post('/api/v1/genres/', data={'name': 'Новый', 'slug': 'new'})
+        assert Genre.objects.get(slug='new').mask == mask, (
+            'Проверьте, что бит удаленного жанра переходит новому жанру'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_filter_modes(self, client, user_client, django_assert_max_num_queries):
+        create_titles(user_client)
+        user_client.post('/api/v1/titles/', data={
+            'name': 'Третье', 'year': 2005, 'genre': ['drama', 'comedy'], 'category': 'films'})
+
+        assert self.names(client, {'genre': 'comedy'}) == ['Поворот туда', 'Третье'], (
+            'Проверьте, что фильтр по одному жанру работает как раньше'
+        )
+        assert self.names(client, {'genre': 'horror,drama'}) == ['Поворот туда', 'Проект', 'Третье'], (
+            'Проверьте, что по умолчанию нужен любой из перечисленных жанров'
+        )
+        assert self.names(client, {'genre': 'drama,comedy', 'genre_mode': 'all'}) == ['Третье'], (
+            'Проверьте, что `genre_mode=all` требует все перечисленные жанры'
+        )
+        assert self.names(client, {'genre': 'drama,unknown', 'genre_mode': 'all'}) == []
+        assert self.names(client, {'genre': 'drama,unknown'}) == ['Проект', 'Третье']
+        assert client.get('/api/v1/titles/', {'genre': 'drama', 'genre_mode': 'some'}).status_code == 400
+
+        with django_assert_max_num_queries(3):
+            client.get('/api/v1/titles/', {'genre': 'horror,comedy,drama', 'genre_mode': 'all'})
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_genres_without_bit(self, client, user_client):
+        from api.models import Genre
+        create_titles(user_client)
+        Genre.objects.filter(slug='drama').update(mask=None)
+        user_client.post('/api/v1/titles/', data={
+            'name': 'Третье', 'year': 2005, 'genre': ['drama', 'comedy'], 'category': 'films'})
+        assert self.names(client, {'genre': 'drama'}) == ['Проект', 'Третье'], (
+            'Проверьте, что жанры без бита фильтруются через связи произведений'
+        )
+        assert self.names(client, {'genre': 'comedy,drama', 'genre_mode': 'all'}) == ['Третье']
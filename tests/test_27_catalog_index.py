@@ -0,0 +1,142 @@
+import time
+
+import pytest
+
+from .common import create_reviews
+
+CASES = (
+    {},
+    {'genre': 'comedy'},
+    {'genre': 'horror,drama'},
+    {'genre': 'drama,comedy', 'genre_mode': 'all'},
+    {'genre': 'drama,unknown', 'genre_mode': 'all'},
+    {'category': 'films', 'genre': 'drama'},
+    {'category': 'unknown'},
+    {'year': 2020},
+    {'year': 2005, 'category': 'films', 'page': 2},
+)
+
+
+@pytest.fixture
+def catalog_index(settings):
+    from django.core.cache import cache
+
+    from api.catalog import catalog_index
+    settings.CATALOG_INDEX_ENABLED = True
+    cache.clear()
+    yield catalog_index
+    catalog_index.reset()
+    catalog_index.disabled = False
+
+
+class Test27CatalogIndex:
+
+    def list_ids(self, client, params):
+        response = client.get('/api/v1/titles/', params)
+        assert response.status_code == 200
+        return [title['id'] for title in response.json()['results']], response.json()['count']
+
+    def expected_ids(self, params):
+        from api.filters import TitleFilter
+        from api.models import Title
+        params = dict(params)
+        page = params.pop('page', 1)
+        titles = TitleFilter(params, queryset=Title.objects.order_by('-id')).qs
+        ids = list(titles.values_list('id', flat=True))
+        return ids[(page - 1) * 10:page * 10], len(ids)
+
+    def wait_for_build(self, catalog_index):
+        deadline = time.monotonic() + 5
+        while catalog_index.building and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_filters(self, client, user_client, admin, catalog_index, django_assert_max_num_queries):
+        from api.models import Title
+        create_reviews(user_client, admin)
+        films = [
+            user_client.post('/api/v1/titles/', data={
+                'name': f'Фильм {number}', 'year': 2005, 'category': 'films',
+                'genre': ['drama', 'comedy'][:number % 2 + 1]}).json()['id']
+            for number in range(15)
+        ]
+        Title.objects.filter(pk=films[3]).delete()
+        assert catalog_index.build()
+
+        for params in CASES:
+            expected = self.expected_ids(params)
+            with django_assert_max_num_queries(2):
+                assert self.list_ids(client, params) == expected, (
+                    f'Проверьте, что список произведений с фильтрами {params} '
+                    'строится по индексу так же, как по базе'
+                )
+        assert client.get('/api/v1/titles/', {'page': 3, 'year': 2005}).status_code == 404
+        assert client.get('/api/v1/titles/', {'year': 'abc'}).status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_incremental_updates(self, client, user_client, admin, catalog_index):
+        from django.core.cache import cache
+
+        from api.models import Title
+        _, titles, _, _ = create_reviews(user_client, admin)
+        assert catalog_index.build()
+        columns = catalog_index.columns
+
+        response = user_client.post('/api/v1/titles/', data={
+            'name': 'Новое', 'year': 2020, 'genre': ['horror'], 'category': 'films'})
+        new_id = response.json()['id']
+        user_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data={'genre': ['drama'], 'year': 2020})
+        Title.objects.get(pk=titles[1]['id']).delete()
+        assert catalog_index.columns is columns, (
+            'Проверьте, что изменения процесса применяются к индексу без перестройки'
+        )
+        assert catalog_index.version == cache.get(catalog_index.version_key)
+        for params in ({'year': 2020}, {'genre': 'drama'}, {'genre': 'horror'}, {}):
+            assert catalog_index.select(params) is not None
+            assert self.list_ids(client, params) == self.expected_ids(params)
+        assert self.list_ids(client, {'year': 2020})[0] == [new_id, titles[0]['id']]
+
+        # Change made by another process.
+        cache.incr(catalog_index.version_key)
+        assert catalog_index.select({}) is None, (
+            'Проверьте, что индекс с чужой версией не используется'
+        )
+        self.wait_for_build(catalog_index)
+        assert catalog_index.select({}) is not None, (
+            'Проверьте, что индекс перестраивается в фоне после изменений других процессов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_build_timeout(self, user_client, admin, catalog_index, settings):
+        create_reviews(user_client, admin)
+        settings.CATALOG_INDEX_BUILD_TIMEOUT = 0
+        catalog_index.build_in_background()
+        assert catalog_index.disabled
+        assert catalog_index.select({}) is None, (
+            'Проверьте, что индекс отключается, если не построен за отведенное время'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_changes_of_processes_without_index(self, user_client, admin, catalog_index, settings):
+        import io
+
+        from django.core.management import call_command
+
+        from .test_10_load_csv import DATA_DIR
+        create_reviews(user_client, admin)
+        assert catalog_index.build()
+
+        settings.CATALOG_INDEX_ENABLED = False
+        user_client.post('/api/v1/titles/', data={
+            'name': 'Новое', 'year': 2020, 'genre': ['horror'], 'category': 'films'})
+        settings.CATALOG_INDEX_ENABLED = True
+        assert catalog_index.select({}) is None, (
+            'Проверьте, что записи процессов без индекса меняют версию индекса каталога'
+        )
+
+        self.wait_for_build(catalog_index)
+        call_command('load_csv', path=DATA_DIR, stdout=io.StringIO())
+        assert catalog_index.select({}) is None, (
+            'Проверьте, что `load_csv` меняет версию индекса каталога'
+        )
+        self.wait_for_build(catalog_index)
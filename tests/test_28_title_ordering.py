@@ -0,0 +1,65 @@
+import pytest
+
+ORDERINGS = ('rating', '-rating', 'year', '-year', 'reviews', '-reviews', 'name', '-name')
+
+
+def query_plan(queryset):
+    from django.db import connection
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return ' | '.join(row[-1] for row in cursor.fetchall())
+
+
+class Test28TitleOrdering:
+
+    def create_titles(self):
+        from api.models import Title
+        Title.objects.bulk_create([
+            Title(name='Бета', year=2001, rating=9, rating_count=1),
+            Title(name='Альфа', year=1999, rating=7, rating_count=5),
+            Title(name='Гамма', year=2001, rating=7, rating_count=2),
+            Title(name='Дельта', year=None, rating=None, rating_count=0),
+        ])
+
+    def names(self, client, params):
+        response = client.get('/api/v1/titles/', params)
+        assert response.status_code == 200
+        return [title['name'] for title in response.json()['results']]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_ordering(self, client):
+        self.create_titles()
+        assert self.names(client, {'ordering': '-rating'}) == ['Бета', 'Гамма', 'Альфа', 'Дельта'], (
+            'Проверьте, что `ordering=-rating` сортирует по рейтингу, '
+            'а равные значения по убыванию id'
+        )
+        assert self.names(client, {'ordering': 'year'}) == ['Дельта', 'Альфа', 'Бета', 'Гамма']
+        assert self.names(client, {'ordering': '-reviews'}) == ['Альфа', 'Гамма', 'Бета', 'Дельта'], (
+            'Проверьте, что `ordering=reviews` сортирует по количеству отзывов'
+        )
+        assert self.names(client, {'ordering': 'name'}) == ['Альфа', 'Бета', 'Гамма', 'Дельта']
+        assert self.names(client, {'ordering': '-year,name'}) == ['Бета', 'Гамма', 'Альфа', 'Дельта']
+        assert self.names(client, {'ordering': '-rating', 'year': 2001}) == ['Бета', 'Гамма']
+
+        assert client.get('/api/v1/titles/', {'ordering': 'description'}).status_code == 400, (
+            'Проверьте, что сортировка по другим полям запрещена'
+        )
+        assert client.get('/api/v1/titles/', {
+            'ordering': '-rating', 'pagination': 'cursor'}).status_code == 400
+
+    @pytest.mark.django_db
+    def test_02_query_plan(self):
+        from api.filters import TitleFilter
+        from api.views import TitleViewSet
+        self.create_titles()
+        for ordering in ORDERINGS:
+            queryset = TitleFilter({'ordering': ordering}, queryset=TitleViewSet.queryset).qs[:10]
+            plan = query_plan(queryset)
+            assert 'USING INDEX' in plan and 'TEMP B-TREE' not in plan, (
+                f'Проверьте, что сортировка `{ordering}` читает индекс без сортировки строк: {plan}'
+            )
+        queryset = TitleFilter({'ordering': '-rating', 'year': 2001}, queryset=TitleViewSet.queryset).qs[:10]
+        assert 'SEARCH api_title USING INDEX' in query_plan(queryset), (
+            'Проверьте, что при сортировке с фильтром строки находятся по индексу'
+        )
@@ -0,0 +1,77 @@
+import pytest
+
+from .common import auth_client, create_reviews
+from .test_28_title_ordering import query_plan
+
+
+class Test29TopTitles:
+
+    def top(self, client, params=None):
+        response = client.get('/api/v1/titles/top/', params or {})
+        assert response.status_code == 200
+        return [(title['name'], title['score']) for title in response.json()]
+
+    def entries(self):
+        from api.models import LeaderboardEntry
+        return sorted(LeaderboardEntry.objects.values_list('kind', 'scope_id', 'title_id', 'score'))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_top(self, client, user_client, admin, django_assert_max_num_queries):
+        from django.core.management import call_command
+        reviews, titles, user, moderator = create_reviews(user_client, admin)
+        for author_client, score in ((user_client, 9), (auth_client(user), 9), (auth_client(moderator), 8)):
+            author_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'ok', 'score': score})
+        response = user_client.post('/api/v1/titles/', data={
+            'name': 'Новое', 'year': 2021, 'genre': ['drama'], 'category': 'films'})
+        new_id = response.json()['id']
+        user_client.post(f'/api/v1/titles/{new_id}/reviews/', data={'text': 'шедевр', 'score': 10})
+
+        with django_assert_max_num_queries(2):
+            top = self.top(client)
+        assert top == [('Проект', 6.23), ('Новое', 5.91), ('Поворот туда', 5.15)], (
+            'Проверьте, что `/api/v1/titles/top/` сортирует по взвешенному рейтингу: '
+            'одна высокая оценка не поднимает произведение выше многих хороших'
+        )
+        assert self.top(client, {'category': 'films'}) == [('Новое', 5.91), ('Поворот туда', 5.15)]
+        assert self.top(client, {'genre': 'drama'}) == [('Проект', 6.23), ('Новое', 5.91)]
+        assert self.top(client, {'genre': 'comedy', 'limit': 1}) == [('Поворот туда', 5.15)]
+        assert self.top(client, {'genre': 'unknown'}) == []
+
+        auth_client(moderator).patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[2]["id"]}/', data={'score': 10})
+        assert self.top(client, {'genre': 'comedy'}) == [('Поворот туда', 5.62)], (
+            'Проверьте, что рейтинг обновляется при изменении оценки'
+        )
+        user_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data={'genre': ['drama']})
+        assert self.top(client, {'genre': 'comedy'}) == []
+        assert [name for name, _ in self.top(client, {'genre': 'drama'})] == ['Проект', 'Новое', 'Поворот туда'], (
+            'Проверьте, что рейтинги жанров обновляются при изменении жанров произведения'
+        )
+        new_review = client.get(f'/api/v1/titles/{new_id}/reviews/').json()['results'][0]
+        user_client.delete(f'/api/v1/titles/{new_id}/reviews/{new_review["id"]}/')
+        assert [name for name, _ in self.top(client)] == ['Проект', 'Поворот туда']
+        user_client.delete('/api/v1/categories/films/')
+        assert self.top(client, {'category': 'films'}) == []
+
+        entries = self.entries()
+        call_command('rebuild_leaderboard', batch_size=1)
+        assert self.entries() == entries, (
+            'Проверьте, что команда `rebuild_leaderboard` строит те же рейтинги'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_validation(self, client):
+        assert client.get('/api/v1/titles/top/', {'genre': 'drama', 'category': 'films'}).status_code == 400
+        for limit in ('0', '101', 'abc'):
+            assert client.get('/api/v1/titles/top/', {'limit': limit}).status_code == 400
+
+    @pytest.mark.django_db
+    def test_03_query_plan(self):
+        from api.leaderboard import top_titles
+        from api.models import LeaderboardEntry
+        from api.views import TitleViewSet
+        for kind, slug in ((LeaderboardEntry.ALL, None), (LeaderboardEntry.GENRE, 'drama')):
+            plan = query_plan(top_titles(TitleViewSet.queryset, kind, slug))
+            assert 'SEARCH api_leaderboardentry USING' in plan and 'TEMP B-TREE' not in plan, (
+                f'Проверьте, что рейтинг читается одним проходом по индексу: {plan}'
+            )
@@ -0,0 +1,101 @@
+import math
+
+import pytest
+
+from .common import auth_client, create_comments
+from .test_28_title_ordering import query_plan
+
+
+class Test30TrendingTitles:
+
+    def trending(self, client, params=None):
+        response = client.get('/api/v1/titles/trending/', params or {})
+        assert response.status_code == 200
+        return [(title['name'], title['activity']) for title in response.json()]
+
+    def entries(self):
+        from api.models import TrendingEntry
+        return sorted(
+            (kind, scope_id, title_id, round(rank, 6))
+            for kind, scope_id, title_id, rank in TrendingEntry.objects.values_list(
+                'kind', 'scope_id', 'title_id', 'rank'))
+
+    def age(self, seconds):
+        from datetime import timedelta
+
+        from django.db.models import F
+
+        from api.models import Comment, Review, TrendingEntry
+        from api.trending import decay_rate
+        # Activity stored and published seconds earlier.
+        TrendingEntry.objects.update(
+            updated_at=F('updated_at') - timedelta(seconds=seconds),
+            rank=F('rank') - decay_rate() * seconds)
+        for model in (Review, Comment):
+            model.objects.update(pub_date=F('pub_date') - timedelta(seconds=seconds))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_trending(self, client, user_client, admin, django_assert_max_num_queries):
+        from django.conf import settings
+        from django.core.management import call_command
+        comments, reviews, titles, user, moderator = create_comments(user_client, admin)
+        auth_client(user).post(f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'ok', 'score': 7})
+
+        with django_assert_max_num_queries(2):
+            trending = self.trending(client)
+        assert trending == [('Поворот туда', 4.5), ('Проект', 1.0)], (
+            'Проверьте, что `/api/v1/titles/trending/` сортирует произведения по активности: '
+            'отзыв добавляет TRENDING_REVIEW_WEIGHT, комментарий TRENDING_COMMENT_WEIGHT'
+        )
+        assert self.trending(client, {'category': 'films'}) == [('Поворот туда', 4.5)]
+        assert self.trending(client, {'genre': 'drama'}) == [('Проект', 1.0)]
+        assert self.trending(client, {'genre': 'unknown'}) == []
+
+        self.age(settings.TRENDING_HALF_LIFE)
+        assert self.trending(client, {'limit': 1}) == [('Поворот туда', 2.25)], (
+            'Проверьте, что активность уменьшается вдвое за TRENDING_HALF_LIFE'
+        )
+        auth_client(moderator).post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'да', 'score': 8})
+        user_client.post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'ну', 'score': 6})
+        assert self.trending(client) == [('Проект', 2.5), ('Поворот туда', 2.25)], (
+            'Проверьте, что новая активность добавляется к угасшей'
+        )
+        user_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data={'genre': ['drama']})
+        assert self.trending(client, {'genre': 'drama'}) == [('Проект', 2.5), ('Поворот туда', 2.25)], (
+            'Проверьте, что активность переходит в списки новых жанров произведения'
+        )
+        assert self.trending(client, {'genre': 'comedy'}) == []
+
+        entries = self.entries()
+        call_command('rebuild_trending', batch_size=1)
+        assert self.entries() == entries, (
+            'Проверьте, что команда `rebuild_trending` считает ту же активность по датам публикации'
+        )
+
+        self.age(settings.TRENDING_HALF_LIFE * math.log2(2.5 / settings.TRENDING_MIN_SCORE) - 60)
+        assert [name for name, _ in self.trending(client)] == ['Проект'], (
+            'Проверьте, что произведения с активностью ниже TRENDING_MIN_SCORE не выводятся'
+        )
+        self.age(120)
+        assert self.trending(client) == []
+        call_command('rebuild_trending')
+        assert self.entries() == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_validation(self, client):
+        assert client.get('/api/v1/titles/trending/', {'genre': 'drama', 'category': 'films'}).status_code == 400
+        for limit in ('0', '101', 'abc'):
+            assert client.get('/api/v1/titles/trending/', {'limit': limit}).status_code == 400
+
+    @pytest.mark.django_db
+    def test_03_query_plan(self):
+        from api.models import TrendingEntry
+        from api.trending import trending_titles
+        from api.views import TitleViewSet
+        for kind, slug in ((TrendingEntry.ALL, None), (TrendingEntry.GENRE, 'drama')):
+            plan = query_plan(trending_titles(TitleViewSet.queryset, kind, slug))
+            assert 'SEARCH api_trendingentry USING' in plan and 'TEMP B-TREE' not in plan, (
+                f'Проверьте, что популярное читается одним проходом по индексу: {plan}'
+            )